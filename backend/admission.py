@@ -0,0 +1,90 @@
+"""
+요청 수락 제어 (admission control)
+
+materialized 결과가 있는 요청(캐시 히트)은 바로 처리하고(fast lane),
+크롤링/Gemini 호출이 필요한 요청만 동시 실행 수와 대기 수가 제한된 slow lane을 거치게 합니다.
+slow lane이 가득 차면 오래 기다리게 하지 않고 LaneFull을 발생시켜 503 "잠시 후 다시 시도"로 응답합니다.
+"""
+import threading
+from contextlib import contextmanager
+
+import metrics
+
+
+class LaneFull(Exception):
+    """lane의 대기열이 가득 찼거나 대기 시간이 초과됨"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Lane:
+    """
+    동시 실행 수와 대기 수가 제한된 실행 lane
+
+    Args:
+        name (str): lane 이름 (로그/지표용)
+        max_concurrent (int): 동시에 실행할 수 있는 요청 수
+        max_waiting (int): 실행 슬롯을 기다릴 수 있는 요청 수 (초과 시 즉시 거절)
+        wait_timeout (float): 슬롯을 기다리는 최대 시간 (초, 초과 시 거절)
+        retry_after (int): 거절 응답에 넣을 재시도 권장 시간 (초)
+    """
+
+    def __init__(self, name, max_concurrent, max_waiting, wait_timeout=10, retry_after=5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._waiting = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        """
+        실행 슬롯을 얻어 with 블록 실행
+
+        Raises:
+            LaneFull: 대기 수가 max_waiting을 넘었거나 wait_timeout 안에 슬롯을 얻지 못한 경우
+        """
+        # 빈 슬롯이 있으면 대기 없이 바로 실행
+        acquired = self._slots.acquire(blocking=False)
+
+        if not acquired:
+            with self._lock:
+                if self._waiting >= self.max_waiting:
+                    metrics.ADMISSIONS.inc(lane=self.name, result="rejected")
+                    raise LaneFull(f"[{self.name}] 대기 중인 요청이 너무 많습니다", self.retry_after)
+                self._waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.wait_timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if not acquired:
+                metrics.ADMISSIONS.inc(lane=self.name, result="timeout")
+                raise LaneFull(f"[{self.name}] 대기 시간이 초과되었습니다", self.retry_after)
+
+        metrics.ADMISSIONS.inc(lane=self.name, result="admitted")
+        with self._lock:
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+
+    def stats(self):
+        """현재 실행/대기 중인 요청 수"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'running': self._running,
+                'waiting': self._waiting,
+            }
@@ -1,8 +1,19 @@
 import os
 import sys
+import re
+import json
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from youtube_transcript_api import YouTubeTranscriptApi
 from dotenv import load_dotenv
+import metrics
+import database
+import gemini_scheduler
+import llm_cache
+from model_registry import ModelRegistry
+from guide_events import green_threads_enabled
 
 # Windows에서 UTF-8 출력을 위한 설정
 if sys.platform == 'win32':
@@ -17,10 +28,70 @@ if not api_key:
     exit()
 
 # 2. Gemini 설정
-genai.configure(api_key=api_key)
+# gevent로 실행 중이면 gRPC 대신 REST 전송 사용 (gRPC 호출은 gevent 허브를 막아 다른 요청까지 멈춤)
+genai.configure(api_key=api_key, transport="rest" if green_threads_enabled() else None)
 
-def get_youtube_script(video_id):
-    """유튜브 자막(스크립트) 가져오기"""
+# 모델 목록 보관 시간(초) / 쿼터 초과 모델을 건너뛰는 최대 시간(초, 연속 쿼터 초과 시 2초부터 2배씩 늘어남)
+GEMINI_MODELS_TTL = float(os.getenv("GEMINI_MODELS_TTL", 3600))
+GEMINI_QUOTA_COOLDOWN = float(os.getenv("GEMINI_QUOTA_COOLDOWN", 60))
+
+# 모델별 분당 요청/토큰 한도 (Gemini API 쿼터에 맞춤), 배치 작업이 남겨 둘 한도 비율
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", 15))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", 1000000))
+GEMINI_INTERACTIVE_RESERVE = float(os.getenv("GEMINI_INTERACTIVE_RESERVE", 0.2))
+# 사용자 요청이 스케줄러 대기열에서 기다리는 최대 시간(초) / 호출당 최대 시도 횟수 (쿼터 초과 시 백오프 후 재시도)
+GEMINI_MAX_QUEUE_WAIT = float(os.getenv("GEMINI_MAX_QUEUE_WAIT", 30))
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", 4))
+
+# 모든 Gemini 호출이 공유하는 스케줄러 (토큰 버킷 + 백오프 + 우선순위)
+scheduler = gemini_scheduler.GeminiScheduler(
+    GEMINI_RPM, GEMINI_TPM, interactive_reserve=GEMINI_INTERACTIVE_RESERVE,
+    base_backoff=2, max_backoff=GEMINI_QUOTA_COOLDOWN, max_wait=GEMINI_MAX_QUEUE_WAIT
+)
+
+# 같은 프롬프트의 응답을 재사용하는 캐시의 메모리 보관 항목 수 (저장소에는 ANALYSIS_CACHE_TTL초 동안 보관)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512))
+
+# 모델 목록과 GenerativeModel 인스턴스를 프로세스 전체에서 재사용 (호출마다 list_models 하지 않음)
+model_registry = ModelRegistry(
+    genai.list_models, genai.GenerativeModel, ttl=GEMINI_MODELS_TTL, quota_cooldown=GEMINI_QUOTA_COOLDOWN
+)
+
+# 3. 분석 결과 버전 (프롬프트나 응답 스키마를 바꾸면 올림)
+# 캐시된 분석 중 버전이 다른 항목은 캐시 미스로 취급하고, reanalyze_outdated.py가 점진적으로 다시 분석합니다.
+VIDEO_ANALYSIS_VERSION = "v1"
+COMMUNITY_ANALYSIS_VERSION = "v1"
+# materialized 제품 결과는 두 분석 결과로 만들어지므로 둘 중 하나라도 바뀌면 버전이 달라짐
+PRODUCT_RESULT_VERSION = f"video-{VIDEO_ANALYSIS_VERSION}/community-{COMMUNITY_ANALYSIS_VERSION}"
+# 구매 가이드 프롬프트 버전 (응답 캐시 키에만 사용)
+PURCHASE_GUIDE_VERSION = "v1"
+
+# 프롬프트 해시 -> Gemini 응답 (템플릿 버전이 키에 포함되므로 버전을 올리면 이전 응답은 사용하지 않음)
+response_cache = llm_cache.ResponseCache(database.storage, max_entries=LLM_CACHE_MAX_ENTRIES)
+
+# 4. 긴 스크립트/후기 분할 분석 (map-reduce)
+# 이 길이(자)를 넘으면 한 번에 보내지 않고 줄(자막은 타임스탬프) 단위 구간으로 나눠 분석한 뒤 결과를 합침
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", 15000))
+# 구간 분석 동시 실행 수 / 문서 1개의 최대 구간 수 (넘으면 구간을 더 길게 나눠 Gemini 호출 수를 제한)
+ANALYSIS_CHUNK_WORKERS = int(os.getenv("ANALYSIS_CHUNK_WORKERS", 4))
+ANALYSIS_MAX_CHUNKS = int(os.getenv("ANALYSIS_MAX_CHUNKS", 8))
+
+# 마지막으로 응답을 받은 모델 (스레드/asyncio Task별로 따로 보관)
+_last_model = contextvars.ContextVar('gemini_last_model', default=None)
+
+
+def last_model_used():
+    """현재 스레드/Task에서 마지막으로 응답을 받은 Gemini 모델 이름 (캐시 항목 태그용)"""
+    return _last_model.get()
+
+
+def fetch_youtube_transcript(video_id):
+    """
+    유튜브 자막 원문 다운로드 (한국어 > 영어 > 첫 번째 자막 순)
+    
+    Returns:
+        tuple: (언어 코드, [{"start": 초, "duration": 초, "text": 자막}, ...]), 실패 시 "❌"로 시작하는 오류 메시지
+    """
     try:
         # YouTubeTranscriptApi 인스턴스 생성
         ytt_api = YouTubeTranscriptApi()
@@ -40,24 +111,47 @@ def get_youtube_script(video_id):
         # 자막 데이터 가져오기
         transcript_data = transcript.fetch()
         
-        full_text = ""
-        for line in transcript_data:
-            seconds = int(line.start)
-            minutes = seconds // 60
-            sec = seconds % 60
-            timestamp = f"[{minutes:02d}:{sec:02d}]"
-            full_text += f"{timestamp} {line.text}\n"
-            
-        return full_text
+        segments = [
+            {"start": line.start, "duration": line.duration, "text": line.text}
+            for line in transcript_data
+        ]
+        return transcript.language_code, segments
     except Exception as e:
         error_type = type(e).__name__
         error_msg = str(e)
         print(f"   오류 상세: {error_type} - {error_msg}")
+        metrics.UPSTREAM_ERRORS.inc(upstream="youtube_transcript")
         return f"❌ 자막 추출 실패 ({error_type}): {error_msg}"
 
-def analyze_with_gemini(script_text):
-    """Gemini에게 분석 요청하기 - 구조화된 JSON 반환"""
-    prompt = f"""
+
+def format_transcript(segments):
+    """자막 구간 리스트를 "[mm:ss] 자막" 줄 단위 스크립트로 변환"""
+    full_text = ""
+    for segment in segments:
+        seconds = int(segment["start"])
+        minutes = seconds // 60
+        sec = seconds % 60
+        timestamp = f"[{minutes:02d}:{sec:02d}]"
+        full_text += f"{timestamp} {segment['text']}\n"
+    return full_text
+
+
+def get_youtube_script(video_id):
+    """유튜브 자막(스크립트) 가져오기 (저장된 자막을 쓰려면 transcript_store.get_youtube_script 사용)"""
+    fetched = fetch_youtube_transcript(video_id)
+    if isinstance(fetched, str):
+        return fetched
+    return format_transcript(fetched[1])
+
+
+async def get_youtube_script_async(video_id):
+    """get_youtube_script의 비동기 버전 (youtube-transcript-api는 동기 전용이므로 스레드에서 실행)"""
+    return await asyncio.to_thread(get_youtube_script, video_id)
+
+
+def build_video_analysis_prompt(script_text):
+    """유튜브 리뷰 스크립트 분석 프롬프트"""
+    return f"""
     너는 스마트폰 전문 리뷰어 AI야. 아래 유튜브 리뷰 스크립트를 읽고 분석해줘.
     
     [요청사항]
@@ -78,71 +172,70 @@ def analyze_with_gemini(script_text):
     - quote는 해당 타임스탬프의 실제 멘트를 그대로 인용
     
     --- 리뷰 스크립트 (시작) ---
-    {script_text[:15000]} 
+    {script_text[:ANALYSIS_CHUNK_CHARS]} 
     --- 리뷰 스크립트 (끝) ---
     """
-    
-    # 사용 가능한 모델 확인 및 시도
-    try:
-        available_models = []
-        for model in genai.list_models():
-            if 'generateContent' in model.supported_generation_methods:
-                model_name = model.name.replace('models/', '')
-                available_models.append(model_name)
-        
-        if available_models:
-            print(f"   사용 가능한 모델: {', '.join(available_models[:3])}")
-            # Flash 모델을 우선적으로 사용 (쿼터가 더 여유로울 수 있음)
-            flash_models = [m for m in available_models if 'flash' in m.lower()]
-            models_to_try = flash_models + [m for m in available_models if m not in flash_models]
-            
-            for model_name in models_to_try:
-                try:
-                    print(f"   → {model_name} 모델 시도 중...")
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(prompt)
-                    result_text = response.text
-                    
-                    # JSON 파싱 시도
-                    import json
-                    import re
-                    # JSON 부분만 추출 (마크다운 코드 블록 제거)
-                    json_match = re.search(r'\{[\s\S]*\}', result_text)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        try:
-                            parsed = json.loads(json_str)
-                            return parsed
-                        except:
-                            pass
-                    
-                    # JSON 파싱 실패 시 텍스트 반환 (하위 호환성)
-                    return result_text
-                except Exception as e:
-                    error_msg = str(e)
-                    # 쿼터 초과가 아닌 다른 오류면 즉시 반환
-                    if 'quota' not in error_msg.lower() and '429' not in error_msg:
-                        return f"❌ AI 분석 실패: {error_msg}"
-                    # 쿼터 초과면 다음 모델 시도
-                    if model_name == models_to_try[-1]:
-                        return f"❌ AI 분석 실패: 모든 모델의 쿼터가 초과되었습니다. 잠시 후 다시 시도해주세요."
-                    continue
-        else:
-            return "❌ AI 분석 실패: 사용 가능한 모델을 찾을 수 없습니다."
-    except Exception as e:
-        return f"❌ AI 분석 실패: {str(e)}"
 
-def analyze_community_reviews_with_gemini(reviews_text):
+
+def build_video_chunk_prompt(script_text, index, total):
+    """긴 유튜브 리뷰 스크립트의 구간 분석 프롬프트 (map 단계)"""
+    return f"""
+    너는 스마트폰 전문 리뷰어 AI야. 아래는 긴 유튜브 리뷰 스크립트를 {total}개로 나눈 것 중 {index}번째 구간이야.
+    이 구간에서 언급된 내용만 읽고 분석해줘.
+    
+    [요청사항]
+    반드시 다음 JSON 형식으로만 응답해줘:
+    {{
+        "pros": ["장점1", "장점2"],
+        "cons": ["단점1", "단점2"],
+        "highlight": {{
+            "timestamp": "[00:00]",
+            "quote": "인상적인 멘트"
+        }}
+    }}
+    
+    주의사항:
+    - pros와 cons는 이 구간에서 언급된 것만 각각 최대 5개 작성 (없으면 빈 배열)
+    - 각 항목은 간결하게 한 문장으로 작성
+    - highlight의 timestamp는 스크립트에 있는 실제 타임스탬프 형식 사용 (예: [05:23])
+    - quote는 해당 타임스탬프의 실제 멘트를 그대로 인용
+    
+    --- 리뷰 스크립트 {index}/{total} (시작) ---
+    {script_text}
+    --- 리뷰 스크립트 {index}/{total} (끝) ---
     """
-    커뮤니티 후기를 Gemini로 분석하여 장단점 추출
+
+
+def build_video_reduce_prompt(partials):
+    """구간별 분석 결과를 영상 1개의 분석 결과로 합치는 프롬프트 (reduce 단계)"""
+    return f"""
+    너는 스마트폰 전문 리뷰어 AI야. 아래는 유튜브 리뷰 영상 1개를 구간별로 나눠 분석한 결과야 (영상 앞부분부터 순서대로).
+    영상 전체의 분석 결과로 합쳐줘.
     
-    Args:
-        reviews_text (str): 크롤링한 커뮤니티 후기 텍스트
+    [요청사항]
+    반드시 다음 JSON 형식으로만 응답해줘:
+    {{
+        "pros": ["장점1", "장점2", "장점3"],
+        "cons": ["단점1", "단점2", "단점3"],
+        "highlight": {{
+            "timestamp": "[00:00]",
+            "quote": "인상적인 멘트"
+        }}
+    }}
     
-    Returns:
-        str: 분석 결과 텍스트
+    주의사항:
+    - pros와 cons는 각각 정확히 3개만 작성 (여러 구간에서 반복된 내용을 우선, 같은 내용은 하나로 합침)
+    - 각 항목은 간결하게 한 문장으로 작성
+    - highlight는 구간별 highlight 중 가장 인상적인 것 1개를 timestamp와 quote 그대로 선택
+    
+    --- 구간별 분석 결과 ---
+    {json.dumps(partials, ensure_ascii=False)}
     """
-    prompt = f"""
+
+
+def build_community_analysis_prompt(reviews_text):
+    """커뮤니티 후기 분석 프롬프트"""
+    return f"""
     너는 제품 리뷰 분석 전문가 AI야. 아래 커뮤니티 사용자들의 실제 사용 후기를 읽고 분석해줘.
     
     [요청사항]
@@ -159,68 +252,63 @@ def analyze_community_reviews_with_gemini(reviews_text):
     - quotes는 실제 사용자들의 생생한 후기 멘트 2-3개를 그대로 인용
     
     --- 커뮤니티 후기 (시작) ---
-    {reviews_text[:15000]}
+    {reviews_text[:ANALYSIS_CHUNK_CHARS]}
     --- 커뮤니티 후기 (끝) ---
     """
-    
-    # 사용 가능한 모델 확인 및 시도
-    try:
-        available_models = []
-        for model in genai.list_models():
-            if 'generateContent' in model.supported_generation_methods:
-                model_name = model.name.replace('models/', '')
-                available_models.append(model_name)
-        
-        if available_models:
-            flash_models = [m for m in available_models if 'flash' in m.lower()]
-            models_to_try = flash_models + [m for m in available_models if m not in flash_models]
-            
-            for model_name in models_to_try:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(prompt)
-                    result_text = response.text
-                    
-                    # JSON 파싱 시도
-                    import json
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', result_text)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        try:
-                            parsed = json.loads(json_str)
-                            return parsed
-                        except:
-                            pass
-                    
-                    # JSON 파싱 실패 시 텍스트 반환
-                    return result_text
-                except Exception as e:
-                    error_msg = str(e)
-                    if 'quota' not in error_msg.lower() and '429' not in error_msg:
-                        return f"❌ AI 분석 실패: {error_msg}"
-                    if model_name == models_to_try[-1]:
-                        return f"❌ AI 분석 실패: 모든 모델의 쿼터가 초과되었습니다."
-                    continue
-        else:
-            return "❌ AI 분석 실패: 사용 가능한 모델을 찾을 수 없습니다."
-    except Exception as e:
-        return f"❌ AI 분석 실패: {str(e)}"
 
 
-def generate_purchase_guide(youtube_summary, community_summary, product_name):
+def build_community_chunk_prompt(reviews_text, index, total):
+    """긴 커뮤니티 후기의 구간 분석 프롬프트 (map 단계)"""
+    return f"""
+    너는 제품 리뷰 분석 전문가 AI야. 아래는 커뮤니티 사용자 후기 모음을 {total}개로 나눈 것 중 {index}번째 구간이야.
+    이 구간의 후기만 읽고 분석해줘.
+    
+    [요청사항]
+    반드시 다음 JSON 형식으로만 응답해줘:
+    {{
+        "pros": ["장점1", "장점2"],
+        "cons": ["단점1", "단점2"],
+        "quotes": ["실제 사용자 멘트1", "실제 사용자 멘트2"]
+    }}
+    
+    주의사항:
+    - pros와 cons는 이 구간의 후기에서 언급된 것만 각각 최대 5개 작성 (없으면 빈 배열)
+    - 각 항목은 간결하게 한 문장으로 작성
+    - quotes는 실제 사용자들의 생생한 후기 멘트 2-3개를 그대로 인용
+    
+    --- 커뮤니티 후기 {index}/{total} (시작) ---
+    {reviews_text}
+    --- 커뮤니티 후기 {index}/{total} (끝) ---
     """
-    유튜브 리뷰와 커뮤니티 후기를 종합하여 구매 결정 가이드 생성 - 구조화된 JSON 반환
+
+
+def build_community_reduce_prompt(partials):
+    """구간별 커뮤니티 후기 분석 결과를 하나로 합치는 프롬프트 (reduce 단계)"""
+    return f"""
+    너는 제품 리뷰 분석 전문가 AI야. 아래는 커뮤니티 사용자 후기 모음을 구간별로 나눠 분석한 결과야.
+    전체 후기의 분석 결과로 합쳐줘.
     
-    Args:
-        youtube_summary (str): 유튜브 리뷰 분석 결과
-        community_summary (str): 커뮤니티 후기 분석 결과
-        product_name (str): 제품명
+    [요청사항]
+    반드시 다음 JSON 형식으로만 응답해줘:
+    {{
+        "pros": ["장점1", "장점2", "장점3"],
+        "cons": ["단점1", "단점2", "단점3"],
+        "quotes": ["실제 사용자 멘트1", "실제 사용자 멘트2"]
+    }}
     
-    Returns:
-        dict 또는 str: 구매 결정 가이드 (구조화된 JSON 또는 텍스트)
+    주의사항:
+    - pros와 cons는 각각 정확히 3개만 작성 (여러 구간에서 반복된 내용을 우선, 같은 내용은 하나로 합침)
+    - 각 항목은 간결하게 한 문장으로 작성
+    - quotes는 구간별 quotes 중 가장 생생한 멘트 2-3개를 그대로 선택
+    
+    --- 구간별 분석 결과 ---
+    {json.dumps(partials, ensure_ascii=False)}
     """
-    prompt = f"""
+
+
+def build_purchase_guide_prompt(youtube_summary, community_summary, product_name):
+    """구매 결정 가이드 프롬프트"""
+    return f"""
     너는 제품 구매 컨설턴트 AI야. 아래 {product_name}에 대한 전문 리뷰어(유튜브)와 일반 사용자들(커뮤니티)의 의견을 종합하여 구매 결정 가이드를 작성해줘.
     
     [요청사항]
@@ -250,50 +338,399 @@ def generate_purchase_guide(youtube_summary, community_summary, product_name):
     --- 일반 사용자 의견 (커뮤니티) ---
     {community_summary[:8000]}
     """
+
+
+def _models_to_try():
+    """
+    이번 호출에서 시도할 모델 목록 (Flash 모델 우선)
     
-    # 사용 가능한 모델 확인 및 시도
+    쿼터 초과로 대기 중인 모델은 빼고, 모두 대기 중이면 전체 목록을 반환합니다 (스케줄러가 백오프가 끝날 때까지 대기).
+    """
+    return model_registry.candidates() or model_registry.models()
+
+
+def _on_quota_error(model_name):
+    """쿼터 초과 모델에 백오프 적용 (백오프 동안 다른 모델 우선 사용)"""
+    delay = scheduler.report_quota_error(model_name)
+    model_registry.mark_quota_exceeded(model_name, cooldown=delay)
+    print(f"   ⏳ {model_name} 쿼터 초과: {delay:.1f}초 후 재시도")
+
+
+def _on_success(model_name):
+    scheduler.report_success(model_name)
+    model_registry.mark_success(model_name)
+    _last_model.set(model_name)
+
+
+def _parse_json_response(result_text):
+    """응답에서 JSON 부분만 추출해 dict로 변환 (실패 시 텍스트 그대로 반환)"""
+    # JSON 부분만 추출 (마크다운 코드 블록 제거)
+    json_match = re.search(r'\{[\s\S]*\}', result_text)
+    if json_match:
+        json_str = json_match.group(0)
+        try:
+            return json.loads(json_str)
+        except:
+            pass
+    
+    # JSON 파싱 실패 시 텍스트 반환 (하위 호환성)
+    return result_text
+
+
+def _is_quota_error(error_msg):
+    return 'quota' in error_msg.lower() or '429' in error_msg
+
+
+def _generate_json(prompt, error_prefix, quota_message="모든 모델의 쿼터가 초과되었습니다.", cache_version=None):
+    """
+    프롬프트 실행 (cache_version이 있으면 같은 프롬프트의 저장된 응답을 먼저 사용하고, 새 JSON 응답은 저장)
+    
+    Returns:
+        dict 또는 str: 파싱된 JSON, 텍스트 응답, 또는 "❌ ..." 오류 메시지
+    """
+    if cache_version is None:
+        return _call_gemini(prompt, error_prefix, quota_message)
+    
+    key = llm_cache.prompt_key(cache_version, prompt)
+    cached = response_cache.get(key)
+    if cached is not None:
+        _last_model.set(cached['model'])
+        return cached['response']
+    
+    result = _call_gemini(prompt, error_prefix, quota_message)
+    if isinstance(result, dict):
+        response_cache.put(key, cache_version, result, last_model_used())
+    return result
+
+
+async def _generate_json_async(prompt, error_prefix, quota_message="모든 모델의 쿼터가 초과되었습니다.", cache_version=None):
+    """_generate_json의 비동기 버전"""
+    if cache_version is None:
+        return await _call_gemini_async(prompt, error_prefix, quota_message)
+    
+    key = llm_cache.prompt_key(cache_version, prompt)
+    cached = await response_cache.get_async(key)
+    if cached is not None:
+        _last_model.set(cached['model'])
+        return cached['response']
+    
+    result = await _call_gemini_async(prompt, error_prefix, quota_message)
+    if isinstance(result, dict):
+        await response_cache.put_async(key, cache_version, result, last_model_used())
+    return result
+
+
+def _call_gemini(prompt, error_prefix, quota_message):
+    """
+    스케줄러의 허가를 받아 프롬프트 실행 (가장 빨리 실행할 수 있는 모델 선택, 쿼터 초과 시 백오프 후 재시도)
+    
+    Returns:
+        dict 또는 str: 파싱된 JSON, 텍스트 응답, 또는 "❌ ..." 오류 메시지
+    """
     try:
-        available_models = []
-        for model in genai.list_models():
-            if 'generateContent' in model.supported_generation_methods:
-                model_name = model.name.replace('models/', '')
-                available_models.append(model_name)
+        tokens = gemini_scheduler.estimate_tokens(prompt)
+        for _ in range(GEMINI_MAX_ATTEMPTS):
+            models_to_try = _models_to_try()
+            if not models_to_try:
+                return f"{error_prefix}: 사용 가능한 모델을 찾을 수 없습니다."
+            
+            model_name = scheduler.pick(models_to_try, tokens)
+            if not scheduler.acquire(model_name, tokens):
+                # 쿼터 한도까지 사용 중이라 대기열에서 GEMINI_MAX_QUEUE_WAIT초 안에 차례가 오지 않음
+                return f"{error_prefix}: {quota_message}"
+            
+            try:
+                print(f"   → {model_name} 모델 시도 중...")
+                result_text = model_registry.get(model_name).generate_content(prompt).text
+            except Exception as e:
+                error_msg = str(e)
+                metrics.UPSTREAM_ERRORS.inc(upstream="gemini_quota" if _is_quota_error(error_msg) else "gemini")
+                # 쿼터 초과가 아닌 다른 오류면 즉시 반환
+                if not _is_quota_error(error_msg):
+                    return f"{error_prefix}: {error_msg}"
+                _on_quota_error(model_name)
+                continue
+            
+            _on_success(model_name)
+            return _parse_json_response(result_text)
         
-        if available_models:
-            flash_models = [m for m in available_models if 'flash' in m.lower()]
-            models_to_try = flash_models + [m for m in available_models if m not in flash_models]
+        return f"{error_prefix}: {quota_message}"
+    except Exception as e:
+        return f"{error_prefix}: {str(e)}"
+
+
+async def _call_gemini_async(prompt, error_prefix, quota_message):
+    """_call_gemini의 비동기 버전 (generate_content_async 사용, 이벤트 루프를 막지 않음)"""
+    try:
+        tokens = gemini_scheduler.estimate_tokens(prompt)
+        for _ in range(GEMINI_MAX_ATTEMPTS):
+            # 모델 목록 조회는 동기 API뿐이므로 목록이 만료됐을 때만 스레드에서 실행
+            if model_registry.is_fresh():
+                models_to_try = _models_to_try()
+            else:
+                models_to_try = await asyncio.to_thread(_models_to_try)
+            if not models_to_try:
+                return f"{error_prefix}: 사용 가능한 모델을 찾을 수 없습니다."
             
-            for model_name in models_to_try:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(prompt)
-                    result_text = response.text
-                    
-                    # JSON 파싱 시도
-                    import json
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', result_text)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        try:
-                            parsed = json.loads(json_str)
-                            return parsed
-                        except:
-                            pass
-                    
-                    # JSON 파싱 실패 시 텍스트 반환
-                    return result_text
-                except Exception as e:
-                    error_msg = str(e)
-                    if 'quota' not in error_msg.lower() and '429' not in error_msg:
-                        return f"❌ 구매 가이드 생성 실패: {error_msg}"
-                    if model_name == models_to_try[-1]:
-                        return f"❌ 구매 가이드 생성 실패: 모든 모델의 쿼터가 초과되었습니다."
-                    continue
-        else:
-            return "❌ 구매 가이드 생성 실패: 사용 가능한 모델을 찾을 수 없습니다."
+            model_name = scheduler.pick(models_to_try, tokens)
+            # 스케줄러 대기는 이벤트 루프에서 (기본 스레드 풀을 점유하지 않음)
+            if not await scheduler.acquire_async(model_name, tokens):
+                return f"{error_prefix}: {quota_message}"
+            
+            try:
+                print(f"   → {model_name} 모델 시도 중 (async)...")
+                response = await model_registry.get(model_name).generate_content_async(prompt)
+                result_text = response.text
+            except Exception as e:
+                error_msg = str(e)
+                metrics.UPSTREAM_ERRORS.inc(upstream="gemini_quota" if _is_quota_error(error_msg) else "gemini")
+                if not _is_quota_error(error_msg):
+                    return f"{error_prefix}: {error_msg}"
+                _on_quota_error(model_name)
+                continue
+            
+            _on_success(model_name)
+            return _parse_json_response(result_text)
+        
+        return f"{error_prefix}: {quota_message}"
     except Exception as e:
-        return f"❌ 구매 가이드 생성 실패: {str(e)}"
+        return f"{error_prefix}: {str(e)}"
+
+
+def split_text(text, max_chars):
+    """
+    텍스트를 줄 단위로 max_chars자 이하 구간으로 나눔
+    
+    자막 스크립트는 한 줄이 "[mm:ss] 자막"이므로 타임스탬프 경계에서 나뉩니다.
+    한 줄이 max_chars보다 길면 그 줄만 글자 수로 잘라 나눕니다.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                chunks.append(''.join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and size + len(line) > max_chars:
+            chunks.append(''.join(current))
+            current, size = [], 0
+        if line:
+            current.append(line)
+            size += len(line)
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def _split_for_analysis(text):
+    """분할 분석용 구간 (구간이 ANALYSIS_MAX_CHUNKS개를 넘으면 구간 길이를 늘려 전체를 포함)"""
+    max_chars = max(ANALYSIS_CHUNK_CHARS, -(-len(text) // max(1, ANALYSIS_MAX_CHUNKS)))
+    return split_text(text, max_chars)
+
+
+def _merge_lists(partials, key, limit):
+    """구간별 목록을 앞 구간부터 번갈아 하나씩 모아 중복 없이 limit개 (reduce 실패 시 대체용)"""
+    lists = [partial.get(key) or [] for partial in partials]
+    merged = []
+    for i in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if i < len(items) and items[i] not in merged:
+                merged.append(items[i])
+    return merged[:limit]
+
+
+def _merge_video_partials(partials):
+    highlight = next((p['highlight'] for p in partials if p.get('highlight')), {"timestamp": "", "quote": ""})
+    return {
+        "pros": _merge_lists(partials, "pros", 3),
+        "cons": _merge_lists(partials, "cons", 3),
+        "highlight": highlight,
+    }
+
+
+def _merge_community_partials(partials):
+    return {
+        "pros": _merge_lists(partials, "pros", 3),
+        "cons": _merge_lists(partials, "cons", 3),
+        "quotes": _merge_lists(partials, "quotes", 3),
+    }
+
+
+# 분할 분석 단계별 프롬프트: (구간 분석, 결과 합치기, reduce 실패 시 규칙 기반 합치기)
+VIDEO_MAP_REDUCE = (build_video_chunk_prompt, build_video_reduce_prompt, _merge_video_partials)
+COMMUNITY_MAP_REDUCE = (build_community_chunk_prompt, build_community_reduce_prompt, _merge_community_partials)
+
+
+def _collect_partials(outcomes):
+    """
+    구간별 분석 결과 정리
+    
+    Returns:
+        tuple: (JSON으로 파싱된 구간 결과 리스트, 첫 번째로 성공한 구간의 모델, 첫 번째 오류 메시지)
+    """
+    partials = []
+    model = None
+    error = None
+    for result, result_model in outcomes:
+        if isinstance(result, dict):
+            partials.append(result)
+            model = model or result_model
+        elif isinstance(result, str) and result.startswith("❌"):
+            error = error or result
+    return partials, model, error
+
+
+def _finish_reduce(reduced, partials, merge, model):
+    """reduce 결과가 JSON이 아니면 구간 결과를 규칙대로 합쳐 반환"""
+    if isinstance(reduced, dict):
+        return reduced
+    print(f"   ⚠️ 구간 결과 합치기 실패, 규칙 기반으로 합침: {str(reduced)[:100]}")
+    _last_model.set(model)
+    return merge(partials)
+
+
+def _analyze_long_text(text, map_reduce, error_prefix, quota_message="모든 모델의 쿼터가 초과되었습니다.", cache_version=None):
+    """
+    긴 텍스트 분할 분석: 구간별 분석(ANALYSIS_CHUNK_WORKERS개 동시 실행) 후 결과를 하나로 합침
+    
+    일부 구간 분석이 실패해도 성공한 구간으로 결과를 만들고, 모두 실패하면 첫 번째 오류를 반환합니다.
+    """
+    chunk_prompt, reduce_prompt, merge = map_reduce
+    chunks = _split_for_analysis(text)
+    print(f"   📚 긴 텍스트({len(text)}자): {len(chunks)}개 구간으로 나눠 분석")
+    
+    def analyze_chunk(index, chunk):
+        prompt = chunk_prompt(chunk, index + 1, len(chunks))
+        result = _generate_json(prompt, error_prefix, quota_message, cache_version)
+        return result, last_model_used()
+    
+    max_workers = max(1, min(ANALYSIS_CHUNK_WORKERS, len(chunks)))
+    with metrics.STAGE_SECONDS.time(stage="analysis_map"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 작업마다 컨텍스트를 복사해 Gemini 호출 우선순위를 워커 스레드에 전달
+        futures = [
+            executor.submit(contextvars.copy_context().run, analyze_chunk, i, chunk)
+            for i, chunk in enumerate(chunks)
+        ]
+        outcomes = [future.result() for future in futures]
+    
+    partials, model, error = _collect_partials(outcomes)
+    if not partials:
+        return error or f"{error_prefix}: 구간 분석 결과를 해석할 수 없습니다."
+    if len(partials) == 1:
+        _last_model.set(model)
+        return merge(partials)
+    
+    with metrics.STAGE_SECONDS.time(stage="analysis_reduce"):
+        reduced = _generate_json(reduce_prompt(partials), error_prefix, quota_message, cache_version)
+    return _finish_reduce(reduced, partials, merge, model)
+
+
+async def _analyze_long_text_async(text, map_reduce, error_prefix, quota_message="모든 모델의 쿼터가 초과되었습니다.", cache_version=None):
+    """_analyze_long_text의 비동기 버전 (구간 분석 동시 실행 수는 세마포어로 제한)"""
+    chunk_prompt, reduce_prompt, merge = map_reduce
+    chunks = _split_for_analysis(text)
+    print(f"   📚 긴 텍스트({len(text)}자): {len(chunks)}개 구간으로 나눠 분석 (async)")
+    semaphore = asyncio.Semaphore(max(1, ANALYSIS_CHUNK_WORKERS))
+    
+    async def analyze_chunk(index, chunk):
+        async with semaphore:
+            prompt = chunk_prompt(chunk, index + 1, len(chunks))
+            result = await _generate_json_async(prompt, error_prefix, quota_message, cache_version)
+        return result, last_model_used()
+    
+    with metrics.STAGE_SECONDS.time(stage="analysis_map"):
+        outcomes = await asyncio.gather(*(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+    
+    partials, model, error = _collect_partials(outcomes)
+    if not partials:
+        return error or f"{error_prefix}: 구간 분석 결과를 해석할 수 없습니다."
+    if len(partials) == 1:
+        _last_model.set(model)
+        return merge(partials)
+    
+    with metrics.STAGE_SECONDS.time(stage="analysis_reduce"):
+        reduced = await _generate_json_async(reduce_prompt(partials), error_prefix, quota_message, cache_version)
+    return _finish_reduce(reduced, partials, merge, model)
+
+
+VIDEO_QUOTA_MESSAGE = "모든 모델의 쿼터가 초과되었습니다. 잠시 후 다시 시도해주세요."
+
+
+def analyze_with_gemini(script_text):
+    """Gemini에게 분석 요청하기 - 구조화된 JSON 반환 (ANALYSIS_CHUNK_CHARS자를 넘으면 구간별로 나눠 분석)"""
+    if len(script_text) > ANALYSIS_CHUNK_CHARS:
+        return _analyze_long_text(
+            script_text, VIDEO_MAP_REDUCE, "❌ AI 분석 실패", VIDEO_QUOTA_MESSAGE, VIDEO_ANALYSIS_VERSION
+        )
+    return _generate_json(
+        build_video_analysis_prompt(script_text), "❌ AI 분석 실패", VIDEO_QUOTA_MESSAGE, VIDEO_ANALYSIS_VERSION
+    )
+
+
+async def analyze_with_gemini_async(script_text):
+    """analyze_with_gemini의 비동기 버전"""
+    if len(script_text) > ANALYSIS_CHUNK_CHARS:
+        return await _analyze_long_text_async(
+            script_text, VIDEO_MAP_REDUCE, "❌ AI 분석 실패", VIDEO_QUOTA_MESSAGE, VIDEO_ANALYSIS_VERSION
+        )
+    return await _generate_json_async(
+        build_video_analysis_prompt(script_text), "❌ AI 분석 실패", VIDEO_QUOTA_MESSAGE, VIDEO_ANALYSIS_VERSION
+    )
+
+
+def analyze_community_reviews_with_gemini(reviews_text):
+    """
+    커뮤니티 후기를 Gemini로 분석하여 장단점 추출 (ANALYSIS_CHUNK_CHARS자를 넘으면 구간별로 나눠 분석)
+    
+    Args:
+        reviews_text (str): 크롤링한 커뮤니티 후기 텍스트
+    
+    Returns:
+        str: 분석 결과 텍스트
+    """
+    if len(reviews_text) > ANALYSIS_CHUNK_CHARS:
+        return _analyze_long_text(
+            reviews_text, COMMUNITY_MAP_REDUCE, "❌ AI 분석 실패", cache_version=COMMUNITY_ANALYSIS_VERSION
+        )
+    return _generate_json(
+        build_community_analysis_prompt(reviews_text), "❌ AI 분석 실패", cache_version=COMMUNITY_ANALYSIS_VERSION
+    )
+
+
+async def analyze_community_reviews_with_gemini_async(reviews_text):
+    """analyze_community_reviews_with_gemini의 비동기 버전"""
+    if len(reviews_text) > ANALYSIS_CHUNK_CHARS:
+        return await _analyze_long_text_async(
+            reviews_text, COMMUNITY_MAP_REDUCE, "❌ AI 분석 실패", cache_version=COMMUNITY_ANALYSIS_VERSION
+        )
+    return await _generate_json_async(
+        build_community_analysis_prompt(reviews_text), "❌ AI 분석 실패", cache_version=COMMUNITY_ANALYSIS_VERSION
+    )
+
+
+def generate_purchase_guide(youtube_summary, community_summary, product_name):
+    """
+    유튜브 리뷰와 커뮤니티 후기를 종합하여 구매 결정 가이드 생성 - 구조화된 JSON 반환
+    
+    Args:
+        youtube_summary (str): 유튜브 리뷰 분석 결과
+        community_summary (str): 커뮤니티 후기 분석 결과
+        product_name (str): 제품명
+    
+    Returns:
+        dict 또는 str: 구매 결정 가이드 (구조화된 JSON 또는 텍스트)
+    """
+    prompt = build_purchase_guide_prompt(youtube_summary, community_summary, product_name)
+    return _generate_json(prompt, "❌ 구매 가이드 생성 실패", cache_version=PURCHASE_GUIDE_VERSION)
+
+
+async def generate_purchase_guide_async(youtube_summary, community_summary, product_name):
+    """generate_purchase_guide의 비동기 버전"""
+    prompt = build_purchase_guide_prompt(youtube_summary, community_summary, product_name)
+    return await _generate_json_async(prompt, "❌ 구매 가이드 생성 실패", cache_version=PURCHASE_GUIDE_VERSION)
 
 
 # --- 테스트 실행 영역 ---
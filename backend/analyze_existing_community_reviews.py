@@ -4,7 +4,8 @@
 import sys
 import product_normalizer
 import ai_service
-from batch_crawler import save_community_analysis_to_db, get_community_reviews_from_db
+import gemini_scheduler
+from batch_crawler import save_community_analysis_to_db, get_community_reviews_meta_from_db, get_community_reviews_text_from_db
 
 # Windows에서 UTF-8 출력을 위한 설정
 if sys.platform == 'win32':
@@ -25,26 +26,27 @@ def analyze_existing_reviews():
         print(f"📱 제품 분석: {product_name}")
         print(f"{'='*60}")
         
-        # DB에서 커뮤니티 후기 조회
-        result = get_community_reviews_from_db(product_name)
+        # DB에서 커뮤니티 후기 메타 정보 조회 (후기 원문 제외)
+        meta = get_community_reviews_meta_from_db(product_name)
         
-        if len(result) == 3:
-            reviews_text, sources, cached_analysis = result
-        else:
-            reviews_text, sources = result[:2]
-            cached_analysis = None
-        
-        if not reviews_text:
+        if not meta:
             print(f"   ⚠️ 커뮤니티 후기가 없습니다. 스킵합니다.")
             fail_count += 1
             continue
         
         # 이미 분석 결과가 있으면 스킵
-        if cached_analysis:
+        if meta['analysis_summary']:
             print(f"   ⚡ 이미 분석 결과가 있습니다. 스킵합니다.")
             success_count += 1
             continue
         
+        # 분석할 때만 후기 원문 로드
+        reviews_text = get_community_reviews_text_from_db(meta['product_name'])
+        if not reviews_text:
+            print(f"   ⚠️ 커뮤니티 후기가 없습니다. 스킵합니다.")
+            fail_count += 1
+            continue
+        
         # AI 분석 수행
         print(f"   🤖 AI 분석 시작...")
         try:
@@ -55,7 +57,7 @@ def analyze_existing_reviews():
                 fail_count += 1
             else:
                 # 분석 결과 저장
-                save_community_analysis_to_db(product_name, analysis)
+                save_community_analysis_to_db(meta['product_name'], analysis, model=ai_service.last_model_used())
                 print(f"      ✅ 분석 완료 및 저장")
                 success_count += 1
         except Exception as e:
@@ -67,5 +69,7 @@ def analyze_existing_reviews():
     print(f"{'='*60}")
 
 if __name__ == "__main__":
+    # 배치 작업은 API 서버 요청을 위해 Gemini 쿼터 일부를 남겨 둠
+    gemini_scheduler.set_default_priority(gemini_scheduler.BATCH)
     analyze_existing_reviews()
 
@@ -1,20 +1,163 @@
-from flask import Flask, request, jsonify
+# SSE 스트림 구독자가 OS 스레드를 점유하지 않도록 직접 실행 시 gevent 사용 (다른 모듈을 불러오기 전에 패치해야 함)
+# gunicorn으로 실행할 때는 -k gevent 워커가 같은 패치를 적용합니다.
+if __name__ == '__main__':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
 import ai_service  # 방금 이름 바꾼 파일(ai_service.py)을 불러옵니다
 import database  # MongoDB 캐싱 레이어
 import crawler  # 유튜브 검색 및 커뮤니티 크롤링
+from singleflight import SingleFlight  # 동시 요청 합치기
+import guide_store  # 구매 가이드 저장소
+import product_result  # 제품별 materialized 분석 결과
+import metrics  # 단계별 소요 시간 / 캐시 / 외부 오류 지표
+import gemini_scheduler  # Gemini 호출 우선순위 (사용자 요청 > 백그라운드 재수집)
+import transcript_store  # 자막 원문 저장소 (재분석 시 다시 다운로드하지 않음)
+from guide_events import GuideEventBroker, green_threads_enabled  # 구매 가이드 상태 변경 알림 (SSE)
+from job_queue import JobExecutor, JobQueueFull  # 백그라운드 작업 실행기
+from ttl_cache import TTLCache
+from admission import Lane, LaneFull  # 캐시 히트/미스 요청 분리
 import os
-import threading
 import json
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 # 프론트엔드(React)에서 요청을 보낼 때 보안 문제를 해결해줍니다.
 CORS(app)
 
-# 구매 가이드 생성 상태 저장 (메모리 기반, 데모용)
-# 구조: { "제품명": {"status": "processing"|"completed", "guide": {...}, "error": "..."} }
-purchase_guide_cache = {}
-purchase_guide_lock = threading.Lock() 
+# 구매 가이드 생성 상태 저장 (메모리 LRU/TTL + MongoDB 공유 저장소)
+# 구조: { "제품명": {"status": "processing"|"completed"|"error", "guide": {...}, "error": "..."} }
+purchase_guides = guide_store.create_guide_store()
+
+# 구매 가이드 상태 변경을 SSE 구독자에게 전달
+guide_events = GuideEventBroker()
+
+# SSE 스트림 설정 (초)
+GUIDE_STREAM_KEEPALIVE = int(os.environ.get('GUIDE_STREAM_KEEPALIVE', 5))  # 대기 중 keep-alive 전송 및 공유 저장소 재확인 주기
+GUIDE_STREAM_TIMEOUT = int(os.environ.get('GUIDE_STREAM_TIMEOUT', 120))  # 스트림 최대 유지 시간
+
+# 구매 가이드 생성 작업 실행기 (동시 Gemini 호출 수와 대기열 길이를 제한, 제품별 중복 제거)
+GUIDE_JOB_WORKERS = int(os.environ.get('GUIDE_JOB_WORKERS', 4))
+GUIDE_JOB_MAX_PENDING = int(os.environ.get('GUIDE_JOB_MAX_PENDING', 100))
+guide_jobs = JobExecutor("guide", max_workers=GUIDE_JOB_WORKERS, max_pending=GUIDE_JOB_MAX_PENDING)
+
+# Stale-while-revalidate: 수집한 지 PRODUCT_MAX_AGE초가 지난 제품은 응답은 그대로 하고 백그라운드에서 다시 수집
+PRODUCT_MAX_AGE = int(os.environ.get('PRODUCT_MAX_AGE', 24 * 60 * 60))
+# 자막이 없거나 분석에 실패한 영상을 빼고 만든 결과는 이 시간(초)이 지나면 재수집에서 실패한 영상을 다시 시도
+PRODUCT_PARTIAL_MAX_AGE = int(os.environ.get('PRODUCT_PARTIAL_MAX_AGE', 6 * 60 * 60))
+# 같은 제품의 재수집은 이 시간(초) 안에 한 번만 시도 (실패해도 요청마다 다시 시도하지 않음)
+PRODUCT_REFRESH_COOLDOWN = int(os.environ.get('PRODUCT_REFRESH_COOLDOWN', 60 * 60))
+REFRESH_JOB_WORKERS = int(os.environ.get('REFRESH_JOB_WORKERS', 1))
+refresh_jobs = JobExecutor("refresh", max_workers=REFRESH_JOB_WORKERS, max_pending=GUIDE_JOB_MAX_PENDING)
+recent_refreshes = TTLCache(max_entries=1024, ttl=PRODUCT_REFRESH_COOLDOWN)
+
+# Admission control: 크롤링/Gemini가 필요한 요청(slow lane)의 동시 실행/대기 수 제한
+# SLOW_LANE_CONCURRENCY는 전체 워커 스레드 수보다 작게 두어 캐시 히트 요청이 처리될 여유를 남겨야 함
+SLOW_LANE_CONCURRENCY = int(os.environ.get('SLOW_LANE_CONCURRENCY', 4))
+SLOW_LANE_MAX_WAITING = int(os.environ.get('SLOW_LANE_MAX_WAITING', 8))
+SLOW_LANE_WAIT_TIMEOUT = float(os.environ.get('SLOW_LANE_WAIT_TIMEOUT', 10))
+slow_lane = Lane(
+    "slow",
+    max_concurrent=SLOW_LANE_CONCURRENCY,
+    max_waiting=SLOW_LANE_MAX_WAITING,
+    wait_timeout=SLOW_LANE_WAIT_TIMEOUT
+)
+
+# 영상 분석 동시 실행 개수 (자막 추출 + Gemini 호출을 영상별로 병렬 처리)
+VIDEO_ANALYSIS_WORKERS = int(os.environ.get('VIDEO_ANALYSIS_WORKERS', 3))
+
+# 캐시 미스 시 같은 제품/영상에 대한 동시 계산을 하나로 합침
+product_flight = SingleFlight("product")
+video_flight = SingleFlight("video")
+
+
+def _save_guide_entry(product_name, entry):
+    """구매 가이드 상태를 저장소에 저장하고 SSE 구독자에게 알림"""
+    purchase_guides.set(product_name, entry)
+    guide_events.publish(product_name, entry)
+
+
+def _refresh_product(normalized_product_name):
+    """제품의 유튜브 영상/커뮤니티 후기를 다시 수집하고 materialized 결과 재생성 (백그라운드 작업)"""
+    import batch_crawler
+    
+    # 재수집은 사용자 요청보다 Gemini 쿼터를 늦게 받음
+    with gemini_scheduler.priority(gemini_scheduler.BATCH):
+        refreshed = batch_crawler.crawl_product_batch(normalized_product_name)
+    if refreshed:
+        # 새 데이터로 구매 가이드를 다시 만들도록 기존 가이드 삭제
+        purchase_guides.delete(normalized_product_name)
+
+
+def _schedule_refresh_if_stale(normalized_product_name, result):
+    """오래된 결과면 백그라운드 재수집 예약 (제품별 중복 제거, 응답은 기다리지 않음)"""
+    if not product_result.is_stale(result, PRODUCT_MAX_AGE, version=ai_service.PRODUCT_RESULT_VERSION,
+                                   partial_max_age=PRODUCT_PARTIAL_MAX_AGE):
+        return
+    if recent_refreshes.get(normalized_product_name):
+        return
+    
+    recent_refreshes.set(normalized_product_name, True)
+    try:
+        job, created = refresh_jobs.submit(normalized_product_name, lambda: _refresh_product(normalized_product_name))
+        if created:
+            print(f"   🔄 오래된 데이터: 백그라운드 재수집 예약 ({normalized_product_name})")
+    except JobQueueFull as e:
+        print(f"   ⚠️ 재수집 작업 거부: {str(e)}")
+        recent_refreshes.delete(normalized_product_name)
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+
+@app.after_request
+def _record_request_latency(response):
+    started_at = g.get('request_started_at')
+    if started_at is not None:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            endpoint=request.endpoint or 'unknown',
+            status=response.status_code
+        )
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus 텍스트 형식 지표 (단계별 소요 시간, 캐시 히트/미스, 외부 서비스 오류)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _lane_full_response(e):
+    """slow lane이 가득 찼을 때의 503 응답 (Retry-After 포함)"""
+    print(f"   ⚠️ 요청 거절: {str(e)}")
+    response = jsonify({
+        "error": "현재 분석 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+        "retry_after": e.retry_after
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+
+def _collect_in_slow_lane(product_name, normalized_product_name):
+    """
+    slow lane 슬롯을 얻어 제품 분석 수집 (같은 제품의 동시 요청은 슬롯 없이 진행 중인 계산을 기다림)
+    
+    Raises:
+        LaneFull: slow lane이 가득 찬 경우 (대기 중인 같은 제품 요청에도 전파)
+    """
+    def collect():
+        with slow_lane.acquire():
+            return _collect_product_analysis(product_name, normalized_product_name)
+    
+    return product_flight.do(normalized_product_name, collect)
+
 
 @app.route('/')
 def home():
@@ -40,7 +183,7 @@ def analyze_video():
     print(f"📡 요청 수신: 비디오 ID [{video_id}] 분석 시작...")
 
     # 1. MongoDB 캐시 확인 (Cache Hit 체크)
-    cached_result = database.get_review_from_db(video_id)
+    cached_result = database.get_review_from_db(video_id, version=ai_service.VIDEO_ANALYSIS_VERSION)
     
     if cached_result:
         # 캐시 히트: 저장된 분석 결과 즉시 반환
@@ -51,23 +194,28 @@ def analyze_video():
             "cached": True
         })
 
-    # 2. 캐시 미스: AI 분석 수행
+    # 2. 캐시 미스: AI 분석 수행 (slow lane)
     print(f"   🔄 캐시 미스: AI 분석 시작...")
     
-    # 2-1. 자막 가져오기 (ai_service의 함수 사용)
-    script = ai_service.get_youtube_script(video_id)
-    
-    if script.startswith("❌"):
-        return jsonify({"error": script}), 500
+    try:
+        with slow_lane.acquire():
+            # 2-1. 자막 가져오기 (저장된 자막 우선)
+            script = transcript_store.get_youtube_script(video_id)
+            
+            if script.startswith("❌"):
+                return jsonify({"error": script}), 500
 
-    # 2-2. Gemini 분석 (ai_service의 함수 사용)
-    result = ai_service.analyze_with_gemini(script)
+            # 2-2. Gemini 분석 (ai_service의 함수 사용)
+            result = ai_service.analyze_with_gemini(script)
+    except LaneFull as e:
+        return _lane_full_response(e)
 
     if result.startswith("❌"):
         return jsonify({"error": result}), 500
 
     # 3. 분석 결과를 MongoDB에 저장 (캐싱)
-    database.save_review_to_db(video_id, result)
+    database.save_review_to_db(video_id, result, version=ai_service.VIDEO_ANALYSIS_VERSION,
+                               model=ai_service.last_model_used())
 
     # 4. 성공 결과 반환
     return jsonify({
@@ -77,6 +225,219 @@ def analyze_video():
     })
 
 
+def _analyze_single_video(video):
+    """
+    캐시에 없는 영상 1개 분석 (자막 추출 → Gemini 분석)
+    
+    캐시 조회/저장은 _collect_product_analysis에서 제품 단위로 한 번에 처리합니다.
+    
+    Args:
+        video (dict): {"id": ..., "title": ...} 형태의 영상 정보
+    
+    Returns:
+        tuple: (분석 결과 dict 또는 str, 분석에 사용한 모델 이름), 실패 시 None
+    """
+    video_id = video['id']
+    video_title = video['title']
+    
+    print(f"   📹 영상 분석 중: {video_title[:50]}...")
+    
+    # 자막 추출 및 분석
+    with metrics.STAGE_SECONDS.time(stage="transcript"):
+        script = transcript_store.get_youtube_script(video_id)
+    if script.startswith("❌"):
+        print(f"      ❌ 자막 추출 실패: {script}")
+        return None
+    
+    with metrics.STAGE_SECONDS.time(stage="gemini_video"):
+        analysis = ai_service.analyze_with_gemini(script)
+    if isinstance(analysis, str) and analysis.startswith("❌"):
+        print(f"      ❌ 분석 실패: {analysis}")
+        return None
+    
+    return analysis, ai_service.last_model_used()
+
+
+def _analyze_single_video_shared(video):
+    """같은 영상에 대한 동시 분석 요청을 video_flight로 합쳐서 실행"""
+    return video_flight.do(video['id'], lambda: _analyze_single_video(video))
+
+
+def _collect_product_analysis(product_name, normalized_product_name):
+    """
+    제품의 유튜브 영상 분석과 커뮤니티 후기 분석을 수집 (DB 캐시 우선, 없으면 크롤링/AI 분석)
+    
+    같은 제품에 대한 동시 요청은 product_flight를 통해 이 함수를 한 번만 실행하고 결과를 공유합니다.
+    커뮤니티 분석이 있으면 결과를 product_results에 저장해 다음 요청부터는 조회 1회로 응답합니다
+    (자막이 없는 등 분석에 실패한 영상은 빼고 failed_video_ids에 기록).
+    
+    Args:
+        product_name (str): 사용자 입력 제품명 (실시간 검색/크롤링에 사용)
+        normalized_product_name (str): 정규화된 제품명 (DB 조회/저장 키)
+    
+    Returns:
+        dict: product_result.build_product_result() 형식
+              실패 시 {"error": "...", "status_code": 404}
+    """
+    import batch_crawler
+    
+    # 1. 유튜브 영상 조회 (DB 우선, 없으면 실시간 검색)
+    print(f"   🔍 유튜브 영상 조회 중...")
+    
+    # DB에서 먼저 조회 시도 (정규화된 이름으로)
+    with metrics.STAGE_SECONDS.time(stage="db_youtube_videos"):
+        youtube_videos_meta = batch_crawler.get_youtube_videos_meta_from_db(normalized_product_name)
+    # 사용한 구성 요소(영상 목록, 커뮤니티 후기)별 수집 시각 (DB 문서의 updated_at, 지금 수집했으면 현재 시각)
+    collected_at = []
+    
+    if youtube_videos_meta and youtube_videos_meta['videos']:
+        youtube_videos = youtube_videos_meta['videos']
+        collected_at.append(youtube_videos_meta['updated_at'])
+        print(f"   ⚡ DB에서 유튜브 영상 조회 성공 ({len(youtube_videos)}개)")
+    else:
+        # DB에 없으면 실시간 검색 (사용자 입력 그대로 사용)
+        print(f"   🔄 DB에 없음: 실시간 검색 시작...")
+        with metrics.STAGE_SECONDS.time(stage="youtube_search"):
+            youtube_videos = crawler.search_youtube_top3(product_name)  # 원본 입력 사용
+        collected_at.append(int(time.time()))
+        
+        # 검색 성공 시 DB에 저장 (정규화된 이름으로 저장)
+        if youtube_videos:
+            batch_crawler.save_youtube_videos_to_db(normalized_product_name, youtube_videos)
+    
+    if not youtube_videos:
+        return {"error": "유튜브 영상을 찾을 수 없습니다.", "status_code": 404}
+    
+    print(f"   ✅ {len(youtube_videos)}개 영상 발견")
+    
+    # 2. 각 영상 분석 - 캐시는 $in 조회 1회로 확인하고, 캐시 미스 영상만 자막 추출/AI 분석을 병렬 수행
+    youtube_analyses = []
+    
+    with metrics.STAGE_SECONDS.time(stage="db_reviews"):
+        cached_reviews = database.get_reviews_from_db(
+            [video['id'] for video in youtube_videos], version=ai_service.VIDEO_ANALYSIS_VERSION
+        )
+    
+    video_results = []
+    for video in youtube_videos:
+        cached_result = cached_reviews.get(video['id'])
+        # analysis는 dict(구조화된 서브 문서) 또는 str(JSON이 아닌 응답)로 저장되어 있어 재파싱이 필요 없음
+        video_results.append(cached_result.get('analysis', '') if cached_result else None)
+    
+    missing = [i for i, video in enumerate(youtube_videos) if video['id'] not in cached_reviews]
+    if missing:
+        max_workers = max(1, min(VIDEO_ANALYSIS_WORKERS, len(missing)))
+        with metrics.STAGE_SECONDS.time(stage="videos_total"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map은 입력 순서대로 결과를 반환하므로 원래 영상 순서가 유지됩니다
+            analyzed = list(executor.map(_analyze_single_video_shared, [youtube_videos[i] for i in missing]))
+        
+        new_analyses = {}
+        models = {}
+        for i, outcome in zip(missing, analyzed):
+            if outcome is None:
+                continue
+            video_id = youtube_videos[i]['id']
+            video_results[i], models[video_id] = outcome
+            new_analyses[video_id] = video_results[i]
+        
+        # 새 분석 결과 일괄 저장 (bulk_write 1회, 분석 버전/모델 태그 포함)
+        database.save_reviews_to_db(new_analyses, version=ai_service.VIDEO_ANALYSIS_VERSION, models=models)
+    
+    failed_video_ids = []
+    for video, analysis in zip(youtube_videos, video_results):
+        if analysis is None:
+            failed_video_ids.append(video['id'])
+            continue
+        
+        # 분석 결과를 구조화된 형태로 저장
+        youtube_analyses.append({
+            "video_id": video['id'],
+            "title": video['title'],
+            "analysis": analysis  # dict 또는 str
+        })
+    
+    # 3. 커뮤니티 후기 조회 (DB 우선, 없으면 실시간 크롤링)
+    print(f"   🌐 커뮤니티 후기 조회 중...")
+    
+    # 정규화된 이름으로 DB 조회 (더 정확한 매칭) - 후기 원문 없이 소스/개수/분석 결과만 가져옴
+    with metrics.STAGE_SECONDS.time(stage="db_community_reviews"):
+        community_meta = batch_crawler.get_community_reviews_meta_from_db(normalized_product_name)
+    
+    community_reviews_text = None  # 분석을 새로 해야 할 때만 채움
+    if community_meta:
+        collected_at.append(community_meta['updated_at'])
+        community_sources = community_meta['sources']
+        community_review_count = community_meta['review_count']
+        cached_analysis = community_meta['analysis_summary']
+        community_db_product_name = community_meta['product_name']
+        print(f"   ⚡ DB에서 커뮤니티 후기 조회 성공 ({community_review_count}개)")
+        
+        if not cached_analysis:
+            # 분석 결과가 없을 때만 후기 원문 로드
+            with metrics.STAGE_SECONDS.time(stage="db_community_reviews_text"):
+                community_reviews_text = batch_crawler.get_community_reviews_text_from_db(community_db_product_name)
+    else:
+        # DB에 없으면 실시간 크롤링 (Fallback)
+        print(f"   🔄 DB에 없음: 실시간 크롤링 시작...")
+        with metrics.STAGE_SECONDS.time(stage="community_crawl"):
+            community_reviews_result = crawler.crawl_community_reviews(product_name)
+        collected_at.append(int(time.time()))
+        
+        if isinstance(community_reviews_result, tuple):
+            if len(community_reviews_result) == 3:
+                community_reviews_text, community_sources, _ = community_reviews_result
+            else:
+                community_reviews_text, community_sources = community_reviews_result
+        else:
+            community_reviews_text = community_reviews_result
+            community_sources = []
+        
+        community_review_count = 0
+        community_db_product_name = normalized_product_name
+        # 크롤링 성공 시 DB에 저장 (다음 요청을 위해)
+        if community_reviews_text and "가져오지 못했습니다" not in community_reviews_text:
+            # 실제 개수 추출 (리스트에서)
+            community_review_count = product_result.count_reviews(community_reviews_text)
+            batch_crawler.save_community_reviews_to_db(normalized_product_name, community_reviews_text, community_sources, community_review_count)
+        else:
+            community_reviews_text = None
+        cached_analysis = None
+    
+    # 커뮤니티 후기 분석 (캐시 확인)
+    community_summary = None
+    if cached_analysis:
+        print(f"   ⚡ DB에서 커뮤니티 분석 결과 캐시 히트")
+        community_summary = cached_analysis
+    elif community_reviews_text:
+        # 캐시 없으면 AI 분석 수행
+        print(f"   ✅ 커뮤니티 후기 수집 완료, AI 분석 시작...")
+        with metrics.STAGE_SECONDS.time(stage="gemini_community"):
+            community_summary = ai_service.analyze_community_reviews_with_gemini(community_reviews_text)
+        
+        # dict가 아닌 경우 (오류 등) 처리
+        if isinstance(community_summary, str) and community_summary.startswith("❌"):
+            community_summary = None
+        else:
+            # 분석 성공 시 DB에 캐싱
+            if community_summary:
+                batch_crawler.save_community_analysis_to_db(community_db_product_name, community_summary,
+                                                            model=ai_service.last_model_used())
+                print(f"   ✅ 커뮤니티 분석 완료 및 캐시 저장")
+    
+    # 가장 오래된 구성 요소의 수집 시각 (updated_at이 없는 이전 문서가 섞여 있으면 알 수 없으므로 None -> 재수집 예약)
+    result = product_result.build_product_result(
+        youtube_analyses, community_summary, community_review_count, community_sources,
+        data_updated_at=product_result.oldest_timestamp(collected_at),
+        failed_video_ids=failed_video_ids
+    )
+    
+    # 커뮤니티 분석이 있으면 저장 (실패한 영상은 PRODUCT_PARTIAL_MAX_AGE 뒤 재수집에서, 커뮤니티 분석은 다음 요청에서 다시 시도)
+    if community_summary:
+        database.save_product_result_to_db(normalized_product_name, result, version=ai_service.PRODUCT_RESULT_VERSION)
+    
+    return result
+
+
 @app.route('/api/analyze-product', methods=['POST'])
 def analyze_product():
     """
@@ -112,7 +473,8 @@ def analyze_product():
     try:
         # 제품명 정규화 (Fuzzy 매칭으로 실제 존재하는 모델만 반환)
         import product_normalizer
-        normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
+        with metrics.STAGE_SECONDS.time(stage="normalize"):
+            normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
         
         # 정규화 실패 시 에러 반환
         if not normalized_product_name:
@@ -121,211 +483,84 @@ def analyze_product():
         if normalized_product_name != product_name:
             print(f"   → 정규화: {product_name} -> {normalized_product_name}")
         
-        # 1. 유튜브 영상 조회 (DB 우선, 없으면 실시간 검색)
-        print(f"   🔍 유튜브 영상 조회 중...")
-        
-        # DB에서 먼저 조회 시도 (정규화된 이름으로)
-        import batch_crawler
-        youtube_videos_from_db = batch_crawler.get_youtube_videos_from_db(normalized_product_name)
+        # 1~3. 유튜브/커뮤니티 분석 (materialized 결과가 있으면 조회 1회로 끝)
+        with metrics.STAGE_SECONDS.time(stage="db_product_result"):
+            collected = database.get_product_result_from_db(normalized_product_name)
         
-        if youtube_videos_from_db:
-            print(f"   ⚡ DB에서 유튜브 영상 조회 성공 ({len(youtube_videos_from_db)}개)")
-            youtube_videos = youtube_videos_from_db
+        if collected:
+            # fast lane: 조회 1회로 응답
+            print(f"   ⚡ 제품 결과 캐시 히트")
+            metrics.ADMISSIONS.inc(lane="fast", result="admitted")
         else:
-            # DB에 없으면 실시간 검색 (사용자 입력 그대로 사용)
-            print(f"   🔄 DB에 없음: 실시간 검색 시작...")
-            youtube_videos = crawler.search_youtube_top3(product_name)  # 원본 입력 사용
-            
-            # 검색 성공 시 DB에 저장 (정규화된 이름으로 저장)
-            if youtube_videos:
-                batch_crawler.save_youtube_videos_to_db(normalized_product_name, youtube_videos)
+            # slow lane: 구성 요소별 수집 (같은 제품의 동시 요청은 하나의 계산을 공유)
+            try:
+                collected = _collect_in_slow_lane(product_name, normalized_product_name)
+            except LaneFull as e:
+                return _lane_full_response(e)
         
-        if not youtube_videos:
-            return jsonify({"error": "유튜브 영상을 찾을 수 없습니다."}), 404
+        if "error" in collected:
+            return jsonify({"error": collected["error"]}), collected["status_code"]
         
-        print(f"   ✅ {len(youtube_videos)}개 영상 발견")
+        # 오래된 데이터는 그대로 응답하고 백그라운드에서 갱신
+        _schedule_refresh_if_stale(normalized_product_name, collected)
         
-        # 2. 각 영상 분석 (캐시 확인 포함)
-        youtube_analyses = []
-        youtube_summaries = []
+        youtube_summaries = collected["youtube_summaries"]
+        community_summary = collected["community_summary"]
         
-        for video in youtube_videos:
-            video_id = video['id']
-            video_title = video['title']
-            
-            print(f"   📹 영상 분석 중: {video_title[:50]}...")
-            
-            # 캐시 확인
-            cached_result = database.get_review_from_db(video_id)
-            
-            if cached_result:
-                analysis_raw = cached_result.get('analysis', '')
-                # 캐시된 데이터가 JSON 문자열인 경우 파싱
-                import json
-                try:
-                    if isinstance(analysis_raw, str):
-                        analysis = json.loads(analysis_raw)
-                    else:
-                        analysis = analysis_raw
-                except:
-                    analysis = analysis_raw
-                print(f"      ⚡ 캐시 히트")
-            else:
-                # 자막 추출 및 분석
-                script = ai_service.get_youtube_script(video_id)
-                if script.startswith("❌"):
-                    print(f"      ❌ 자막 추출 실패: {script}")
-                    continue
-                
-                analysis = ai_service.analyze_with_gemini(script)
-                if isinstance(analysis, str) and analysis.startswith("❌"):
-                    print(f"      ❌ 분석 실패: {analysis}")
-                    continue
-                
-                # 캐시 저장 (JSON 또는 텍스트 모두 저장 가능)
-                import json
-                if isinstance(analysis, dict):
-                    database.save_review_to_db(video_id, json.dumps(analysis, ensure_ascii=False))
-                else:
-                    database.save_review_to_db(video_id, analysis)
-            
-            # 분석 결과를 구조화된 형태로 저장
-            youtube_analyses.append({
-                "video_id": video_id,
-                "title": video_title,
-                "analysis": analysis  # dict 또는 str
-            })
-            
-            # 구매 가이드 생성을 위한 요약 (텍스트 형태)
-            if isinstance(analysis, dict):
-                summary_text = f"장점: {', '.join(analysis.get('pros', []))}\n단점: {', '.join(analysis.get('cons', []))}"
-            else:
-                summary_text = str(analysis)
-            youtube_summaries.append(summary_text)
+        # 4. 구매 가이드: 이미 완료된 가이드가 있으면 재사용, 없으면 백그라운드에서 비동기 생성
+        guide_entry = purchase_guides.get(normalized_product_name)
         
-        # 3. 커뮤니티 후기 조회 (DB 우선, 없으면 실시간 크롤링)
-        print(f"   🌐 커뮤니티 후기 조회 중...")
-        
-        # DB에서 먼저 조회 시도 (정규화된 이름으로)
-        import batch_crawler
-        # 정규화된 이름으로 DB 조회 (더 정확한 매칭)
-        # 반환값: (reviews_text, sources, analysis_summary)
-        result = batch_crawler.get_community_reviews_from_db(normalized_product_name)
-        
-        if len(result) == 3:
-            community_reviews_text, community_sources, cached_analysis = result
-        else:
-            # 하위 호환성
-            community_reviews_text, community_sources = result[:2]
-            cached_analysis = None
-        
-        if community_reviews_text:
-            print(f"   ⚡ DB에서 커뮤니티 후기 조회 성공 ({len(community_reviews_text.split(chr(10)))}개)")
+        if guide_entry and guide_entry["status"] in ("completed", "processing"):
+            print(f"   ⚡ 구매 가이드 재사용 ({guide_entry['status']})")
         else:
-            # DB에 없으면 실시간 크롤링 (Fallback)
-            print(f"   🔄 DB에 없음: 실시간 크롤링 시작...")
-            community_reviews_result = crawler.crawl_community_reviews(product_name)
+            print(f"   📊 구매 가이드 생성 시작 (백그라운드)...")
             
-            if isinstance(community_reviews_result, tuple):
-                if len(community_reviews_result) == 3:
-                    community_reviews_text, community_sources, _ = community_reviews_result
-                else:
-                    community_reviews_text, community_sources = community_reviews_result
-            else:
-                community_reviews_text = community_reviews_result
-                community_sources = []
+            # 구매 가이드 생성 상태 초기화
+            guide_entry = guide_store.make_entry("processing")
+            _save_guide_entry(normalized_product_name, guide_entry)
             
-            # 크롤링 성공 시 DB에 저장 (다음 요청을 위해)
-            if community_reviews_text and "가져오지 못했습니다" not in community_reviews_text:
-                # 실제 개수 추출 (리스트에서)
-                actual_count = len([line for line in community_reviews_text.split('\n') if line.strip().startswith('[')])
-                batch_crawler.save_community_reviews_to_db(normalized_product_name, community_reviews_text, community_sources, actual_count)
-            cached_analysis = None
-        
-        # 커뮤니티 후기 분석 (캐시 확인)
-        community_summary = None
-        if community_reviews_text and "가져오지 못했습니다" not in community_reviews_text:
-            # 캐시된 분석 결과가 있으면 사용
-            if cached_analysis:
-                print(f"   ⚡ DB에서 커뮤니티 분석 결과 캐시 히트")
-                import json
+            # 백그라운드 작업으로 구매 가이드 생성
+            def generate_guide_async():
                 try:
-                    if isinstance(cached_analysis, str):
-                        community_summary = json.loads(cached_analysis)
-                    else:
-                        community_summary = cached_analysis
-                except:
-                    community_summary = cached_analysis
-            else:
-                # 캐시 없으면 AI 분석 수행
-                print(f"   ✅ 커뮤니티 후기 수집 완료, AI 분석 시작...")
-                community_summary = ai_service.analyze_community_reviews_with_gemini(community_reviews_text)
-                
-                # dict가 아닌 경우 (오류 등) 처리
-                if isinstance(community_summary, str) and community_summary.startswith("❌"):
-                    community_summary = None
-                else:
-                    # 분석 성공 시 DB에 캐싱
-                    if community_summary:
-                        batch_crawler.save_community_analysis_to_db(normalized_product_name, community_summary)
-                        print(f"   ✅ 커뮤니티 분석 완료 및 캐시 저장")
-        else:
-            community_summary = None
-        
-        # 4. 구매 가이드는 백그라운드에서 비동기 생성
-        print(f"   📊 구매 가이드 생성 시작 (백그라운드)...")
-        
-        # 구매 가이드 생성 상태 초기화
-        with purchase_guide_lock:
-            purchase_guide_cache[normalized_product_name] = {"status": "processing"}
-        
-        # 백그라운드 스레드에서 구매 가이드 생성
-        def generate_guide_async():
+                    youtube_combined = "\n\n---\n\n".join(youtube_summaries)
+                    community_text = product_result.summarize_analysis(community_summary) if community_summary else ""
+                    
+                    with metrics.STAGE_SECONDS.time(stage="gemini_guide"):
+                        guide = ai_service.generate_purchase_guide(
+                            youtube_combined,
+                            community_text,
+                            normalized_product_name
+                        )
+                    
+                    # 실패 메시지는 저장소에 완료로 남기지 않음 (다음 요청에서 재시도)
+                    if isinstance(guide, str) and guide.startswith("❌"):
+                        raise RuntimeError(guide)
+                    
+                    # 결과 저장
+                    _save_guide_entry(normalized_product_name, guide_store.make_entry("completed", guide=guide))
+                    print(f"   ✅ 구매 가이드 생성 완료: {normalized_product_name}")
+                except Exception as e:
+                    print(f"   ❌ 구매 가이드 생성 실패: {str(e)}")
+                    _save_guide_entry(normalized_product_name, guide_store.make_entry("error", error=str(e)))
+            
+            # 작업 실행기에 제출 (같은 제품의 작업이 이미 대기/실행 중이면 재사용)
             try:
-                youtube_combined = "\n\n---\n\n".join(youtube_summaries)
-                community_text = ""
-                if isinstance(community_summary, dict):
-                    community_text = f"장점: {', '.join(community_summary.get('pros', []))}\n단점: {', '.join(community_summary.get('cons', []))}"
-                elif community_summary:
-                    community_text = str(community_summary)
-                
-                guide = ai_service.generate_purchase_guide(
-                    youtube_combined,
-                    community_text,
-                    normalized_product_name
-                )
-                
-                # 결과 저장
-                with purchase_guide_lock:
-                    purchase_guide_cache[normalized_product_name] = {
-                        "status": "completed",
-                        "guide": guide
-                    }
-                print(f"   ✅ 구매 가이드 생성 완료: {normalized_product_name}")
-            except Exception as e:
-                print(f"   ❌ 구매 가이드 생성 실패: {str(e)}")
-                with purchase_guide_lock:
-                    purchase_guide_cache[normalized_product_name] = {
-                        "status": "error",
-                        "error": str(e)
-                    }
-        
-        # 백그라운드 스레드 시작
-        guide_thread = threading.Thread(target=generate_guide_async, daemon=True)
-        guide_thread.start()
+                guide_jobs.submit(normalized_product_name, generate_guide_async)
+            except JobQueueFull as e:
+                print(f"   ⚠️ 구매 가이드 작업 거부: {str(e)}")
+                guide_entry = guide_store.make_entry("error", error="요청이 많아 구매 가이드를 생성하지 못했습니다. 잠시 후 다시 시도해주세요.")
+                _save_guide_entry(normalized_product_name, guide_entry)
         
-        # 5. 결과 반환 (구매 가이드 제외)
-        return jsonify({
+        # 5. 결과 반환 (완료된 가이드가 있을 때만 포함)
+        response = {
             "product_name": product_name,
-            "youtube_reviews": youtube_analyses,
-            "community_reviews": {
-                "summary": community_summary,  # dict 또는 None
-                "raw_count": len(community_reviews_text.split('\n')) if community_reviews_text else 0,
-                "source": ", ".join(community_sources) if community_sources else "수집 실패",
-                "note": "클리앙과 뽐뿌 커뮤니티에서 직접 수집한 신뢰할 수 있는 사용자 후기입니다."
-            },
-            "purchase_guide_status": "processing"  # 구매 가이드는 별도 엔드포인트로 확인
-        })
+            "youtube_reviews": collected["youtube_reviews"],
+            "community_reviews": collected["community_reviews"],
+            "purchase_guide_status": guide_entry["status"]  # processing이면 별도 엔드포인트로 확인
+        }
+        if guide_entry["status"] == "completed":
+            response["purchase_guide"] = guide_entry["guide"]
+        return jsonify(response)
         
     except Exception as e:
         print(f"   ❌ 오류 발생: {str(e)}")
@@ -353,30 +588,108 @@ def get_purchase_guide(product_name):
             "error": f"'{product_name}'에 해당하는 제품을 찾을 수 없습니다."
         }), 404
     
-    with purchase_guide_lock:
-        cached = purchase_guide_cache.get(normalized_product_name)
+    cached = purchase_guides.get(normalized_product_name)
+    body, status_code = guide_store.status_response(cached)
+    return jsonify(body), status_code
+
+
+@app.route('/api/purchase-guide/<product_name>', methods=['DELETE'])
+def cancel_purchase_guide(product_name):
+    """
+    대기 중인 구매 가이드 생성 작업 취소 (이미 실행 중인 작업은 끝까지 진행됨)
     
-    if not cached:
-        return jsonify({
-            "status": "not_started",
-            "message": "구매 가이드 생성이 시작되지 않았습니다."
-        }), 404
+    Response:
+    {
+        "cancelled": true | false
+    }
+    """
+    import product_normalizer
+    normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
     
-    if cached["status"] == "processing":
-        return jsonify({
-            "status": "processing",
-            "message": "구매 가이드를 생성 중입니다..."
-        })
-    elif cached["status"] == "completed":
+    if not normalized_product_name:
+        return jsonify({"error": f"'{product_name}'에 해당하는 제품을 찾을 수 없습니다."}), 404
+    
+    cancelled = guide_jobs.cancel(normalized_product_name)
+    if cancelled:
+        # processing 상태를 지워서 다음 요청에서 다시 생성되도록 함
+        purchase_guides.delete(normalized_product_name)
+        guide_events.publish(normalized_product_name, None)
+    
+    return jsonify({"cancelled": cancelled})
+
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def get_job_stats():
+    """백그라운드 작업 실행기(구매 가이드, 재수집), slow lane, DB L1 캐시, Gemini 모델 목록/스케줄러/응답 캐시 상태"""
+    return jsonify({
+        "guide": guide_jobs.stats(),
+        "refresh": refresh_jobs.stats(),
+        "slow_lane": slow_lane.stats(),
+        "db_cache": database.cache_stats(),
+        "gemini_models": ai_service.model_registry.stats(),
+        "gemini_scheduler": ai_service.scheduler.stats(),
+        "llm_cache": ai_service.response_cache.stats()
+    })
+
+
+@app.route('/api/purchase-guide/<product_name>/stream', methods=['GET'])
+def stream_purchase_guide(product_name):
+    """
+    구매 가이드 상태 변경 스트림 (Server-Sent Events)
+    
+    연결 즉시 현재 상태를 보내고, 생성이 끝나면 최종 결과(completed/error)를 보낸 뒤 연결을 닫습니다.
+    각 이벤트의 data는 GET /api/purchase-guide/<product_name> 응답과 같은 JSON입니다.
+    
+    제품명 정규화는 연결당 한 번만 수행합니다.
+    gevent로 실행 중이 아니면 연결마다 스레드를 점유하게 되므로 503을 반환합니다 (클라이언트는 폴링으로 전환).
+    """
+    if not green_threads_enabled():
         return jsonify({
-            "status": "completed",
-            "guide": cached["guide"]
-        })
-    else:  # error
+            "status": "error",
+            "error": "SSE 스트림은 gevent 서버(python app.py 또는 gunicorn -k gevent)에서만 제공됩니다. "
+                     "GET /api/purchase-guide/<product_name>으로 조회해주세요."
+        }), 503
+    
+    import product_normalizer
+    normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
+    
+    if not normalized_product_name:
         return jsonify({
             "status": "error",
-            "error": cached.get("error", "알 수 없는 오류")
-        }), 500
+            "error": f"'{product_name}'에 해당하는 제품을 찾을 수 없습니다."
+        }), 404
+    
+    def format_event(body):
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+    
+    def generate():
+        # 구독은 스트림을 보내기 시작할 때 (응답을 보내기 전에 연결이 끊기면 generate가 실행되지 않아 구독이 남지 않음)
+        # 상태 조회 전에 구독해야 그 사이에 끝난 생성 결과를 놓치지 않음
+        events = guide_events.subscribe(normalized_product_name)
+        try:
+            body, _ = guide_store.status_response(purchase_guides.get(normalized_product_name))
+            yield format_event(body)
+            
+            deadline = time.monotonic() + GUIDE_STREAM_TIMEOUT
+            while body["status"] == "processing" and time.monotonic() < deadline:
+                try:
+                    entry = events.get(timeout=GUIDE_STREAM_KEEPALIVE)
+                except queue.Empty:
+                    # 다른 워커에서 생성이 끝났을 수 있으므로 공유 저장소 재확인
+                    entry = purchase_guides.get(normalized_product_name)
+                    if not entry or entry["status"] == "processing":
+                        yield ": keep-alive\n\n"
+                        continue
+                
+                body, _ = guide_store.status_response(entry)
+                yield format_event(body)
+        finally:
+            guide_events.unsubscribe(normalized_product_name, events)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # 프록시(nginx 등) 버퍼링 비활성화
+    })
 
 
 if __name__ == '__main__':
@@ -385,4 +698,8 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
-    app.run(debug=debug_mode, host='0.0.0.0', port=port, use_reloader=False)
\ No newline at end of file
+    # gevent WSGI 서버: SSE 연결과 백그라운드 작업이 greenlet으로 실행됨
+    from gevent.pywsgi import WSGIServer
+    app.debug = debug_mode
+    print(f"🚀 서버 시작 (gevent): http://0.0.0.0:{port}")
+    WSGIServer(('0.0.0.0', port), app).serve_forever()
\ No newline at end of file
@@ -0,0 +1,376 @@
+"""
+ASGI 버전 API 서버 (Quart)
+
+app.py와 같은 엔드포인트/응답 형식을 제공하지만, 모든 I/O를 비동기로 처리합니다.
+- MongoDB: motor (async_database.py)
+- 커뮤니티/유튜브 검색: httpx 비동기 클라이언트 (async_crawler.py)
+- Gemini: generate_content_async (ai_service.*_async)
+
+요청 하나가 크롤링/LLM 응답을 기다리는 동안 워커를 점유하지 않으므로
+프로세스 하나로 수천 개의 진행 중 요청을 처리할 수 있습니다.
+
+실행:
+    hypercorn asgi:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import contextlib
+import os
+import time
+
+import httpx
+from quart import Quart, request, jsonify, g
+from quart_cors import cors
+
+import ai_service
+import async_crawler
+import async_database
+import guide_store
+import metrics
+import product_normalizer
+import product_result
+import transcript_store
+from singleflight import AsyncSingleFlight
+
+app = cors(Quart(__name__))
+
+# 영상 분석 동시 실행 개수 (요청당)
+VIDEO_ANALYSIS_WORKERS = int(os.environ.get('VIDEO_ANALYSIS_WORKERS', 3))
+
+# 구매 가이드 동시 생성 개수 (프로세스 전체)
+GUIDE_JOB_WORKERS = int(os.environ.get('GUIDE_JOB_WORKERS', 4))
+
+# 캐시 미스 시 같은 제품/영상에 대한 동시 계산을 하나로 합침
+product_flight = AsyncSingleFlight("product")
+video_flight = AsyncSingleFlight("video")
+
+# before_serving에서 초기화 (이벤트 루프가 필요함)
+http_client = None
+purchase_guides = None
+transcripts = None
+guide_semaphore = None
+guide_tasks = {}  # 정규화된 제품명 -> 진행 중인 구매 가이드 생성 Task
+
+
+@app.before_serving
+async def startup():
+    global http_client, purchase_guides, transcripts, guide_semaphore
+    http_client = httpx.AsyncClient(timeout=async_crawler.CRAWL_TIMEOUT, follow_redirects=True)
+    purchase_guides = guide_store.create_async_guide_store(
+        async_database.get_collection(guide_store.GUIDE_COLLECTION_NAME)
+    )
+    transcripts = transcript_store.AsyncMongoTranscriptStore(
+        async_database.get_collection(transcript_store.TRANSCRIPT_COLLECTION_NAME)
+    )
+    guide_semaphore = asyncio.Semaphore(GUIDE_JOB_WORKERS)
+
+
+@app.after_serving
+async def shutdown():
+    for task in list(guide_tasks.values()):
+        task.cancel()
+    await http_client.aclose()
+    async_database.close()
+
+
+@app.before_request
+async def _start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+
+@app.after_request
+async def _record_request_latency(response):
+    """app._record_request_latency와 같은 지표 (두 배포의 지연 시간을 같은 이름으로 비교)"""
+    started_at = getattr(g, 'request_started_at', None)
+    if started_at is not None:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            endpoint=request.endpoint or 'unknown',
+            status=response.status_code
+        )
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+async def get_metrics():
+    """Prometheus 텍스트 형식 지표 (app.get_metrics와 동일)"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
+@app.route('/')
+async def home():
+    return "AI 리뷰 분석 서버가 정상 작동 중입니다! 🚀 (ASGI)"
+
+
+@app.route('/api/analyze', methods=['POST'])
+async def analyze_video():
+    """app.analyze_video의 비동기 버전"""
+    data = await request.get_json()
+    video_id = data.get('video_id')
+
+    if not video_id:
+        return jsonify({"error": "video_id가 필요합니다."}), 400
+
+    print(f"📡 요청 수신: 비디오 ID [{video_id}] 분석 시작...")
+
+    cached_result = await async_database.get_review_from_db(video_id, version=ai_service.VIDEO_ANALYSIS_VERSION)
+    if cached_result:
+        return jsonify({
+            "video_id": video_id,
+            "analysis": cached_result.get('analysis', ''),
+            "cached": True
+        })
+
+    script = await transcript_store.get_youtube_script_async(video_id, transcripts)
+    if script.startswith("❌"):
+        return jsonify({"error": script}), 500
+
+    result = await ai_service.analyze_with_gemini_async(script)
+    if isinstance(result, str) and result.startswith("❌"):
+        return jsonify({"error": result}), 500
+
+    await async_database.save_review_to_db(
+        video_id, result, version=ai_service.VIDEO_ANALYSIS_VERSION, model=ai_service.last_model_used()
+    )
+
+    return jsonify({
+        "video_id": video_id,
+        "analysis": result,
+        "cached": False
+    })
+
+
+async def _analyze_single_video(video):
+    """캐시에 없는 영상 1개 분석 (자막 추출 → Gemini 분석) -> (분석 결과, 모델 이름), 실패 시 None"""
+    video_id = video['id']
+
+    with metrics.STAGE_SECONDS.time(stage="transcript"):
+        script = await transcript_store.get_youtube_script_async(video_id, transcripts)
+    if script.startswith("❌"):
+        print(f"      ❌ 자막 추출 실패: {script}")
+        return None
+
+    with metrics.STAGE_SECONDS.time(stage="gemini_video"):
+        analysis = await ai_service.analyze_with_gemini_async(script)
+    if isinstance(analysis, str) and analysis.startswith("❌"):
+        print(f"      ❌ 분석 실패: {analysis}")
+        return None
+
+    # 사용한 모델은 이 Task의 컨텍스트에만 남으므로 결과와 함께 반환
+    return analysis, ai_service.last_model_used()
+
+
+async def _collect_product_analysis(product_name, normalized_product_name):
+    """app._collect_product_analysis의 비동기 버전 (단계별 소요 시간도 같은 stage 이름으로 기록)"""
+    # 1. 유튜브 영상 조회 (DB 우선, 없으면 실시간 검색)
+    with metrics.STAGE_SECONDS.time(stage="db_youtube_videos"):
+        youtube_videos_meta = await async_database.get_youtube_videos_meta_from_db(normalized_product_name)
+    youtube_videos = youtube_videos_meta['videos'] if youtube_videos_meta else None
+    # 구성 요소별 수집 시각 (DB 문서의 updated_at, 지금 수집했으면 현재 시각)
+    collected_at = [youtube_videos_meta['updated_at']] if youtube_videos else []
+    if not youtube_videos:
+        with metrics.STAGE_SECONDS.time(stage="youtube_search"):
+            youtube_videos = await async_crawler.search_youtube_top3_async(product_name)
+        collected_at.append(int(time.time()))
+        if youtube_videos:
+            await async_database.save_youtube_videos_to_db(normalized_product_name, youtube_videos)
+
+    if not youtube_videos:
+        return {"error": "유튜브 영상을 찾을 수 없습니다.", "status_code": 404}
+
+    # 2. 캐시는 $in 조회 1회로 확인하고, 캐시 미스 영상만 동시에 분석 (gather는 입력 순서대로 결과를 반환)
+    with metrics.STAGE_SECONDS.time(stage="db_reviews"):
+        cached_reviews = await async_database.get_reviews_from_db(
+            [video['id'] for video in youtube_videos], version=ai_service.VIDEO_ANALYSIS_VERSION
+        )
+    semaphore = asyncio.Semaphore(VIDEO_ANALYSIS_WORKERS)
+
+    async def analyze(video):
+        cached_result = cached_reviews.get(video['id'])
+        if cached_result:
+            return cached_result.get('analysis', ''), None
+        async with semaphore:
+            return await video_flight.do(video['id'], lambda: _analyze_single_video(video))
+
+    # app과 같이 캐시 미스 영상이 있을 때만 전체 분석 시간 기록
+    missing = any(video['id'] not in cached_reviews for video in youtube_videos)
+    with metrics.STAGE_SECONDS.time(stage="videos_total") if missing else contextlib.nullcontext():
+        outcomes = await asyncio.gather(*(analyze(video) for video in youtube_videos))
+    video_results = [outcome[0] if outcome else None for outcome in outcomes]
+
+    # 새 분석 결과 일괄 저장 (bulk_write 1회, 분석 버전/모델 태그 포함)
+    new_analyses = {}
+    models = {}
+    for video, outcome in zip(youtube_videos, outcomes):
+        if outcome is not None and video['id'] not in cached_reviews:
+            new_analyses[video['id']], models[video['id']] = outcome
+    await async_database.save_reviews_to_db(new_analyses, version=ai_service.VIDEO_ANALYSIS_VERSION, models=models)
+
+    youtube_analyses = [
+        {"video_id": video['id'], "title": video['title'], "analysis": analysis}
+        for video, analysis in zip(youtube_videos, video_results)
+        if analysis is not None
+    ]
+    failed_video_ids = [video['id'] for video, analysis in zip(youtube_videos, video_results) if analysis is None]
+
+    # 3. 커뮤니티 후기 조회 (DB 우선, 없으면 실시간 크롤링) - 후기 원문은 분석을 새로 할 때만 로드
+    community_reviews_text = None
+    with metrics.STAGE_SECONDS.time(stage="db_community_reviews"):
+        community_meta = await async_database.get_community_reviews_meta_from_db(
+            normalized_product_name, version=ai_service.COMMUNITY_ANALYSIS_VERSION
+        )
+
+    if community_meta:
+        collected_at.append(community_meta['updated_at'])
+        community_sources = community_meta['sources']
+        community_review_count = community_meta['review_count']
+        cached_analysis = community_meta['analysis_summary']
+        community_db_product_name = community_meta['product_name']
+        if not cached_analysis:
+            with metrics.STAGE_SECONDS.time(stage="db_community_reviews_text"):
+                community_reviews_text = await async_database.get_community_reviews_text_from_db(
+                    community_db_product_name
+                )
+    else:
+        with metrics.STAGE_SECONDS.time(stage="community_crawl"):
+            community_reviews_text, community_sources, community_review_count = \
+                await async_crawler.crawl_community_reviews_async(product_name, client=http_client)
+        collected_at.append(int(time.time()))
+        community_db_product_name = normalized_product_name
+        if community_reviews_text and "가져오지 못했습니다" not in community_reviews_text:
+            await async_database.save_community_reviews_to_db(
+                normalized_product_name, community_reviews_text, community_sources, community_review_count
+            )
+        else:
+            community_reviews_text = None
+            community_review_count = 0
+        cached_analysis = None
+
+    community_summary = None
+    if cached_analysis:
+        community_summary = cached_analysis
+    elif community_reviews_text:
+        with metrics.STAGE_SECONDS.time(stage="gemini_community"):
+            community_summary = await ai_service.analyze_community_reviews_with_gemini_async(community_reviews_text)
+        if isinstance(community_summary, str) and community_summary.startswith("❌"):
+            community_summary = None
+        elif community_summary:
+            await async_database.save_community_analysis_to_db(
+                community_db_product_name, community_summary,
+                version=ai_service.COMMUNITY_ANALYSIS_VERSION, model=ai_service.last_model_used()
+            )
+
+    result = product_result.build_product_result(
+        youtube_analyses, community_summary, community_review_count, community_sources,
+        data_updated_at=product_result.oldest_timestamp(collected_at),
+        failed_video_ids=failed_video_ids
+    )
+    # 자막이 없는 등 분석에 실패한 영상은 빼고 저장 (다시 시도는 batch_crawler 실행 때)
+    if community_summary:
+        await async_database.save_product_result_to_db(
+            normalized_product_name, result, version=ai_service.PRODUCT_RESULT_VERSION
+        )
+    return result
+
+
+async def _generate_guide(normalized_product_name, youtube_summaries, community_summary):
+    """구매 가이드 생성 후 저장 (GUIDE_JOB_WORKERS개까지 동시 실행)"""
+    async with guide_semaphore:
+        try:
+            youtube_combined = "\n\n---\n\n".join(youtube_summaries)
+            community_text = product_result.summarize_analysis(community_summary) if community_summary else ""
+
+            with metrics.STAGE_SECONDS.time(stage="gemini_guide"):
+                guide = await ai_service.generate_purchase_guide_async(
+                    youtube_combined,
+                    community_text,
+                    normalized_product_name
+                )
+            if isinstance(guide, str) and guide.startswith("❌"):
+                raise RuntimeError(guide)
+
+            await purchase_guides.set(normalized_product_name, guide_store.make_entry("completed", guide=guide))
+            print(f"   ✅ 구매 가이드 생성 완료: {normalized_product_name}")
+        except Exception as e:
+            print(f"   ❌ 구매 가이드 생성 실패: {str(e)}")
+            await purchase_guides.set(normalized_product_name, guide_store.make_entry("error", error=str(e)))
+
+
+@app.route('/api/analyze-product', methods=['POST'])
+async def analyze_product():
+    """app.analyze_product의 비동기 버전 (응답 형식 동일)"""
+    data = await request.get_json()
+    product_name = data.get('product_name')
+
+    if not product_name:
+        return jsonify({"error": "product_name이 필요합니다."}), 400
+
+    print(f"📡 요청 수신: 제품명 [{product_name}] 종합 분석 시작... (ASGI)")
+
+    try:
+        with metrics.STAGE_SECONDS.time(stage="normalize"):
+            normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
+        if not normalized_product_name:
+            return jsonify({"error": f"'{product_name}'에 해당하는 제품을 찾을 수 없습니다."}), 404
+
+        # materialized 결과가 있으면 조회 1회로 끝
+        with metrics.STAGE_SECONDS.time(stage="db_product_result"):
+            collected = await async_database.get_product_result_from_db(
+                normalized_product_name, version=ai_service.PRODUCT_RESULT_VERSION
+            )
+        if not collected:
+            collected = await product_flight.do(
+                normalized_product_name,
+                lambda: _collect_product_analysis(product_name, normalized_product_name)
+            )
+
+        if "error" in collected:
+            return jsonify({"error": collected["error"]}), collected["status_code"]
+
+        # 구매 가이드: 완료/진행 중이면 재사용, 없으면 백그라운드 Task로 생성 (제품별 1개)
+        guide_entry = await purchase_guides.get(normalized_product_name)
+        if not (guide_entry and guide_entry["status"] in ("completed", "processing")):
+            guide_entry = guide_store.make_entry("processing")
+            await purchase_guides.set(normalized_product_name, guide_entry)
+
+            if normalized_product_name not in guide_tasks:
+                task = asyncio.create_task(_generate_guide(
+                    normalized_product_name,
+                    collected["youtube_summaries"],
+                    collected["community_summary"]
+                ))
+                guide_tasks[normalized_product_name] = task
+                task.add_done_callback(lambda _: guide_tasks.pop(normalized_product_name, None))
+
+        response = {
+            "product_name": product_name,
+            "youtube_reviews": collected["youtube_reviews"],
+            "community_reviews": collected["community_reviews"],
+            "purchase_guide_status": guide_entry["status"]
+        }
+        if guide_entry["status"] == "completed":
+            response["purchase_guide"] = guide_entry["guide"]
+        return jsonify(response)
+
+    except Exception as e:
+        print(f"   ❌ 오류 발생: {str(e)}")
+        return jsonify({"error": f"분석 중 오류가 발생했습니다: {str(e)}"}), 500
+
+
+@app.route('/api/purchase-guide/<product_name>', methods=['GET'])
+async def get_purchase_guide(product_name):
+    """app.get_purchase_guide의 비동기 버전"""
+    normalized_product_name = product_normalizer.normalize_product_name(product_name, use_fuzzy_matching=True)
+
+    if not normalized_product_name:
+        return jsonify({
+            "status": "error",
+            "error": f"'{product_name}'에 해당하는 제품을 찾을 수 없습니다."
+        }), 404
+
+    body, status_code = guide_store.status_response(await purchase_guides.get(normalized_product_name))
+    return jsonify(body), status_code
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port)
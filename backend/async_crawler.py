@@ -0,0 +1,115 @@
+"""
+비동기 크롤러: crawler.py와 같은 검색어/파싱 로직을 쓰되 HTTP 요청을 비동기로 동시에 보냄
+
+- 유튜브 검색: youtubesearchpython.__future__ (httpx 기반 비동기 API)
+- 커뮤니티 크롤링: httpx.AsyncClient로 소스 x 검색 변형별 페이지를 동시에 받아온 뒤
+  crawler.crawl_*(keyword, html=...)로 파싱
+"""
+import asyncio
+import os
+
+import httpx
+from youtubesearchpython.__future__ import VideosSearch
+
+import crawler
+import metrics
+
+# 커뮤니티 페이지 동시 요청 수
+CRAWL_CONCURRENCY = int(os.environ.get('CRAWL_CONCURRENCY', 8))
+CRAWL_TIMEOUT = 10
+
+
+async def _search_youtube(search_query):
+    """검색어 1개로 유튜브 검색 (실패 시 빈 리스트)"""
+    try:
+        result = await VideosSearch(search_query, limit=10).next()
+        return result['result']
+    except Exception:
+        return []
+
+
+async def search_youtube_top3_async(keyword):
+    """crawler.search_youtube_top3의 비동기 버전 (검색어별 요청을 동시에 실행)"""
+    try:
+        normalized_keyword, search_queries = crawler.youtube_search_queries(keyword)
+
+        results = await asyncio.gather(*(_search_youtube(q) for q in search_queries))
+
+        all_videos = []
+        seen_video_ids = set()
+        for videos in results:
+            for video in videos:
+                if video['id'] not in seen_video_ids:
+                    all_videos.append(video)
+                    seen_video_ids.add(video['id'])
+
+        if not all_videos:
+            # 기본 검색어로 한 번 더 시도
+            all_videos = await _search_youtube(f"{normalized_keyword} review")
+
+        return crawler.pick_top_videos(all_videos)
+
+    except Exception as e:
+        print(f"❌ 유튜브 검색 실패: {e}")
+        metrics.UPSTREAM_ERRORS.inc(upstream="youtube_search")
+        return []
+
+
+async def _crawl_source_page(client, semaphore, label, crawl_fn, request_fn, variation):
+    """소스 1개 x 검색 변형 1개의 페이지를 받아와 파싱"""
+    try:
+        url, headers = request_fn(variation)
+        async with semaphore:
+            res = await client.get(url, headers=headers)
+        res.raise_for_status()
+    except Exception as e:
+        print(f"   ⚠️ {label} 크롤링 실패: {str(e)}")
+        metrics.UPSTREAM_ERRORS.inc(upstream=crawl_fn.__name__[len('crawl_'):])
+        return []
+    return crawl_fn(variation, html=res.text)
+
+
+async def crawl_community_reviews_async(keyword, client=None):
+    """
+    crawler.crawl_community_reviews의 비동기 버전
+
+    Args:
+        keyword (str): 제품명
+        client (httpx.AsyncClient): 재사용할 HTTP 클라이언트 (없으면 요청 동안만 생성)
+
+    Returns:
+        tuple: (후기 텍스트, 소스 리스트, 실제 후기 개수)
+    """
+    import product_normalizer
+
+    normalized_keyword = product_normalizer.normalize_product_name(keyword)
+    search_variations = product_normalizer.get_product_variations(normalized_keyword)
+
+    print(f"   📝 검색 변형: {', '.join(search_variations[:3])}... (async)")
+
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=CRAWL_TIMEOUT, follow_redirects=True)
+
+    try:
+        semaphore = asyncio.Semaphore(CRAWL_CONCURRENCY)
+        plan = crawler.community_crawl_plan(normalized_keyword)
+
+        # 모든 소스 x 검색 변형 요청을 한 번에 실행
+        tasks = []
+        for label, crawl_fn, request_fn, variation_count in plan:
+            tasks.append(asyncio.gather(*(
+                _crawl_source_page(client, semaphore, label, crawl_fn, request_fn, variation)
+                for variation in search_variations[:variation_count]
+            )))
+        results = await asyncio.gather(*tasks)
+
+        source_results = [(label, list(variation_reviews)) for (label, *_), variation_reviews in zip(plan, results)]
+        return crawler.merge_community_reviews(source_results)
+
+    except Exception as e:
+        print(f"   ❌ 커뮤니티 크롤링 실패: {str(e)}")
+        return "커뮤니티 리뷰를 가져오지 못했습니다.", [], 0
+    finally:
+        if owns_client:
+            await client.aclose()
@@ -0,0 +1,361 @@
+"""
+비동기 MongoDB 접근 계층 (motor)
+
+ASGI 앱(asgi.py)에서 사용하며, database.py / batch_crawler.py의 조회·저장 함수와
+같은 컬렉션과 문서 형식을 사용합니다.
+
+ASGI 버전은 MongoDB 전용입니다. STORAGE_BACKEND=sqlite이면 Flask 앱과 다른 데이터를 읽게 되므로
+모듈을 불러올 때 바로 오류를 발생시킵니다 (sqlite 백엔드는 python app.py로 실행).
+"""
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+import product_normalizer
+import product_result
+
+# 환경변수 로드 (backend 폴더와 루트 폴더 모두 확인)
+load_dotenv()
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo').lower()
+if STORAGE_BACKEND != 'mongo':
+    raise RuntimeError(
+        f"ASGI 앱(asgi.py)은 MongoDB 전용입니다 (STORAGE_BACKEND={STORAGE_BACKEND}). "
+        "sqlite 백엔드는 Flask 앱(python app.py)으로 실행하세요."
+    )
+
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
+COLLECTION_NAME = os.getenv('MONGODB_COLLECTION', 'reviews')
+# 버전 태그가 없는 이전 분석 결과의 버전 (database.LEGACY_ANALYSIS_VERSION과 동일)
+LEGACY_ANALYSIS_VERSION = "v1"
+
+# 클라이언트는 첫 사용 시 생성 (이벤트 루프가 뜬 뒤에 만들어야 함)
+_client = None
+
+
+def get_client():
+    """프로세스 공용 비동기 MongoDB 클라이언트"""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
+    return _client
+
+
+def get_collection(name):
+    return get_client()[DATABASE_NAME][name]
+
+
+def close():
+    """클라이언트 종료 (앱 종료 시)"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _is_current_version(document, version, field='analysis_version'):
+    """database.is_current_version과 동일"""
+    return version is None or document.get(field, LEGACY_ANALYSIS_VERSION) == version
+
+
+def _analysis_document(video_id, analysis_result, version, model, current_timestamp):
+    """database._analysis_document와 같은 형식의 reviews 문서"""
+    document = {
+        'video_id': video_id,
+        'analysis': analysis_result,
+        'created_at': current_timestamp,
+        'updated_at': current_timestamp,
+        'cached_at': datetime.utcnow()
+    }
+    if version is not None:
+        document['analysis_version'] = version
+    if model is not None:
+        document['model'] = model
+    return document
+
+
+async def get_review_from_db(video_id, version=None):
+    """database.get_review_from_db의 비동기 버전"""
+    try:
+        result = await get_collection(COLLECTION_NAME).find_one({'video_id': video_id}, {'_id': 0})
+        if result and not _is_current_version(result, version):
+            result = None  # 이전 버전 분석 결과는 캐시 미스
+        if result:
+            print(f"   ✅ 캐시 히트: [{video_id}]")
+        else:
+            print(f"   ❌ 캐시 미스: [{video_id}]")
+        return result
+    except Exception as e:
+        print(f"   ⚠️ 데이터베이스 조회 오류: {str(e)}")
+        return None
+
+
+async def save_review_to_db(video_id, analysis_result, version=None, model=None):
+    """database.save_review_to_db의 비동기 버전"""
+    try:
+        current_timestamp = int(datetime.now().timestamp())
+        await get_collection(COLLECTION_NAME).update_one(
+            {'video_id': video_id},
+            {'$set': _analysis_document(video_id, analysis_result, version, model, current_timestamp)},
+            upsert=True
+        )
+        print(f"   ✅ 캐시 저장 완료: [{video_id}]")
+        return True
+    except Exception as e:
+        print(f"   ⚠️ 데이터베이스 저장 오류: {str(e)}")
+        return False
+
+
+async def get_reviews_from_db(video_ids, version=None):
+    """database.get_reviews_from_db의 비동기 버전 (다른 버전 분석 결과는 캐시 미스)"""
+    if not video_ids:
+        return {}
+    try:
+        cursor = get_collection(COLLECTION_NAME).find({'video_id': {'$in': list(video_ids)}}, {'_id': 0})
+        results = {doc['video_id']: doc async for doc in cursor if _is_current_version(doc, version)}
+        print(f"   ✅ 캐시 일괄 조회: {len(results)}/{len(video_ids)}개 히트")
+        return results
+    except Exception as e:
+        print(f"   ⚠️ 데이터베이스 조회 오류: {str(e)}")
+        return {}
+
+
+async def save_reviews_to_db(analysis_results, version=None, models=None):
+    """database.save_reviews_to_db의 비동기 버전"""
+    if not analysis_results:
+        return True
+    models = models or {}
+    try:
+        current_timestamp = int(datetime.now().timestamp())
+        operations = [
+            UpdateOne(
+                {'video_id': video_id},
+                {'$set': _analysis_document(
+                    video_id, analysis_result, version, models.get(video_id), current_timestamp
+                )},
+                upsert=True
+            )
+            for video_id, analysis_result in analysis_results.items()
+        ]
+        await get_collection(COLLECTION_NAME).bulk_write(operations, ordered=False)
+        print(f"   ✅ 캐시 일괄 저장 완료: {len(operations)}개")
+        return True
+    except Exception as e:
+        print(f"   ⚠️ 데이터베이스 저장 오류: {str(e)}")
+        return False
+
+
+async def _find_product_document(collection, product_name, projection=None):
+    """batch_crawler._find_product_document의 비동기 버전 (product_name -> normalized_key 순서로 인덱스 조회)"""
+    normalized_name = product_normalizer.normalize_product_name(product_name)
+    result = await collection.find_one({'product_name': normalized_name}, projection)
+    if result:
+        return result
+
+    result = await collection.find_one({'normalized_key': product_normalizer.normalized_key(normalized_name)}, projection)
+    if result:
+        return result
+
+    # normalized_key가 없는 이전 문서만 유사 제품명 검색
+    legacy_products = [
+        p['product_name'] async for p in collection.find({'normalized_key': {'$exists': False}}, {'product_name': 1})
+    ]
+    similar_product = product_normalizer.find_similar_product_in_db(product_name, legacy_products) if legacy_products else None
+    if similar_product:
+        print(f"   🔍 유사 제품명 발견: '{product_name}' -> '{similar_product}'")
+        return await collection.find_one({'product_name': similar_product}, projection)
+    return None
+
+
+async def get_youtube_videos_meta_from_db(product_name):
+    """batch_crawler.get_youtube_videos_meta_from_db의 비동기 버전"""
+    try:
+        result = await _find_product_document(get_collection('youtube_videos'), product_name)
+        if not result:
+            return None
+        return {
+            'product_name': result['product_name'],
+            'videos': result.get('videos', []),
+            'updated_at': result.get('updated_at')
+        }
+    except Exception as e:
+        print(f"   ⚠️ 유튜브 영상 DB 조회 실패: {str(e)}")
+        return None
+
+
+async def get_youtube_videos_from_db(product_name):
+    """batch_crawler.get_youtube_videos_from_db의 비동기 버전"""
+    meta = await get_youtube_videos_meta_from_db(product_name)
+    return meta['videos'] if meta else None
+
+
+async def save_youtube_videos_to_db(product_name, videos_data):
+    """batch_crawler.save_youtube_videos_to_db의 비동기 버전"""
+    try:
+        current_timestamp = int(datetime.now().timestamp())
+        await get_collection('youtube_videos').update_one(
+            {'product_name': product_name},
+            {'$set': {
+                'product_name': product_name,
+                'normalized_key': product_normalizer.normalized_key(product_name),
+                'videos': videos_data,
+                'video_count': len(videos_data),
+                'created_at': current_timestamp,
+                'updated_at': current_timestamp
+            }},
+            upsert=True
+        )
+        print(f"   ✅ 유튜브 영상 DB 저장 완료: {product_name} ({len(videos_data)}개 영상)")
+        await delete_product_result_from_db(product_name)
+        return True
+    except Exception as e:
+        print(f"   ❌ 유튜브 영상 DB 저장 실패: {str(e)}")
+        return False
+
+
+# 후기 원문(reviews_text)을 제외한 가벼운 필드 (batch_crawler.COMMUNITY_META_FIELDS와 동일)
+COMMUNITY_META_PROJECTION = {
+    '_id': 0, 'product_name': 1, 'sources': 1, 'review_count': 1, 'analysis_summary': 1, 'analysis_version': 1,
+    'updated_at': 1
+}
+
+
+async def get_community_reviews_meta_from_db(product_name, version=None):
+    """batch_crawler.get_community_reviews_meta_from_db의 비동기 버전 (후기 원문 제외)"""
+    try:
+        result = await _find_product_document(
+            get_collection('community_reviews'), product_name, COMMUNITY_META_PROJECTION
+        )
+        if result:
+            # 다른 버전 분석 결과는 없는 것으로 취급
+            analysis_summary = result.get('analysis_summary', None)
+            if analysis_summary and not _is_current_version(result, version):
+                analysis_summary = None
+            return {
+                'product_name': result['product_name'],
+                'sources': result.get('sources', []),
+                'review_count': result.get('review_count', 0),
+                'analysis_summary': analysis_summary,
+                'updated_at': result.get('updated_at')
+            }
+        return None
+    except Exception as e:
+        print(f"   ⚠️ DB 조회 실패: {str(e)}")
+        return None
+
+
+async def get_community_reviews_text_from_db(db_product_name):
+    """batch_crawler.get_community_reviews_text_from_db의 비동기 버전"""
+    try:
+        result = await get_collection('community_reviews').find_one(
+            {'product_name': db_product_name}, {'_id': 0, 'reviews_text': 1}
+        )
+        return result.get('reviews_text') if result else None
+    except Exception as e:
+        print(f"   ⚠️ DB 조회 실패: {str(e)}")
+        return None
+
+
+async def save_community_reviews_to_db(product_name, reviews_text, sources, actual_count=None):
+    """batch_crawler.save_community_reviews_to_db의 비동기 버전 (원문이 바뀌면 이전 분석 결과 삭제)"""
+    try:
+        current_timestamp = int(datetime.now().timestamp())
+        review_count = actual_count if actual_count is not None else product_result.count_reviews(reviews_text)
+        reviews_hash = product_result.reviews_hash(reviews_text)
+        fields = {
+            'product_name': product_name,
+            'normalized_key': product_normalizer.normalized_key(product_name),
+            'reviews_text': reviews_text,
+            'reviews_hash': reviews_hash,
+            'sources': sources,
+            'review_count': review_count,
+            'created_at': current_timestamp,
+            'updated_at': current_timestamp
+        }
+        collection = get_collection('community_reviews')
+        previous = await collection.find_one({'product_name': product_name}, {'_id': 0, 'reviews_hash': 1})
+        if not previous or previous.get('reviews_hash') != reviews_hash:
+            fields.update({'analysis_summary': None, 'analysis_version': None, 'reanalyze_skipped_version': None})
+
+        await collection.update_one({'product_name': product_name}, {'$set': fields}, upsert=True)
+        print(f"   ✅ DB 저장 완료: {product_name} ({review_count}개 후기)")
+        await delete_product_result_from_db(product_name)
+        return True
+    except Exception as e:
+        print(f"   ❌ DB 저장 실패: {str(e)}")
+        return False
+
+
+async def save_community_analysis_to_db(product_name, analysis_summary, version=None, model=None):
+    """batch_crawler.save_community_analysis_to_db의 비동기 버전"""
+    try:
+        if not isinstance(analysis_summary, dict):
+            analysis_summary = str(analysis_summary)
+
+        fields = {'analysis_summary': analysis_summary, 'analysis_updated_at': int(datetime.now().timestamp())}
+        if version is not None:
+            fields['analysis_version'] = version
+        if model is not None:
+            fields['analysis_model'] = model
+        await get_collection('community_reviews').update_one(
+            {'product_name': product_name},
+            {'$set': fields},
+            upsert=False
+        )
+        print(f"   ✅ 커뮤니티 분석 결과 캐시 저장 완료: {product_name}")
+        await delete_product_result_from_db(product_name)
+        return True
+    except Exception as e:
+        print(f"   ⚠️ 분석 결과 캐시 저장 실패: {str(e)}")
+        return False
+
+
+async def get_product_result_from_db(product_name, version=None):
+    """
+    database.get_product_result_from_db의 비동기 버전
+
+    ASGI 앱에는 백그라운드 재계산이 없으므로 다른 분석 버전으로 만든 결과는 캐시 미스로 취급합니다.
+    """
+    try:
+        result = await get_collection('product_results').find_one({'product_name': product_name}, {'_id': 0})
+        if result and version is not None and \
+                result.get('analysis_version', product_result.LEGACY_PRODUCT_RESULT_VERSION) != version:
+            return None
+        return result
+    except Exception as e:
+        print(f"   ⚠️ 제품 결과 조회 오류: {str(e)}")
+        return None
+
+
+async def save_product_result_to_db(product_name, product_result, version=None):
+    """database.save_product_result_to_db의 비동기 버전"""
+    try:
+        document = dict(
+            product_result,
+            product_name=product_name,
+            updated_at=int(datetime.now().timestamp()),
+            cached_at=datetime.utcnow()
+        )
+        if version is not None:
+            document['analysis_version'] = version
+        await get_collection('product_results').replace_one({'product_name': product_name}, document, upsert=True)
+        print(f"   ✅ 제품 결과 저장 완료: {product_name}")
+        return True
+    except Exception as e:
+        print(f"   ⚠️ 제품 결과 저장 오류: {str(e)}")
+        return False
+
+
+async def delete_product_result_from_db(product_name):
+    """database.delete_product_result_from_db의 비동기 버전"""
+    try:
+        await get_collection('product_results').delete_one({'product_name': product_name})
+        return True
+    except Exception as e:
+        print(f"   ⚠️ 제품 결과 삭제 오류: {str(e)}")
+        return False
@@ -1,11 +1,14 @@
 """
-배치 크롤링 스크립트: 제품별 유튜브 영상과 커뮤니티 후기를 미리 수집하여 MongoDB에 저장
+배치 크롤링 스크립트: 제품별 유튜브 영상과 커뮤니티 후기를 미리 수집하여 DB(MongoDB 또는 SQLite)에 저장
 """
 import crawler
 import database
 import ai_service
+import product_result
+import metrics
+import gemini_scheduler
+import transcript_store
 import sys
-import json
 from datetime import datetime
 
 # Windows에서 UTF-8 출력을 위한 설정
@@ -18,61 +21,55 @@ import product_normalizer
 # 실제 존재하는 모델만 크롤링 (환각 방지)
 PRODUCTS_TO_CRAWL = product_normalizer.VALID_MODELS.copy()
 
-def save_community_reviews_to_db(product_name, reviews_text, sources, actual_count=None):
+def save_community_reviews_to_db(product_name, reviews_text, sources, actual_count=None, invalidate_result=True):
     """
-    제품별 커뮤니티 후기를 MongoDB에 저장
+    제품별 커뮤니티 후기를 DB에 저장
+    
+    후기 원문이 바뀌면 이전 원문으로 만든 분석 결과(analysis_summary)를 지웁니다
+    (새 분석이 실패해도 원문과 맞지 않는 요약이 남지 않도록).
     
     Args:
         product_name: 제품명
         reviews_text: 후기 텍스트
         sources: 소스 리스트
         actual_count: 실제 수집된 후기 개수 (선택사항)
+        invalidate_result: materialized 결과 삭제 여부 (재수집처럼 새 결과로 바로 교체할 때는 False)
     """
     try:
-        from pymongo import MongoClient
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        
-        MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-        DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
-        COLLECTION_NAME = 'community_reviews'  # 새로운 컬렉션
-        
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
+        # 프로세스 공용 저장소 재사용 (MongoDB 또는 SQLite, 설정은 database 모듈에서 한 번만 로드)
+        storage = database.storage
+        if storage is None:
+            return False
         
         current_timestamp = int(datetime.now().timestamp())
         
-        # 실제 후기 개수 계산 (리스트 길이 사용, 없으면 줄 수로 추정)
-        if actual_count is not None:
-            review_count = actual_count
-        elif reviews_text:
-            # "[소스]"로 시작하는 줄만 카운트 (실제 후기 항목)
-            review_count = len([line for line in reviews_text.split('\n') if line.strip().startswith('[')])
-        else:
-            review_count = 0
+        # 실제 후기 개수 계산 (리스트 길이 사용, 없으면 "[소스]"로 시작하는 줄 수로 추정)
+        review_count = actual_count if actual_count is not None else product_result.count_reviews(reviews_text)
         
+        reviews_hash = product_result.reviews_hash(reviews_text)
         document = {
             'product_name': product_name,
+            'normalized_key': product_normalizer.normalized_key(product_name),
             'reviews_text': reviews_text,
+            'reviews_hash': reviews_hash,
             'sources': sources,
             'review_count': review_count,
             'created_at': current_timestamp,
             'updated_at': current_timestamp
         }
+        # 원문이 바뀌었으면 (해시가 없는 이전 문서 포함) 이전 분석 결과 삭제 (재분석 포기 기록도 초기화)
+        previous = storage.get('community_reviews', product_name, ['reviews_hash'])
+        if not previous or previous.get('reviews_hash') != reviews_hash:
+            document.update({'analysis_summary': None, 'analysis_version': None, database.REANALYZE_SKIPPED_FIELD: None})
         
         # 제품명으로 upsert
-        collection.update_one(
-            {'product_name': product_name},
-            {'$set': document},
-            upsert=True
-        )
+        storage.upsert('community_reviews', product_name, document)
         
         print(f"   ✅ DB 저장 완료: {product_name} ({review_count}개 후기)")
-        client.close()
+        # 구성 요소가 바뀌었으므로 L1 캐시와 materialized 결과 무효화 (다음 요청/배치에서 다시 생성)
+        database.community_reviews_cache.delete(product_name)
+        if invalidate_result:
+            database.delete_product_result_from_db(product_name)
         return True
         
     except Exception as e:
@@ -80,30 +77,24 @@ def save_community_reviews_to_db(product_name, reviews_text, sources, actual_cou
         return False
 
 
-def save_youtube_videos_to_db(product_name, videos_data):
+def save_youtube_videos_to_db(product_name, videos_data, invalidate_result=True):
     """
-    제품별 유튜브 영상 정보를 MongoDB에 저장
+    제품별 유튜브 영상 정보를 DB에 저장
+    
+    Args:
+        invalidate_result: materialized 결과 삭제 여부 (재수집처럼 새 결과로 바로 교체할 때는 False)
     """
     try:
-        from pymongo import MongoClient
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        
-        MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-        DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
-        COLLECTION_NAME = 'youtube_videos'  # 유튜브 영상 정보 컬렉션
-        
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
+        # 프로세스 공용 저장소 재사용 (MongoDB 또는 SQLite, 설정은 database 모듈에서 한 번만 로드)
+        storage = database.storage
+        if storage is None:
+            return False
         
         current_timestamp = int(datetime.now().timestamp())
         
         document = {
             'product_name': product_name,
+            'normalized_key': product_normalizer.normalized_key(product_name),
             'videos': videos_data,  # 영상 리스트
             'video_count': len(videos_data),
             'created_at': current_timestamp,
@@ -111,14 +102,12 @@ def save_youtube_videos_to_db(product_name, videos_data):
         }
         
         # 제품명으로 upsert
-        collection.update_one(
-            {'product_name': product_name},
-            {'$set': document},
-            upsert=True
-        )
+        storage.upsert('youtube_videos', product_name, document)
         
         print(f"   ✅ 유튜브 영상 DB 저장 완료: {product_name} ({len(videos_data)}개 영상)")
-        client.close()
+        database.youtube_videos_cache.delete(product_name)
+        if invalidate_result:
+            database.delete_product_result_from_db(product_name)
         return True
         
     except Exception as e:
@@ -129,6 +118,9 @@ def save_youtube_videos_to_db(product_name, videos_data):
 def crawl_product_batch(product_name):
     """
     특정 제품의 유튜브 영상과 커뮤니티 후기를 크롤링하여 DB에 저장 (제품명 정규화 적용)
+    
+    기존 materialized 결과는 구성 요소를 저장하는 동안 삭제하지 않고, 새 결과를 만든 뒤 쓰기 1번으로 교체합니다.
+    중간 단계가 실패하면 기존 결과가 그대로 남아 (stale-while-revalidate 재수집 중에도) 계속 응답에 사용됩니다.
     """
     import product_normalizer
     
@@ -151,8 +143,15 @@ def crawl_product_batch(product_name):
         if youtube_videos:
             print(f"      ✅ {len(youtube_videos)}개 영상 발견")
             
-            # 각 영상에 대해 자막 추출 및 AI 분석 수행
+            # 각 영상에 대해 자막 추출 및 AI 분석 수행 (캐시 확인/저장은 제품 단위로 한 번에)
             analyzed_videos = []
+            youtube_reviews = []  # materialized 결과용 (분석 성공한 영상만)
+            failed_video_ids = []  # 자막 추출/분석에 실패한 영상 (materialized 결과에 기록)
+            new_analyses = {}  # video_id -> 저장할 분석 결과
+            models = {}  # video_id -> 분석에 사용한 모델
+            cached_reviews = database.get_reviews_from_db(
+                [video['id'] for video in youtube_videos], version=ai_service.VIDEO_ANALYSIS_VERSION
+            )
             for video in youtube_videos:
                 video_id = video['id']
                 video_title = video['title']
@@ -160,19 +159,22 @@ def crawl_product_batch(product_name):
                 print(f"      📹 [{video_id}] {video_title[:50]}...")
                 
                 # DB에서 이미 분석된 영상인지 확인
-                cached_result = database.get_review_from_db(video_id)
+                cached_result = cached_reviews.get(video_id)
                 
                 if cached_result:
                     print(f"         ⚡ 이미 분석됨 (캐시 히트)")
                     analyzed_videos.append(video)
+                    analysis = cached_result.get('analysis', '')
+                    youtube_reviews.append({"video_id": video_id, "title": video_title, "analysis": analysis})
                 else:
                     # 자막 추출 및 AI 분석
                     print(f"         🔄 자막 추출 및 AI 분석 중...")
-                    script = ai_service.get_youtube_script(video_id)
+                    script = transcript_store.get_youtube_script(video_id)
                     
                     if script.startswith("❌"):
                         print(f"         ❌ 자막 추출 실패: {script}")
                         analyzed_videos.append(video)  # 영상 정보는 저장
+                        failed_video_ids.append(video_id)
                         continue
                     
                     analysis = ai_service.analyze_with_gemini(script)
@@ -180,25 +182,27 @@ def crawl_product_batch(product_name):
                     if isinstance(analysis, str) and analysis.startswith("❌"):
                         print(f"         ❌ AI 분석 실패: {analysis}")
                         analyzed_videos.append(video)  # 영상 정보는 저장
+                        failed_video_ids.append(video_id)
                         continue
                     
-                    # 분석 결과 DB에 저장
-                    import json
-                    if isinstance(analysis, dict):
-                        database.save_review_to_db(video_id, json.dumps(analysis, ensure_ascii=False))
-                    else:
-                        database.save_review_to_db(video_id, analysis)
+                    new_analyses[video_id] = analysis
+                    models[video_id] = ai_service.last_model_used()
                     
-                    print(f"         ✅ 분석 완료 및 저장")
+                    print(f"         ✅ 분석 완료")
                     analyzed_videos.append(video)
+                    youtube_reviews.append({"video_id": video_id, "title": video_title, "analysis": analysis})
+            
+            # 새 분석 결과 일괄 저장 (bulk_write 1회, 분석 버전/모델 태그 포함)
+            database.save_reviews_to_db(new_analyses, version=ai_service.VIDEO_ANALYSIS_VERSION, models=models)
             
             # 영상 정보 저장
-            save_youtube_videos_to_db(normalized_name, analyzed_videos)
+            save_youtube_videos_to_db(normalized_name, analyzed_videos, invalidate_result=False)
         else:
             print(f"      ⚠️ 유튜브 영상을 찾지 못했습니다.")
             success = False
         
         # 2. 커뮤니티 후기 크롤링 및 저장
+        community_analysis = None
         print(f"   💬 커뮤니티 후기 크롤링 중...")
         result = crawler.crawl_community_reviews(normalized_name)
         
@@ -215,7 +219,7 @@ def crawl_product_batch(product_name):
         
         if reviews_text and "가져오지 못했습니다" not in reviews_text:
             # DB에 저장 (정규화된 제품명으로 저장)
-            save_community_reviews_to_db(normalized_name, reviews_text, sources, actual_count)
+            save_community_reviews_to_db(normalized_name, reviews_text, sources, actual_count, invalidate_result=False)
             
             # 커뮤니티 후기 AI 분석 수행 및 저장
             print(f"   🤖 커뮤니티 후기 AI 분석 중...")
@@ -223,14 +227,29 @@ def crawl_product_batch(product_name):
             
             if isinstance(community_analysis, str) and community_analysis.startswith("❌"):
                 print(f"      ❌ 커뮤니티 분석 실패: {community_analysis}")
+                community_analysis = None
             else:
                 # 분석 결과 DB에 저장
-                save_community_analysis_to_db(normalized_name, community_analysis)
+                save_community_analysis_to_db(normalized_name, community_analysis, model=ai_service.last_model_used(),
+                                              invalidate_result=False)
                 print(f"      ✅ 커뮤니티 분석 완료 및 저장")
         else:
             print(f"   ⚠️ {normalized_name}: 커뮤니티 후기를 수집하지 못했습니다.")
             success = False
         
+        # 3. 영상 목록과 커뮤니티 분석이 있으면 materialized 결과 교체 (실패한 영상은 빼고 기록, 아니면 기존 결과 유지)
+        if success and community_analysis:
+            database.save_product_result_to_db(
+                normalized_name,
+                product_result.build_product_result(
+                    youtube_reviews, community_analysis,
+                    actual_count if actual_count is not None else product_result.count_reviews(reviews_text), sources,
+                    data_updated_at=int(datetime.now().timestamp()),
+                    failed_video_ids=failed_video_ids
+                ),
+                version=ai_service.PRODUCT_RESULT_VERSION
+            )
+        
         return success
             
     except Exception as e:
@@ -240,151 +259,209 @@ def crawl_product_batch(product_name):
         return False
 
 
-def get_youtube_videos_from_db(product_name):
+def _get_l1_product_value(collection_name, cache, product_name):
+    """L1 캐시에서 입력 제품명 -> DB 제품명 -> 값 순서로 조회 (없으면 None)"""
+    db_product_name = database.product_aliases.get((collection_name, product_name))
+    value = cache.get(db_product_name) if db_product_name is not None else None
+    metrics.record_cache(f"l1_{collection_name}", hit=value is not None)
+    return value
+
+
+def _set_l1_product_value(collection_name, cache, product_name, db_product_name, value):
+    """DB에서 찾은 값을 L1 캐시에 보관 (유사 제품명으로 찾은 경우 입력 제품명 별칭도 함께)"""
+    database.product_aliases.set((collection_name, product_name), db_product_name)
+    cache.set(db_product_name, value)
+
+
+def _find_product_document(collection_name, product_name, fields=None):
     """
-    MongoDB에서 제품별 유튜브 영상 정보 조회 (제품명 변형 자동 처리)
+    제품명으로 문서 조회 (product_name -> normalized_key 순서로 인덱스 조회)
+    
+    normalized_key가 없는 이전 문서(migrate_product_keys.py 실행 전)만 유사 제품명 검색으로 찾습니다.
+    """
+    storage = database.storage
+    normalized_name = product_normalizer.normalize_product_name(product_name)
+    result = storage.get(collection_name, normalized_name, fields)
+    if result:
+        return result
+    
+    result = storage.find_by_normalized_key(collection_name, product_normalizer.normalized_key(normalized_name), fields)
+    if result:
+        return result
+    
+    legacy_products = storage.keys_without_normalized_key(collection_name)
+    similar_product = product_normalizer.find_similar_product_in_db(product_name, legacy_products) if legacy_products else None
+    if similar_product:
+        print(f"   🔍 유사 제품명 발견: '{product_name}' -> '{similar_product}'")
+        return storage.get(collection_name, similar_product, fields)
+    return None
+
+
+def get_youtube_videos_meta_from_db(product_name):
+    """
+    DB에서 제품별 유튜브 영상 정보와 수집 시각 조회 (제품명 변형 자동 처리)
+    
+    Returns:
+        dict: {"product_name": DB 제품명, "videos": 영상 리스트, "updated_at": 수집 타임스탬프(없으면 None)} 또는 None
     """
     try:
-        import product_normalizer
-        from pymongo import MongoClient
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        
-        MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-        DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
-        COLLECTION_NAME = 'youtube_videos'
-        
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
-        
-        # 정규화된 제품명으로 먼저 검색
-        normalized_name = product_normalizer.normalize_product_name(product_name)
-        result = collection.find_one({'product_name': normalized_name})
-        
-        if result:
-            videos = result.get('videos', [])
-            client.close()
-            return videos
-        
-        # 정확히 일치하지 않으면 유사 제품명 검색
-        all_products = collection.find({}, {'product_name': 1})
-        db_product_names = [p['product_name'] for p in all_products]
-        
-        similar_product = product_normalizer.find_similar_product_in_db(product_name, db_product_names)
-        
-        if similar_product:
-            print(f"   🔍 유사 제품명 발견: '{product_name}' -> '{similar_product}'")
-            result = collection.find_one({'product_name': similar_product})
-            if result:
-                videos = result.get('videos', [])
-                client.close()
-                return videos
-        
-        client.close()
-        return None
+        # 프로세스 공용 저장소 재사용 (MongoDB 또는 SQLite, 설정은 database 모듈에서 한 번만 로드)
+        storage = database.storage
+        if storage is None:
+            return None
+        
+        # L1 캐시 확인
+        cached = _get_l1_product_value('youtube_videos', database.youtube_videos_cache, product_name)
+        if cached is not None:
+            return cached
+        
+        result = _find_product_document('youtube_videos', product_name, ['product_name', 'videos', 'updated_at'])
+        if not result:
+            metrics.record_cache("youtube_videos", hit=False)
+            return None
+        
+        meta = {
+            'product_name': result['product_name'],
+            'videos': result.get('videos', []),
+            'updated_at': result.get('updated_at')
+        }
+        metrics.record_cache("youtube_videos", hit=True)
+        _set_l1_product_value('youtube_videos', database.youtube_videos_cache, product_name, meta['product_name'], meta)
+        return meta
             
     except Exception as e:
         print(f"   ⚠️ 유튜브 영상 DB 조회 실패: {str(e)}")
         return None
 
 
-def get_community_reviews_from_db(product_name):
+def get_youtube_videos_from_db(product_name):
     """
-    MongoDB에서 제품별 커뮤니티 후기 조회 (제품명 변형 자동 처리)
-    분석 결과도 함께 반환 (캐싱된 경우)
+    DB에서 제품별 유튜브 영상 정보 조회 (제품명 변형 자동 처리)
+    """
+    meta = get_youtube_videos_meta_from_db(product_name)
+    return meta['videos'] if meta else None
+
+
+# 후기 원문(reviews_text)을 제외한 가벼운 필드 (분석 결과가 있으면 원문 없이 응답 가능)
+COMMUNITY_META_FIELDS = ['product_name', 'sources', 'review_count', 'analysis_summary', 'analysis_version', 'updated_at']
+
+
+def get_community_reviews_meta_from_db(product_name):
+    """
+    DB에서 제품별 커뮤니티 후기 메타 정보만 조회 (제품명 변형 자동 처리, 후기 원문 제외)
+    
+    Returns:
+        dict: {"product_name": DB 제품명, "sources", "review_count", "analysis_summary", "updated_at"} 또는 None
+              후기 원문이 필요하면 get_community_reviews_text_from_db(meta["product_name"])로 따로 조회
     """
     try:
-        import product_normalizer
-        from pymongo import MongoClient
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        
-        MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-        DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
-        COLLECTION_NAME = 'community_reviews'
-        
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
-        
-        # 정규화된 제품명으로 먼저 검색
-        normalized_name = product_normalizer.normalize_product_name(product_name)
-        result = collection.find_one({'product_name': normalized_name})
-        
-        if result:
-            reviews_text = result.get('reviews_text', '')
-            sources = result.get('sources', [])
-            analysis_summary = result.get('analysis_summary', None)  # 캐싱된 분석 결과
-            client.close()
-            return reviews_text, sources, analysis_summary
-        
-        # 정확히 일치하지 않으면 모든 제품명 가져와서 유사도 검색
-        all_products = collection.find({}, {'product_name': 1})
-        db_product_names = [p['product_name'] for p in all_products]
-        
-        similar_product = product_normalizer.find_similar_product_in_db(product_name, db_product_names)
-        
-        if similar_product:
-            print(f"   🔍 유사 제품명 발견: '{product_name}' -> '{similar_product}'")
-            result = collection.find_one({'product_name': similar_product})
-            if result:
-                reviews_text = result.get('reviews_text', '')
-                sources = result.get('sources', [])
-                analysis_summary = result.get('analysis_summary', None)  # 캐싱된 분석 결과
-                client.close()
-                return reviews_text, sources, analysis_summary
+        # 프로세스 공용 저장소 재사용 (MongoDB 또는 SQLite, 설정은 database 모듈에서 한 번만 로드)
+        storage = database.storage
+        if storage is None:
+            return None
+        
+        # L1 캐시 확인
+        cached = _get_l1_product_value('community_reviews', database.community_reviews_cache, product_name)
+        if cached is not None:
+            return cached
+        
+        result = _find_product_document('community_reviews', product_name, COMMUNITY_META_FIELDS)
+        
+        if not result:
+            metrics.record_cache("community_reviews", hit=False)
+            return None
+        
+        # 이전 버전 분석 결과는 없는 것으로 취급 (후기 원문을 불러와 다시 분석)
+        analysis_summary = result.get('analysis_summary', None)  # 캐싱된 분석 결과
+        if analysis_summary and not database.is_current_version(result, ai_service.COMMUNITY_ANALYSIS_VERSION):
+            analysis_summary = None
+        
+        meta = {
+            'product_name': result['product_name'],
+            'sources': result.get('sources', []),
+            'review_count': result.get('review_count', 0),
+            'analysis_summary': analysis_summary,
+            'updated_at': result.get('updated_at')  # 후기 수집 시각
+        }
+        metrics.record_cache("community_reviews", hit=True)
+        _set_l1_product_value('community_reviews', database.community_reviews_cache, product_name, meta['product_name'], meta)
+        return meta
+            
+    except Exception as e:
+        print(f"   ⚠️ DB 조회 실패: {str(e)}")
+        return None
+
+
+def get_community_reviews_text_from_db(db_product_name):
+    """
+    커뮤니티 후기 원문 조회 (분석 결과를 다시 만들어야 할 때만 사용)
+    
+    Args:
+        db_product_name: get_community_reviews_meta_from_db가 반환한 DB 제품명
+    """
+    try:
+        storage = database.storage
+        if storage is None:
+            return None
         
-        client.close()
-        return None, [], None
+        result = storage.get('community_reviews', db_product_name, ['reviews_text'])
+        return result.get('reviews_text') if result else None
             
     except Exception as e:
         print(f"   ⚠️ DB 조회 실패: {str(e)}")
+        return None
+
+
+def get_community_reviews_from_db(product_name):
+    """
+    DB에서 제품별 커뮤니티 후기 조회 (제품명 변형 자동 처리)
+    분석 결과도 함께 반환 (캐싱된 경우)
+    
+    후기 원문까지 필요한 스크립트용입니다. API 요청 경로는 get_community_reviews_meta_from_db를 사용합니다.
+    """
+    meta = get_community_reviews_meta_from_db(product_name)
+    if not meta:
+        return None, [], None
+    
+    reviews_text = get_community_reviews_text_from_db(meta['product_name'])
+    if not reviews_text:
         return None, [], None
+    return reviews_text, meta['sources'], meta['analysis_summary']
 
 
-def save_community_analysis_to_db(product_name, analysis_summary):
+def save_community_analysis_to_db(product_name, analysis_summary, model=None, invalidate_result=True):
     """
-    제품별 커뮤니티 후기 AI 분석 결과를 MongoDB에 저장 (캐싱)
+    제품별 커뮤니티 후기 AI 분석 결과를 DB에 저장 (캐싱)
+    
+    현재 분석 버전(ai_service.COMMUNITY_ANALYSIS_VERSION)과 사용한 모델 이름을 함께 저장합니다.
+    
+    Args:
+        invalidate_result: materialized 결과 삭제 여부 (재수집처럼 새 결과로 바로 교체할 때는 False)
     """
     try:
-        from pymongo import MongoClient
-        import os
-        from dotenv import load_dotenv
-        import json
-        
-        load_dotenv()
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        
-        MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-        DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
-        COLLECTION_NAME = 'community_reviews'
-        
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
-        
-        # 분석 결과를 JSON 문자열로 변환
-        if isinstance(analysis_summary, dict):
-            analysis_json = json.dumps(analysis_summary, ensure_ascii=False)
-        else:
-            analysis_json = str(analysis_summary)
-        
-        # 제품명으로 분석 결과 업데이트
-        collection.update_one(
-            {'product_name': product_name},
-            {'$set': {'analysis_summary': analysis_json, 'analysis_updated_at': int(datetime.now().timestamp())}},
-            upsert=False  # 이미 존재하는 문서만 업데이트
-        )
+        # 프로세스 공용 저장소 재사용 (MongoDB 또는 SQLite, 설정은 database 모듈에서 한 번만 로드)
+        storage = database.storage
+        if storage is None:
+            return False
+        
+        # dict는 구조화된 서브 문서로 그대로 저장 (JSON 문자열 변환 없음)
+        if not isinstance(analysis_summary, dict):
+            analysis_summary = str(analysis_summary)
+        
+        # 제품명으로 분석 결과 업데이트 (이미 존재하는 문서만 업데이트)
+        fields = {
+            'analysis_summary': analysis_summary,
+            'analysis_version': ai_service.COMMUNITY_ANALYSIS_VERSION,
+            'analysis_updated_at': int(datetime.now().timestamp())
+        }
+        if model is not None:
+            fields['analysis_model'] = model
+        storage.update('community_reviews', product_name, fields)
         
         print(f"   ✅ 커뮤니티 분석 결과 캐시 저장 완료: {product_name}")
-        client.close()
+        database.community_reviews_cache.delete(product_name)
+        if invalidate_result:
+            database.delete_product_result_from_db(product_name)
         return True
         
     except Exception as e:
@@ -393,6 +470,9 @@ def save_community_analysis_to_db(product_name, analysis_summary):
 
 
 if __name__ == "__main__":
+    # 배치 작업은 API 서버 요청을 위해 Gemini 쿼터 일부(GEMINI_INTERACTIVE_RESERVE)를 남겨 둠
+    gemini_scheduler.set_default_priority(gemini_scheduler.BATCH)
+    
     print("🚀 배치 크롤링 시작")
     print(f"총 {len(PRODUCTS_TO_CRAWL)}개 제품 크롤링 예정\n")
     
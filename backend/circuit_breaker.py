@@ -0,0 +1,227 @@
+"""
+DB 연결 서킷 브레이커
+
+MongoDB가 응답하지 않을 때 요청마다 서버 선택 타임아웃(수 초)을 기다리지 않도록,
+연결 오류가 연속으로 failure_threshold번 나면 회로를 열고(open) 이후 DB 호출을 즉시 CircuitOpen으로 실패시킵니다.
+회로가 열려 있는 동안에는 요청 대신 백그라운드 상태 확인(health probe) 스레드가 probe_interval초마다
+회로를 반쯤 열고(half_open) ping을 1번 보내, 성공하면 회로를 닫아(closed) 다시 DB를 사용하고 실패하면 다시 엽니다.
+half_open 동안에도 요청은 바로 실패시킵니다 (시험 호출은 상태 확인 ping 하나뿐).
+
+- CircuitBreaker: 상태(closed/open/half_open)와 연속 실패 수 관리 + 백그라운드 상태 확인
+- GuardedStorage: storage 인터페이스의 모든 호출을 브레이커로 감싸는 래퍼
+"""
+import threading
+import time
+
+import metrics
+
+
+class CircuitOpen(Exception):
+    """회로가 열려 있어 DB 호출을 건너뜀"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커
+
+    Args:
+        name (str): 로그/지표용 이름
+        probe (callable): 연결 상태 확인 함수 (실패 시 예외 발생, 예: ping)
+        failure_threshold (int): 회로를 열기까지의 연속 연결 오류 횟수
+        probe_interval (float): 회로가 열려 있을 때 상태 확인 주기 (초)
+        on_connect (callable): 상태 확인이 처음 성공했을 때 1번 실행할 함수 (인덱스 생성 등)
+    """
+
+    def __init__(self, name, probe, failure_threshold=3, probe_interval=10, on_connect=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._probe = probe
+        self._on_connect = on_connect
+        self._connected_once = False
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """백그라운드 상태 확인 시작 (첫 확인은 바로 실행, 이후 회로가 열려 있을 때만 반복)"""
+        self._thread = threading.Thread(target=self._run, name=f'{self.name}-health', daemon=True)
+        self._thread.start()
+
+    @property
+    def state(self):
+        return self._state
+
+    def allow(self):
+        """
+        DB 호출 가능 여부 확인
+
+        Raises:
+            CircuitOpen: 회로가 열려 있거나 상태 확인 중(half_open)인 경우
+        """
+        if self._state != 'closed':
+            metrics.CIRCUIT_REJECTIONS.inc(breaker=self.name)
+            raise CircuitOpen(f"[{self.name}] 연결할 수 없어 DB 호출을 건너뜁니다 (마지막 오류: {self._last_error})")
+
+    def record_success(self):
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+
+    def record_failure(self, error):
+        """연결 오류 기록 (연속 failure_threshold번이면 회로를 엶)"""
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            trip = self._state == 'closed' and self._failures >= self.failure_threshold
+        if trip:
+            self._open(error)
+
+    def _open(self, error):
+        """회로를 열고 상태 확인 스레드를 깨움 (half_open에서 다시 열 때는 처음 열린 시각 유지)"""
+        with self._lock:
+            previous = self._state
+            if previous == 'open':
+                return
+            self._state = 'open'
+            if previous == 'closed':
+                self._opened_at = time.time()
+            self._last_error = str(error)
+        if previous == 'closed':
+            print(f"⚠️ [{self.name}] 연결할 수 없음: 회로 열림 (복구될 때까지 DB 호출 중단) - {error}")
+        metrics.CIRCUIT_TRANSITIONS.inc(breaker=self.name, state='open')
+        self._wakeup.set()
+
+    def _half_open(self):
+        """열린 회로를 상태 확인 1번 동안 반쯤 엶"""
+        with self._lock:
+            if self._state != 'open':
+                return
+            self._state = 'half_open'
+        metrics.CIRCUIT_TRANSITIONS.inc(breaker=self.name, state='half_open')
+
+    def _close(self):
+        with self._lock:
+            was_open = self._state != 'closed'
+            self._state = 'closed'
+            self._failures = 0
+            self._opened_at = None
+        if was_open:
+            print(f"✅ [{self.name}] 연결 복구: 회로 닫힘")
+            metrics.CIRCUIT_TRANSITIONS.inc(breaker=self.name, state='closed')
+
+    def check(self):
+        """상태 확인 1회 (성공 여부 반환, 회로가 열려 있으면 확인하는 동안 half_open)"""
+        self._half_open()
+        try:
+            self._probe()
+        except Exception as e:
+            # 상태 확인 실패는 연속 실패 수와 관계없이 바로 회로를 엶
+            with self._lock:
+                self._last_error = str(e)
+            self._open(e)
+            return False
+
+        self._close()
+        if not self._connected_once:
+            self._connected_once = True
+            if self._on_connect is not None:
+                try:
+                    self._on_connect()
+                except Exception as e:
+                    print(f"⚠️ [{self.name}] 연결 후 초기화 실패: {str(e)}")
+        return True
+
+    def _run(self):
+        self.check()
+        while True:
+            # 닫혀 있으면 회로가 열릴 때까지 대기, 열려 있으면 probe_interval초마다 다시 확인
+            if self._state == 'closed':
+                self._wakeup.wait()  # 회로가 열릴 때까지 대기
+            else:
+                self._wakeup.wait(self.probe_interval)
+            self._wakeup.clear()
+            if self._state == 'open':
+                self.check()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'opened_at': self._opened_at,
+                'last_error': self._last_error,
+            }
+
+
+class GuardedStorage:
+    """
+    storage 인터페이스 호출을 서킷 브레이커로 감싸는 래퍼
+
+    회로가 열려 있으면 CircuitOpen을 즉시 발생시킵니다 (호출 측의 기존 except Exception 처리로 캐시 미스/저장 실패 처리).
+    connection_errors에 해당하는 예외만 연결 오류로 집계하고, 그 외 예외(중복 키 등)는 그대로 전달합니다.
+
+    Args:
+        backend: 실제 저장소 (MongoStorage)
+        breaker (CircuitBreaker): 서킷 브레이커
+        connection_errors (tuple): 연결 오류로 볼 예외 클래스
+    """
+
+    def __init__(self, backend, breaker, connection_errors):
+        self.backend = backend
+        self.breaker = breaker
+        self._connection_errors = connection_errors
+
+    def key_field(self, collection):
+        return self.backend.key_field(collection)
+
+    def _call(self, method, *args):
+        self.breaker.allow()
+        try:
+            result = getattr(self.backend, method)(*args)
+        except self._connection_errors as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return result
+
+    def get(self, collection, key, fields=None):
+        return self._call('get', collection, key, fields)
+
+    def get_many(self, collection, keys):
+        return self._call('get_many', collection, keys)
+
+    def find_by_normalized_key(self, collection, normalized_key, fields=None):
+        return self._call('find_by_normalized_key', collection, normalized_key, fields)
+
+    def keys_without_normalized_key(self, collection):
+        return self._call('keys_without_normalized_key', collection)
+
+    def outdated_keys(self, collection, field, version, legacy_version, limit, skip_field=None):
+        return self._call('outdated_keys', collection, field, version, legacy_version, limit, skip_field)
+
+    def upsert(self, collection, key, fields):
+        return self._call('upsert', collection, key, fields)
+
+    def upsert_many(self, collection, documents):
+        return self._call('upsert_many', collection, documents)
+
+    def update(self, collection, key, fields):
+        return self._call('update', collection, key, fields)
+
+    def replace(self, collection, key, document):
+        return self._call('replace', collection, key, document)
+
+    def delete(self, collection, key):
+        return self._call('delete', collection, key)
+
+    def write_many(self, collection, operations):
+        return self._call('write_many', collection, operations)
+
+    def create_indexes(self, indexes):
+        return self._call('create_indexes', indexes)
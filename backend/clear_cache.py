@@ -1,6 +1,9 @@
 """
 MongoDB 캐시 데이터 삭제 스크립트
 프롬프트 변경으로 인한 데이터 형식 변경으로 기존 캐시를 삭제합니다.
+
+캐시를 한꺼번에 비우면 모든 요청이 동시에 Gemini를 호출하게 됩니다.
+프롬프트만 바뀐 경우에는 ai_service의 *_ANALYSIS_VERSION을 올리고 reanalyze_outdated.py를 사용하세요.
 """
 import os
 from pymongo import MongoClient
@@ -49,6 +52,10 @@ try:
             # 삭제 후 확인
             count_after = collection.count_documents({})
             print(f"📊 삭제 후 문서 개수: {count_after}개")
+            
+            # 삭제된 분석으로 만든 제품 결과(materialized)도 함께 삭제
+            product_results = db['product_results'].delete_many({})
+            print(f"✅ 제품 결과 삭제: {product_results.deleted_count}개 문서 삭제됨")
         else:
             print("\n❌ 삭제가 취소되었습니다.")
     
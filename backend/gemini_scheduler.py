@@ -0,0 +1,282 @@
+"""
+Gemini 호출 스케줄러
+
+모든 Gemini 호출은 실행 전에 acquire()로 모델별 실행 허가를 받습니다.
+- 모델별 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷: 쿼터 한도까지만 보내고 나머지는 대기열에서 기다림
+- 쿼터 초과(429) 시 해당 모델에 지터를 섞은 지수 백오프 적용 (여러 스레드가 동시에 실패했다가 동시에 재시도하지 않음)
+- 우선순위: 대기열에서는 사용자 요청(INTERACTIVE)이 배치 작업(BATCH)보다 먼저 실행되고,
+  BATCH는 버킷에 interactive_reserve 비율만큼 여유가 남아 있을 때만 실행 (배치 스크립트가 다른 프로세스에서
+  돌아도 API 서버 요청을 위한 쿼터가 남도록)
+
+우선순위는 contextvar로 전달합니다:
+    with gemini_scheduler.priority(gemini_scheduler.BATCH):
+        ai_service.analyze_with_gemini(script)
+배치 스크립트는 시작 시 set_default_priority(BATCH)로 프로세스 기본값을 바꿉니다.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+_priority = contextvars.ContextVar('gemini_priority', default=None)
+_default_priority = INTERACTIVE
+
+
+@contextmanager
+def priority(level):
+    """with 블록 안의 Gemini 호출 우선순위 지정"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_default_priority(level):
+    """프로세스 기본 우선순위 변경 (배치 스크립트용)"""
+    global _default_priority
+    _default_priority = level
+
+
+def current_priority():
+    level = _priority.get()
+    return _default_priority if level is None else level
+
+
+def estimate_tokens(prompt):
+    """프롬프트 + 응답 토큰 수 대략 추정 (TPM 버킷용, 한글은 글자당 토큰이 많아 3자당 1토큰 + 응답 여유분)"""
+    return len(prompt) // 3 + 1024
+
+
+class TokenBucket:
+    """
+    분당 rate_per_minute만큼 채워지는 토큰 버킷 (최대 capacity)
+
+    스레드 안전하지 않으므로 GeminiScheduler의 락 안에서만 사용합니다.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount, reserve=0.0, now=None):
+        """amount를 꺼낸 뒤에도 capacity x reserve만큼 남아 있으려면 기다려야 하는 시간 (초)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        needed = min(amount, self.capacity) + self.capacity * reserve - self.level
+        if needed <= 0:
+            return 0.0
+        return needed / self.rate if self.rate > 0 else float('inf')
+
+    def consume(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        """쿼터 초과 응답을 받으면 버킷을 비워 다시 채워질 때까지 보내지 않음"""
+        self.level = min(self.level, 0)
+
+
+class _ModelState:
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.backoff_until = 0.0
+        self.quota_errors = 0  # 연속 쿼터 초과 횟수 (백오프 지수)
+        self.waiting = []  # (우선순위, 순번) 힙
+
+
+class GeminiScheduler:
+    """
+    모델별 토큰 버킷 + 백오프 + 우선순위 대기열
+
+    Args:
+        rpm (int): 모델별 분당 요청 수 한도
+        tpm (int): 모델별 분당 토큰 수 한도
+        interactive_reserve (float): BATCH 요청이 남겨 둬야 하는 버킷 비율 (0~1)
+        base_backoff (float): 첫 쿼터 초과 시 백오프 시간 (초, 연속 실패마다 2배)
+        max_backoff (float): 최대 백오프 시간 (초)
+        max_wait (float): INTERACTIVE 요청이 대기열에서 기다리는 최대 시간 (초, BATCH는 제한 없음)
+        async_poll_interval (float): acquire_async가 차례를 다시 확인하는 최대 간격 (초)
+    """
+
+    def __init__(self, rpm, tpm, interactive_reserve=0.2, base_backoff=2, max_backoff=60, max_wait=30,
+                 async_poll_interval=0.1):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.interactive_reserve = interactive_reserve
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.async_poll_interval = async_poll_interval
+        self._models = {}  # 모델 이름 -> _ModelState
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._counters = {'acquired': 0, 'timeouts': 0, 'quota_errors': 0}
+
+    def _state(self, model_name):
+        state = self._models.get(model_name)
+        if state is None:
+            state = self._models[model_name] = _ModelState(self.rpm, self.tpm)
+        return state
+
+    def _ready_in(self, state, tokens, level, now):
+        """이 우선순위의 요청이 실행 가능해지기까지 남은 시간 (초)"""
+        reserve = self.interactive_reserve if level == BATCH else 0.0
+        return max(
+            state.backoff_until - now,
+            state.requests.time_until(1, reserve, now),
+            state.tokens.time_until(tokens, reserve, now),
+            0.0
+        )
+
+    def pick(self, model_names, tokens, level=None):
+        """후보 중 가장 빨리 실행할 수 있는 모델 (같으면 앞쪽 모델, 즉 Flash 우선)"""
+        level = current_priority() if level is None else level
+        now = time.monotonic()
+        with self._cond:
+            return min(model_names, key=lambda name: self._ready_in(self._state(name), tokens, level, now))
+
+    def _begin(self, model_name, level, timeout):
+        """대기열에 등록 (self._cond 안에서 호출) -> (상태, 대기열 항목, 시작 시각, 마감 시각, 지표 라벨)"""
+        if timeout is None and level == INTERACTIVE:
+            timeout = self.max_wait
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        state = self._state(model_name)
+        entry = (level, next(self._seq))
+        heapq.heappush(state.waiting, entry)
+        labels = {'model': model_name, 'priority': PRIORITY_NAMES.get(level, str(level))}
+        return state, entry, start, deadline, labels
+
+    def _poll(self, state, entry, tokens, level, start, deadline, labels):
+        """
+        허가 가능 여부 확인 (self._cond 안에서 호출, 기다리지 않음)
+
+        Returns:
+            True(허가, 버킷 차감), False(대기 시간 초과) 또는 다시 확인할 때까지 기다릴 시간(초)
+        """
+        now = time.monotonic()
+        # 같은 모델을 기다리는 요청 중 우선순위가 가장 높은(먼저 온) 요청만 실행 가능
+        delay = self._ready_in(state, tokens, level, now) if state.waiting[0] == entry else None
+        if delay == 0:
+            state.requests.consume(1)
+            state.tokens.consume(tokens)
+            self._counters['acquired'] += 1
+            metrics.GEMINI_QUEUE_SECONDS.observe(now - start, **labels)
+            return True
+        if deadline is not None and now >= deadline:
+            self._counters['timeouts'] += 1
+            metrics.GEMINI_QUEUE_SECONDS.observe(now - start, **labels)
+            return False
+        wait = delay if delay is not None else 1.0
+        if deadline is not None:
+            wait = min(wait, deadline - now)
+        return wait
+
+    def _end(self, state, entry):
+        """대기열에서 제거하고 다음 요청을 깨움 (self._cond 안에서 호출)"""
+        state.waiting.remove(entry)
+        heapq.heapify(state.waiting)
+        self._cond.notify_all()
+
+    def acquire(self, model_name, tokens, level=None, timeout=None):
+        """
+        모델 호출 허가를 받을 때까지 대기 (버킷에서 요청 1개 + 토큰 차감)
+
+        Args:
+            tokens (int): 예상 토큰 수 (estimate_tokens)
+            level (int): 우선순위 (없으면 current_priority())
+            timeout (float): 최대 대기 시간 (없으면 INTERACTIVE는 max_wait, BATCH는 무제한)
+
+        Returns:
+            bool: 허가 여부 (대기 시간 초과 시 False)
+        """
+        level = current_priority() if level is None else level
+        with self._cond:
+            state, entry, start, deadline, labels = self._begin(model_name, level, timeout)
+            try:
+                while True:
+                    result = self._poll(state, entry, tokens, level, start, deadline, labels)
+                    if result is True or result is False:
+                        return result
+                    self._cond.wait(result)
+            finally:
+                self._end(state, entry)
+
+    async def acquire_async(self, model_name, tokens, level=None, timeout=None):
+        """
+        acquire의 비동기 버전 (스레드를 점유하지 않고 asyncio.sleep으로 대기)
+
+        동기 요청과 같은 대기열을 사용합니다. 락은 상태 확인 동안만 잡고, 대기열 맨 앞이 아니면
+        async_poll_interval초마다 다시 확인합니다 (동기 대기자처럼 notify로 깨울 수 없으므로).
+        """
+        level = current_priority() if level is None else level
+        with self._cond:
+            state, entry, start, deadline, labels = self._begin(model_name, level, timeout)
+        try:
+            while True:
+                with self._cond:
+                    result = self._poll(state, entry, tokens, level, start, deadline, labels)
+                if result is True or result is False:
+                    return result
+                await asyncio.sleep(min(result, self.async_poll_interval))
+        finally:
+            with self._cond:
+                self._end(state, entry)
+
+    def report_success(self, model_name):
+        with self._cond:
+            self._state(model_name).quota_errors = 0
+
+    def report_quota_error(self, model_name):
+        """
+        쿼터 초과 응답 기록: 버킷을 비우고 지터를 섞은 지수 백오프 적용
+
+        Returns:
+            float: 이 모델을 다시 시도하기까지의 시간 (초)
+        """
+        with self._cond:
+            state = self._state(model_name)
+            backoff = min(self.max_backoff, self.base_backoff * (2 ** state.quota_errors))
+            delay = random.uniform(backoff / 2, backoff)  # 동시에 실패한 요청들이 같은 시각에 재시도하지 않도록
+            state.quota_errors += 1
+            state.backoff_until = max(state.backoff_until, time.monotonic() + delay)
+            state.requests.drain()
+            self._counters['quota_errors'] += 1
+            self._cond.notify_all()
+        return delay
+
+    def stats(self):
+        now = time.monotonic()
+        with self._cond:
+            return {
+                'rpm': self.rpm,
+                'tpm': self.tpm,
+                **self._counters,
+                'models': {
+                    name: {
+                        'waiting': len(state.waiting),
+                        'requests_available': round(state.requests.level, 2),
+                        'tokens_available': int(state.tokens.level),
+                        'backoff_remaining': max(0.0, state.backoff_until - now),
+                        'consecutive_quota_errors': state.quota_errors,
+                    }
+                    for name, state in self._models.items()
+                },
+            }
@@ -0,0 +1,72 @@
+"""
+구매 가이드 상태 변경 알림 (SSE 스트림용 pub/sub)
+
+generate_guide_async가 가이드 상태를 저장할 때 publish()를 호출하면,
+같은 제품을 구독 중인 모든 SSE 연결의 큐로 상태 항목이 전달됩니다.
+
+구독자는 큐 대기로 연결을 유지하므로 gevent로 실행해야 합니다 (python app.py 또는 gunicorn -k gevent).
+gevent가 threading/queue를 패치하면 대기 중인 연결은 greenlet만 차지해 수천 개여도 OS 스레드가 늘어나지 않습니다.
+스레드 서버(flask run, gunicorn 동기 워커)에서는 연결마다 스레드를 점유하므로 SSE 스트림을 제공하지 않습니다
+(green_threads_enabled 참고, 클라이언트는 GET /api/purchase-guide/<product_name> 폴링으로 전환).
+"""
+import queue
+import threading
+
+
+def green_threads_enabled():
+    """gevent가 threading을 패치했는지 (SSE 구독 대기가 OS 스레드를 점유하지 않는지)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+class GuideEventBroker:
+    """제품별 구독자 큐 관리"""
+
+    def __init__(self):
+        self._subscribers = {}  # product_name -> set(queue.Queue)
+        self._lock = threading.Lock()
+
+    def subscribe(self, product_name):
+        """
+        제품의 상태 변경 구독
+
+        Returns:
+            queue.Queue: publish된 상태 항목이 들어오는 큐 (사용 후 unsubscribe 필요)
+        """
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(product_name, set()).add(q)
+        return q
+
+    def unsubscribe(self, product_name, q):
+        """구독 해제 (마지막 구독자면 제품 키도 제거)"""
+        with self._lock:
+            subscribers = self._subscribers.get(product_name)
+            if subscribers is None:
+                return
+            subscribers.discard(q)
+            if not subscribers:
+                del self._subscribers[product_name]
+
+    def publish(self, product_name, entry):
+        """
+        제품의 모든 구독자에게 상태 항목 전달
+
+        Returns:
+            int: 전달된 구독자 수
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(product_name, ()))
+        for q in subscribers:
+            q.put(entry)
+        return len(subscribers)
+
+    def subscriber_count(self, product_name=None):
+        """구독자 수 (product_name 미지정 시 전체)"""
+        with self._lock:
+            if product_name is not None:
+                return len(self._subscribers.get(product_name, ()))
+            return sum(len(s) for s in self._subscribers.values())
@@ -0,0 +1,244 @@
+"""
+구매 가이드 저장소
+
+- MemoryGuideStore: 프로세스 내부 LRU + TTL 캐시 (빠르지만 워커 간 공유 불가)
+- StorageGuideStore: database.storage의 purchase_guides 컬렉션 (MongoDB 또는 SQLite, 워커/재시작 간 공유)
+- TieredGuideStore: 메모리 → 공유 저장소 순서로 조회하는 2단 저장소
+  (다른 워커가 공유 저장소의 가이드를 지우거나 바꿔도 반영되도록 메모리에는 GUIDE_LOCAL_TTL초만 보관)
+
+저장 형태: {"status": "processing"|"completed"|"error", "guide": {...}, "error": "...", "updated_at": 타임스탬프}
+"""
+import os
+from datetime import datetime
+
+import database
+from ttl_cache import TTLCache
+
+GUIDE_COLLECTION_NAME = 'purchase_guides'
+
+# 메모리 캐시 설정
+GUIDE_CACHE_MAX_ENTRIES = int(os.getenv('GUIDE_CACHE_MAX_ENTRIES', 256))
+GUIDE_CACHE_TTL = int(os.getenv('GUIDE_CACHE_TTL', 6 * 60 * 60))  # 완료된 가이드 보관 시간 (초)
+# 2단 저장소의 메모리 보관 시간 (초) - 재수집으로 공유 저장소의 가이드가 삭제되면 다른 워커는 최대 이 시간 뒤에 반영
+GUIDE_LOCAL_TTL = float(os.getenv('GUIDE_LOCAL_TTL', 30))
+
+# 이 시간(초)이 지나도 processing 상태면 생성 작업이 중단된 것으로 보고 무시 (워커 재시작 등)
+GUIDE_PROCESSING_TIMEOUT = int(os.getenv('GUIDE_PROCESSING_TIMEOUT', 300))
+
+
+def _is_expired_processing(entry):
+    """오래된 processing 상태인지 확인"""
+    if entry.get('status') != 'processing':
+        return False
+    updated_at = entry.get('updated_at', 0)
+    return int(datetime.now().timestamp()) - updated_at > GUIDE_PROCESSING_TIMEOUT
+
+
+class MemoryGuideStore:
+    """프로세스 내부 LRU + TTL 저장소"""
+
+    def __init__(self, max_entries=GUIDE_CACHE_MAX_ENTRIES, ttl=GUIDE_CACHE_TTL):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, product_name):
+        entry = self._cache.get(product_name)
+        if entry is None or _is_expired_processing(entry):
+            return None
+        return entry
+
+    def set(self, product_name, entry):
+        self._cache.set(product_name, entry)
+
+    def delete(self, product_name):
+        self._cache.delete(product_name)
+
+
+class StorageGuideStore:
+    """database.storage 기반 공유 저장소 (MongoDB 또는 SQLite, 여러 gunicorn 워커가 같은 상태를 조회)"""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def get(self, product_name):
+        try:
+            entry = self._storage.get(GUIDE_COLLECTION_NAME, product_name)
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 조회 실패: {str(e)}")
+            return None
+
+        if entry is None or _is_expired_processing(entry):
+            return None
+        return entry
+
+    def set(self, product_name, entry):
+        try:
+            self._storage.upsert(GUIDE_COLLECTION_NAME, product_name, entry)
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 저장 실패: {str(e)}")
+
+    def delete(self, product_name):
+        try:
+            self._storage.delete(GUIDE_COLLECTION_NAME, product_name)
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 삭제 실패: {str(e)}")
+
+
+class TieredGuideStore:
+    """
+    메모리(L1) + 공유 저장소(L2) 2단 구성
+
+    다른 워커의 삭제/변경은 알 수 없으므로 메모리 항목은 짧은 TTL(GUIDE_LOCAL_TTL)로 두고 만료되면 공유 저장소를 다시 조회합니다.
+    """
+
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+
+    def get(self, product_name):
+        entry = self.local.get(product_name)
+        if entry is not None:
+            return entry
+
+        entry = self.shared.get(product_name)
+        # 완료된 가이드만 메모리에 올림 (processing 상태는 다른 워커가 갱신하므로 매번 공유 저장소 확인)
+        if entry is not None and entry.get('status') == 'completed':
+            self.local.set(product_name, entry)
+        return entry
+
+    def set(self, product_name, entry):
+        self.local.set(product_name, entry)
+        self.shared.set(product_name, entry)
+
+    def delete(self, product_name):
+        self.local.delete(product_name)
+        self.shared.delete(product_name)
+
+
+class AsyncMongoGuideStore:
+    """StorageGuideStore의 MongoDB 비동기 버전 (motor 컬렉션 사용, ASGI 앱용)"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def get(self, product_name):
+        try:
+            entry = await self._collection.find_one({'product_name': product_name}, {'_id': 0})
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 조회 실패: {str(e)}")
+            return None
+
+        if entry is None or _is_expired_processing(entry):
+            return None
+        return entry
+
+    async def set(self, product_name, entry):
+        try:
+            await self._collection.update_one(
+                {'product_name': product_name},
+                {'$set': dict(entry, product_name=product_name)},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 저장 실패: {str(e)}")
+
+    async def delete(self, product_name):
+        try:
+            await self._collection.delete_one({'product_name': product_name})
+        except Exception as e:
+            print(f"   ⚠️ 구매 가이드 DB 삭제 실패: {str(e)}")
+
+
+class AsyncTieredGuideStore:
+    """TieredGuideStore의 비동기 버전 (메모리 조회는 그대로, 공유 저장소만 await)"""
+
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+
+    async def get(self, product_name):
+        entry = self.local.get(product_name)
+        if entry is not None:
+            return entry
+
+        entry = await self.shared.get(product_name)
+        if entry is not None and entry.get('status') == 'completed':
+            self.local.set(product_name, entry)
+        return entry
+
+    async def set(self, product_name, entry):
+        self.local.set(product_name, entry)
+        await self.shared.set(product_name, entry)
+
+    async def delete(self, product_name):
+        self.local.delete(product_name)
+        await self.shared.delete(product_name)
+
+
+def make_entry(status, guide=None, error=None):
+    """저장소에 넣을 가이드 상태 항목 생성"""
+    entry = {'status': status, 'updated_at': int(datetime.now().timestamp())}
+    if guide is not None:
+        entry['guide'] = guide
+    if error is not None:
+        entry['error'] = error
+    return entry
+
+
+def status_response(entry):
+    """
+    구매 가이드 상태 항목을 API 응답 형태로 변환 (GET /api/purchase-guide/<product_name>, SSE 이벤트 공통)
+
+    Returns:
+        tuple: (응답 dict, HTTP 상태 코드)
+    """
+    if not entry:
+        return {
+            "status": "not_started",
+            "message": "구매 가이드 생성이 시작되지 않았습니다."
+        }, 404
+
+    if entry["status"] == "processing":
+        return {
+            "status": "processing",
+            "message": "구매 가이드를 생성 중입니다..."
+        }, 200
+    elif entry["status"] == "completed":
+        return {
+            "status": "completed",
+            "guide": entry["guide"]
+        }, 200
+    else:  # error
+        return {
+            "status": "error",
+            "error": entry.get("error", "알 수 없는 오류")
+        }, 500
+
+
+def create_guide_store():
+    """
+    설정에 맞는 구매 가이드 저장소 생성
+
+    GUIDE_STORE 환경 변수:
+    - "memory": 메모리 전용
+    - "tiered" (기본값): 메모리 + database.storage (저장소 연결이 없으면 메모리 전용)
+    """
+    store_type = os.getenv('GUIDE_STORE', 'tiered').lower()
+
+    if store_type == 'memory' or database.storage is None:
+        print(f"   ℹ️ 구매 가이드 저장소: 메모리")
+        return MemoryGuideStore()
+
+    # product_name 고유 인덱스는 database.create_index_if_not_exists에서 생성
+    print(f"   ℹ️ 구매 가이드 저장소: 메모리 + {database.STORAGE_BACKEND} [{GUIDE_COLLECTION_NAME}]")
+    return TieredGuideStore(MemoryGuideStore(ttl=GUIDE_LOCAL_TTL), StorageGuideStore(database.storage))
+
+
+def create_async_guide_store(collection):
+    """
+    ASGI 앱용 구매 가이드 저장소 생성 (메모리 + motor 컬렉션)
+
+    Args:
+        collection: motor 비동기 컬렉션 (purchase_guides)
+    """
+    print(f"   ℹ️ 구매 가이드 저장소 (async): 메모리 + MongoDB [{GUIDE_COLLECTION_NAME}]")
+    return AsyncTieredGuideStore(MemoryGuideStore(ttl=GUIDE_LOCAL_TTL), AsyncMongoGuideStore(collection))
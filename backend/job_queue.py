@@ -0,0 +1,202 @@
+"""
+백그라운드 작업 실행기: 고정 크기 워커 풀 + 대기열 제한 + 키별 중복 제거
+
+구매 가이드 생성처럼 요청마다 새 스레드를 띄우던 작업을 한곳에서 실행합니다.
+- 같은 키(정규화된 제품명)의 작업이 대기/실행 중이면 새로 만들지 않고 기존 작업을 반환
+- 대기 + 실행 중인 작업 수가 max_pending을 넘으면 JobQueueFull 발생
+- 작업별 대기 시간/실행 시간을 기록하고 stats()로 집계
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+
+class JobQueueFull(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+
+class Job:
+    """실행기에 제출된 작업 1건"""
+
+    def __init__(self, key):
+        self.key = key
+        self.status = 'queued'  # queued | running | completed | failed | cancelled
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def wait_time(self):
+        """대기열에서 기다린 시간 (초)"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.queued_at
+
+    @property
+    def run_time(self):
+        """실행 시간 (초)"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'status': self.status,
+            'error': self.error,
+            'queued_at': self.queued_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'wait_time': self.wait_time,
+            'run_time': self.run_time,
+        }
+
+
+class JobExecutor:
+    """
+    키별로 중복을 제거하는 고정 크기 백그라운드 작업 실행기
+
+    Args:
+        name (str): 로그/스레드 이름 접두사
+        max_workers (int): 동시 실행 작업 수
+        max_pending (int): 대기 + 실행 중인 작업의 최대 개수
+        history_size (int): stats()에 보관할 최근 완료 작업 수
+    """
+
+    def __init__(self, name='jobs', max_workers=4, max_pending=100, history_size=100):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._jobs = {}  # key -> 대기/실행 중인 Job
+        self._history = deque(maxlen=history_size)
+        self._counters = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+        }
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn):
+        """
+        작업 제출 (같은 키의 작업이 대기/실행 중이면 그 작업을 반환)
+
+        Args:
+            key: 작업 식별 키
+            fn: 인자 없는 작업 함수
+
+        Returns:
+            tuple: (Job, created) - created가 False면 기존 작업을 재사용
+
+        Raises:
+            JobQueueFull: 대기열이 가득 찬 경우
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._counters['deduplicated'] += 1
+                return job, False
+
+            if len(self._jobs) >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise JobQueueFull(f"[{self.name}] 대기 중인 작업이 너무 많습니다 ({self.max_pending}개)")
+
+            job = Job(key)
+            self._jobs[key] = job
+            self._counters['submitted'] += 1
+            job.future = self._executor.submit(self._run, job, fn)
+            return job, True
+
+    def _run(self, job, fn):
+        with self._lock:
+            if job.status == 'cancelled':
+                return None
+            job.status = 'running'
+            job.started_at = time.time()
+
+        try:
+            result = fn()
+            self._finish(job, 'completed')
+            return result
+        except Exception as e:
+            self._finish(job, 'failed', error=str(e))
+            raise
+
+    def _finish(self, job, status, error=None):
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._counters[status] += 1
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+            self._history.append(job)
+
+        if status != 'cancelled':
+            print(f"   ⏱️ [{self.name}] {job.key} {status} (대기 {job.wait_time:.2f}s, 실행 {job.run_time:.2f}s)")
+
+    def cancel(self, key):
+        """
+        대기 중인 작업 취소 (이미 실행 중인 작업은 중단할 수 없음)
+
+        Returns:
+            bool: 취소 성공 여부
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status != 'queued':
+                return False
+            job.status = 'cancelled'
+            job.future.cancel()
+
+        self._finish(job, 'cancelled')
+        return True
+
+    def get(self, key):
+        """대기/실행 중인 작업 조회 (없으면 None)"""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def wait(self, key, timeout=None):
+        """대기/실행 중인 작업이 끝날 때까지 대기 (테스트/배치 스크립트용)"""
+        job = self.get(key)
+        if job is None:
+            return
+        try:
+            job.future.exception(timeout=timeout)
+        except CancelledError:
+            pass
+
+    def stats(self):
+        """작업 수 및 최근 작업의 평균 대기/실행 시간"""
+        with self._lock:
+            active = list(self._jobs.values())
+            history = list(self._history)
+            counters = dict(self._counters)
+
+        wait_times = [j.wait_time for j in history if j.wait_time is not None]
+        run_times = [j.run_time for j in history if j.run_time is not None]
+
+        return {
+            'name': self.name,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'queued': sum(1 for j in active if j.status == 'queued'),
+            'running': sum(1 for j in active if j.status == 'running'),
+            **counters,
+            'avg_wait_time': sum(wait_times) / len(wait_times) if wait_times else None,
+            'avg_run_time': sum(run_times) / len(run_times) if run_times else None,
+            'max_run_time': max(run_times) if run_times else None,
+            'active_jobs': [j.to_dict() for j in active],
+            'recent_jobs': [j.to_dict() for j in history[-10:]],
+        }
+
+    def shutdown(self, wait=True):
+        """실행기 종료"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
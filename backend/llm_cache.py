@@ -0,0 +1,104 @@
+"""
+Gemini 응답 캐시 (프롬프트 해시 기준)
+
+같은 프롬프트(같은 템플릿 버전 + 같은 입력 텍스트)에 대한 응답을 저장해 두고, 다시 요청되면 Gemini를 호출하지 않고 반환합니다.
+영상 ID/제품명과 관계없이 내용으로 찾으므로 analyze_existing_community_reviews.py의 같은 후기 재분석이나
+같은 입력으로 반복되는 구매 가이드 생성도 캐시에서 응답합니다.
+
+- 키: sha256(템플릿 버전 + 프롬프트), 프롬프트에 입력 텍스트가 그대로 들어가므로 입력이 1자라도 다르면 다른 키
+- L1: 프로세스 내 LRU 캐시 (최대 max_entries개, 용량을 넘으면 가장 오래 사용되지 않은 응답부터 제거)
+- L2: database.storage의 llm_responses 컬렉션 (MongoDB TTL 인덱스로 ANALYSIS_CACHE_TTL초 뒤 삭제)
+
+JSON으로 파싱된 응답만 저장합니다 (오류/텍스트 응답은 다음 호출에서 다시 시도).
+"""
+import asyncio
+import copy
+import hashlib
+from datetime import datetime
+
+import database
+import metrics
+from ttl_cache import TTLCache
+
+COLLECTION_NAME = database.LLM_RESPONSES_COLLECTION_NAME
+
+
+def prompt_key(version, prompt):
+    """템플릿 버전 + 프롬프트의 sha256 해시"""
+    return hashlib.sha256(f"{version}\n{prompt}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    L1(메모리) + L2(저장소) Gemini 응답 캐시
+
+    Args:
+        storage: database.storage (None이면 메모리 캐시만 사용)
+        max_entries (int): L1 최대 항목 수
+        ttl (float): L1 보관 시간 (초, 내용 기준 키라 오래된 값이 틀릴 일은 없고 메모리 회수용)
+    """
+
+    def __init__(self, storage, max_entries=512, ttl=24 * 60 * 60):
+        self._storage = storage
+        self._l1 = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def _load(self, key):
+        """L2 조회 (찾으면 L1에 보관)"""
+        try:
+            document = self._storage.get(COLLECTION_NAME, key, ['response', 'model'])
+        except Exception as e:
+            print(f"   ⚠️ 응답 캐시 DB 조회 실패: {str(e)}")
+            return None
+        if not document or 'response' not in document:
+            return None
+        entry = {'response': document['response'], 'model': document.get('model')}
+        self._l1.set(key, entry)
+        return entry
+
+    def _document(self, version, response, model):
+        return {
+            'response': response,
+            'model': model,
+            'template_version': version,
+            'cached_at': datetime.utcnow(),  # TTL 인덱스 기준 시각 (MongoDB는 naive datetime을 UTC로 해석)
+        }
+
+    def get(self, key):
+        """
+        저장된 응답 조회
+
+        Returns:
+            dict: {"response": 응답, "model": 응답한 모델} (호출 측이 수정해도 되는 복사본), 없으면 None
+        """
+        entry = self._l1.get(key)
+        if entry is None and self._storage is not None:
+            entry = self._load(key)
+        metrics.record_cache("llm_responses", hit=entry is not None)
+        return copy.deepcopy(entry)
+
+    async def get_async(self, key):
+        """get의 비동기 버전 (L1에 없을 때만 스레드에서 저장소 조회)"""
+        entry = self._l1.get(key)
+        if entry is None and self._storage is not None:
+            entry = await asyncio.to_thread(self._load, key)
+        metrics.record_cache("llm_responses", hit=entry is not None)
+        return copy.deepcopy(entry)
+
+    def put(self, key, version, response, model):
+        """응답 저장 (저장 실패는 로그만 남김)"""
+        # 호출 측이 반환받은 응답을 수정해도 캐시(쓰기 지연 대기열 포함)에 영향이 없도록 복사본 저장
+        response = copy.deepcopy(response)
+        self._l1.set(key, {'response': response, 'model': model})
+        if self._storage is None:
+            return
+        try:
+            self._storage.upsert(COLLECTION_NAME, key, self._document(version, response, model))
+        except Exception as e:
+            print(f"   ⚠️ 응답 캐시 DB 저장 실패: {str(e)}")
+
+    async def put_async(self, key, version, response, model):
+        """put의 비동기 버전 (쓰기 지연을 끈 경우 DB 저장이 이벤트 루프를 막지 않도록 스레드에서 실행)"""
+        await asyncio.to_thread(self.put, key, version, response, model)
+
+    def stats(self):
+        return self._l1.stats()
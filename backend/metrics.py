@@ -0,0 +1,177 @@
+"""
+분석 파이프라인 계측 (Prometheus 텍스트 형식)
+
+단계별 소요 시간 히스토그램, 캐시 히트/미스 카운터, 외부 서비스 오류 카운터를 프로세스 메모리에 모으고
+GET /metrics에서 Prometheus 텍스트 형식으로 내보냅니다.
+값은 워커 프로세스별로 집계되므로 gunicorn 워커가 여러 개면 워커마다 따로 수집됩니다.
+
+사용 예:
+    with metrics.STAGE_SECONDS.time(stage="normalize"):
+        ...
+    metrics.CACHE_REQUESTS.inc(cache="reviews", result="hit")
+    metrics.UPSTREAM_ERRORS.inc(upstream="gemini")
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 히스토그램 구간 (초): DB 조회(ms 단위)부터 Gemini 호출(수십 초)까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # 라벨 값 튜플 -> 누적 값
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """구간별 누적 개수 + 합계를 기록하는 히스토그램"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # 라벨 값 튜플 -> [구간별 개수..., 합계, 전체 개수]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 실행 시간을 기록 (예외가 나도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+def render():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 반환"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- 분석 파이프라인 지표 ---
+
+STAGE_SECONDS = Histogram(
+    "analyze_stage_seconds",
+    "Time spent in each analyze pipeline stage",
+    ["stage"]
+)
+
+CRAWL_SOURCE_SECONDS = Histogram(
+    "community_crawl_source_seconds",
+    "Time spent crawling each community source (all search variations)",
+    ["source"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"]
+)
+
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Errors returned by upstream services (crawled sites, YouTube, Gemini)",
+    ["upstream"]
+)
+
+ADMISSIONS = Counter(
+    "admissions_total",
+    "Requests by admission lane and result (admitted/rejected/timeout)",
+    ["lane", "result"]
+)
+
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes by breaker and new state (open/half_open/closed)",
+    ["breaker", "state"]
+)
+
+CIRCUIT_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total",
+    "Calls short-circuited while the breaker was open or half-open",
+    ["breaker"]
+)
+
+GEMINI_QUEUE_SECONDS = Histogram(
+    "gemini_queue_wait_seconds",
+    "Time Gemini calls waited in the scheduler queue by model and priority",
+    ["model", "priority"]
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "HTTP request latency by endpoint and status code",
+    ["endpoint", "status"]
+)
+
+
+def record_cache(cache, hit):
+    """캐시 조회 결과 기록"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
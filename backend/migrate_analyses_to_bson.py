@@ -0,0 +1,87 @@
+"""
+분석 결과 형식 마이그레이션 스크립트 (1회 실행)
+JSON 문자열로 저장된 영상 분석(reviews.analysis)과 커뮤니티 분석(community_reviews.analysis_summary)을
+구조화된 서브 문서(pros, cons, ...)로 변환합니다.
+JSON으로 파싱되지 않는 텍스트 분석 결과는 그대로 둡니다. 여러 번 실행해도 안전합니다.
+"""
+import os
+import json
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+
+# MongoDB 설정
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+DATABASE_NAME = os.getenv('MONGODB_DATABASE', 'youtube_reviews_db')
+COLLECTION_NAME = os.getenv('MONGODB_COLLECTION', 'reviews')
+
+BATCH_SIZE = 500
+
+
+def _parse_analysis(analysis_raw):
+    """JSON 문자열이면 dict로 변환 (dict가 아니면 None)"""
+    try:
+        parsed = json.loads(analysis_raw)
+    except (TypeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def migrate_field(collection, field):
+    """
+    collection에서 field가 문자열인 문서를 서브 문서로 변환
+
+    Returns:
+        tuple: (변환한 문서 수, 텍스트로 남긴 문서 수)
+    """
+    converted = 0
+    skipped = 0
+    operations = []
+
+    for doc in collection.find({field: {'$type': 'string'}}, {field: 1}):
+        parsed = _parse_analysis(doc[field])
+        if parsed is None:
+            skipped += 1
+            continue
+        operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {field: parsed}}))
+        if len(operations) >= BATCH_SIZE:
+            converted += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        converted += collection.bulk_write(operations, ordered=False).modified_count
+    return converted, skipped
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("🔄 분석 결과 BSON 서브 문서 마이그레이션")
+    print("=" * 50)
+    print(f"데이터베이스: {DATABASE_NAME}")
+    print()
+
+    try:
+        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
+        client.admin.command('ping')
+        db = client[DATABASE_NAME]
+
+        for collection_name, field in ((COLLECTION_NAME, 'analysis'), ('community_reviews', 'analysis_summary')):
+            converted, skipped = migrate_field(db[collection_name], field)
+            print(f"✅ {collection_name}.{field}: {converted}개 변환, {skipped}개 텍스트 유지")
+
+        # product_results는 이미 파싱된 분석 결과로 만들어지므로 변환할 필요 없음
+        client.close()
+
+    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+        print(f"❌ MongoDB 연결 실패: {str(e)}")
+        print("   → MongoDB 서버가 실행 중인지 확인해주세요.")
+    except Exception as e:
+        print(f"❌ 오류 발생: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    print("\n" + "=" * 50)
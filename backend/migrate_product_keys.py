@@ -0,0 +1,68 @@
+"""
+제품명 조회 키 마이그레이션 스크립트 (1회 실행)
+youtube_videos / community_reviews 문서에 normalized_key를 채우고 product_name 고유 인덱스를 만듭니다.
+같은 product_name을 가진 중복 문서가 있으면 가장 최근 문서만 남기고 삭제합니다. 여러 번 실행해도 안전합니다.
+"""
+import sys
+from pymongo import UpdateOne
+
+import database
+import product_normalizer
+
+# Windows에서 UTF-8 출력을 위한 설정
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PRODUCT_COLLECTIONS = ['youtube_videos', 'community_reviews']
+
+
+def backfill_normalized_keys(collection):
+    """normalized_key가 없는 문서에 키 채우기 (변경한 문서 수 반환)"""
+    operations = [
+        UpdateOne(
+            {'_id': doc['_id']},
+            {'$set': {'normalized_key': product_normalizer.normalized_key(doc['product_name'])}}
+        )
+        for doc in collection.find({'normalized_key': {'$exists': False}}, {'product_name': 1})
+    ]
+    if not operations:
+        return 0
+    return collection.bulk_write(operations, ordered=False).modified_count
+
+
+def remove_duplicate_products(collection):
+    """같은 product_name 문서 중 updated_at이 가장 최근인 문서만 남기기 (삭제한 문서 수 반환)"""
+    duplicates = collection.aggregate([
+        {'$sort': {'updated_at': -1}},
+        {'$group': {'_id': '$product_name', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}}
+    ])
+    deleted = 0
+    for group in duplicates:
+        print(f"   ⚠️ 중복 제품명: {group['_id']} ({group['count']}개)")
+        deleted += collection.delete_many({'_id': {'$in': group['ids'][1:]}}).deleted_count
+    return deleted
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("🔑 제품명 조회 키 마이그레이션")
+    print("=" * 50)
+
+    if database.client is None or not database.check_connection():
+        print("❌ MongoDB에 연결할 수 없습니다.")
+        sys.exit(1)
+
+    for collection_name in PRODUCT_COLLECTIONS:
+        collection = database.get_collection(collection_name)
+        updated = backfill_normalized_keys(collection)
+        deleted = remove_duplicate_products(collection)
+        print(f"✅ {collection_name}: normalized_key {updated}개 추가, 중복 문서 {deleted}개 삭제")
+
+    # 중복을 정리했으므로 고유 인덱스 다시 생성
+    if database.create_index_if_not_exists():
+        print("✅ 인덱스 생성 완료")
+    else:
+        print("⚠️ 일부 인덱스를 생성하지 못했습니다. 위 로그를 확인해주세요.")
+
+    print("\n" + "=" * 50)
@@ -0,0 +1,107 @@
+"""
+Gemini 모델 목록 캐시
+
+LLM 호출마다 genai.list_models()를 부르지 않도록 generateContent를 지원하는 모델 목록을 ttl초 동안 보관하고,
+모델 이름별 GenerativeModel 인스턴스를 재사용합니다.
+쿼터 초과(429)를 반환한 모델은 quota_cooldown초 동안 후보에서 빼서 매번 실패할 요청을 보내지 않습니다.
+"""
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    사용 가능한 Gemini 모델 목록 + GenerativeModel 인스턴스 캐시
+
+    Args:
+        list_models (callable): 모델 목록 조회 함수 (genai.list_models)
+        model_factory (callable): 모델 이름 -> 모델 인스턴스 (genai.GenerativeModel)
+        ttl (float): 모델 목록 보관 시간 (초)
+        quota_cooldown (float): 쿼터 초과 모델을 후보에서 제외하는 시간 (초)
+    """
+
+    def __init__(self, list_models, model_factory, ttl=3600, quota_cooldown=60):
+        self._list_models = list_models
+        self._model_factory = model_factory
+        self.ttl = ttl
+        self.quota_cooldown = quota_cooldown
+        self._names = []
+        self._loaded_at = None
+        self._instances = {}  # 모델 이름 -> GenerativeModel
+        self._cooldown_until = {}  # 모델 이름 -> 다시 시도할 수 있는 시각
+        self._counters = {'refreshes': 0, 'refresh_errors': 0, 'quota_skips': 0}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def is_fresh(self):
+        """모델 목록을 다시 조회하지 않아도 되는지 (비동기 호출 측에서 스레드 전환 여부 판단용)"""
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _refresh(self):
+        """모델 목록 다시 조회 (동시에 여러 스레드가 만료를 발견해도 조회는 1번)"""
+        with self._refresh_lock:
+            if self.is_fresh():
+                return
+            try:
+                names = []
+                for model in self._list_models():
+                    if 'generateContent' in model.supported_generation_methods:
+                        names.append(model.name.replace('models/', ''))
+            except Exception as e:
+                with self._lock:
+                    self._counters['refresh_errors'] += 1
+                    if not self._names:
+                        raise
+                # 이전 목록이 있으면 계속 사용 (다음 호출에서 다시 조회)
+                print(f"   ⚠️ 모델 목록 조회 실패, 이전 목록 사용: {str(e)}")
+                return
+
+            # Flash 모델을 우선적으로 사용 (쿼터가 더 여유로울 수 있음)
+            flash_models = [m for m in names if 'flash' in m.lower()]
+            with self._lock:
+                self._names = flash_models + [m for m in names if m not in flash_models]
+                self._loaded_at = time.monotonic()
+                self._counters['refreshes'] += 1
+
+    def models(self):
+        """generateContent를 지원하는 전체 모델 목록 (Flash 모델 우선)"""
+        if not self.is_fresh():
+            self._refresh()
+        return list(self._names)
+
+    def candidates(self):
+        """지금 시도할 모델 목록 (쿼터 초과로 대기 중인 모델 제외)"""
+        names = self.models()
+        now = time.monotonic()
+        with self._lock:
+            available = [name for name in names if self._cooldown_until.get(name, 0) <= now]
+            self._counters['quota_skips'] += len(names) - len(available)
+        return available
+
+    def get(self, model_name):
+        """모델 인스턴스 (이름별로 한 번만 생성)"""
+        with self._lock:
+            model = self._instances.get(model_name)
+            if model is None:
+                model = self._model_factory(model_name)
+                self._instances[model_name] = model
+            return model
+
+    def mark_quota_exceeded(self, model_name, cooldown=None):
+        """쿼터 초과 모델을 cooldown초(없으면 quota_cooldown초) 동안 후보에서 제외"""
+        with self._lock:
+            self._cooldown_until[model_name] = time.monotonic() + (self.quota_cooldown if cooldown is None else cooldown)
+
+    def mark_success(self, model_name):
+        with self._lock:
+            self._cooldown_until.pop(model_name, None)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'models': list(self._names),
+                'age': now - self._loaded_at if self._loaded_at is not None else None,
+                'cooling_down': sorted(name for name, until in self._cooldown_until.items() if until > now),
+                **self._counters,
+            }
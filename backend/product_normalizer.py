@@ -280,6 +280,21 @@ def extract_sub_model(product_name):
     return ""
 
 
+def normalized_key(normalized_name):
+    """
+    정규화된 제품명을 DB 조회용 키로 변환 (공백 제거 + 소문자)
+    
+    예: "갤럭시 S25 Ultra" -> "갤럭시s25ultra"
+    
+    Args:
+        normalized_name: normalize_product_name()으로 정규화된 제품명
+    
+    Returns:
+        str: normalized_key 필드에 저장/조회할 키
+    """
+    return re.sub(r'\s+', '', normalized_name or '').lower()
+
+
 def find_similar_product_in_db(product_name, db_products):
     """
     DB에 저장된 제품명 중 유사한 제품 찾기 (엄격한 매칭)
@@ -0,0 +1,99 @@
+"""
+제품별 materialized 분석 결과
+
+/api/analyze-product 응답에 필요한 데이터(영상 분석, 커뮤니티 요약, 구매 가이드 입력용 요약)를
+하나의 문서로 미리 만들어 product_results 컬렉션에 저장합니다.
+캐시가 모두 채워진 제품은 정규화 후 인덱스 조회 1회로 응답할 수 있고, JSON 재파싱도 없습니다.
+
+구성 요소(youtube_videos, reviews, community_reviews)가 바뀌면
+app.analyze_product의 캐시 미스 경로와 batch_crawler가 이 문서를 다시 만듭니다.
+
+data_updated_at은 영상 목록/커뮤니티 후기를 실제로 수집한 시각입니다.
+DB에 있던 구성 요소로 만든 문서는 수집 시각을 알 수 없으므로 None으로 두고 오래된 데이터로 취급합니다.
+
+자막이 없거나 분석에 실패한 영상은 빼고 만들며 failed_video_ids에 기록합니다.
+이런 결과도 저장해 다음 요청은 조회 1회로 응답하고, 실패한 영상은 partial_max_age가 지나면 재수집에서 다시 시도합니다.
+"""
+import hashlib
+import time
+
+# 버전 태그가 생기기 전에 저장된 결과의 버전 (ai_service.PRODUCT_RESULT_VERSION의 첫 값)
+LEGACY_PRODUCT_RESULT_VERSION = "video-v1/community-v1"
+
+COMMUNITY_NOTE = "클리앙과 뽐뿌 커뮤니티에서 직접 수집한 신뢰할 수 있는 사용자 후기입니다."
+
+
+def summarize_analysis(analysis):
+    """영상/커뮤니티 분석 결과를 구매 가이드 생성용 텍스트로 요약"""
+    if isinstance(analysis, dict):
+        return f"장점: {', '.join(analysis.get('pros', []))}\n단점: {', '.join(analysis.get('cons', []))}"
+    return str(analysis)
+
+
+def count_reviews(reviews_text):
+    """후기 텍스트에서 실제 후기 항목 수 계산 ("[소스]"로 시작하는 줄만 카운트)"""
+    if not reviews_text:
+        return 0
+    return len([line for line in reviews_text.split('\n') if line.strip().startswith('[')])
+
+
+def reviews_hash(reviews_text):
+    """커뮤니티 후기 원문의 해시 (원문이 바뀌었는지 확인해 이전 원문으로 만든 분석 결과를 지울 때 사용)"""
+    return hashlib.sha256((reviews_text or '').encode('utf-8')).hexdigest()
+
+
+def oldest_timestamp(timestamps):
+    """구성 요소별 수집 시각 중 가장 오래된 값 (하나라도 모르면 None)"""
+    if not timestamps or any(not ts for ts in timestamps):
+        return None
+    return min(timestamps)
+
+
+def build_product_result(youtube_reviews, community_summary, community_review_count, community_sources,
+                         data_updated_at=None, failed_video_ids=None):
+    """
+    제품 분석 결과 문서 생성
+
+    Args:
+        youtube_reviews (list): [{"video_id", "title", "analysis"}, ...] (analysis는 dict 또는 str)
+        community_summary (dict 또는 None): 커뮤니티 분석 결과
+        community_review_count (int): 수집된 커뮤니티 후기 개수 (후기 원문은 저장하지 않음)
+        community_sources (list): 커뮤니티 소스 리스트
+        data_updated_at (int): 영상 목록/커뮤니티 후기 수집 시각 (모르면 None)
+        failed_video_ids (list): 자막 추출/분석에 실패해 youtube_reviews에서 빠진 영상 ID
+
+    Returns:
+        dict: youtube_reviews, youtube_summaries, community_summary, community_reviews, data_updated_at,
+              failed_video_ids
+    """
+    return {
+        "youtube_reviews": youtube_reviews,
+        "youtube_summaries": [summarize_analysis(review["analysis"]) for review in youtube_reviews],
+        "community_summary": community_summary,
+        "community_reviews": {
+            "summary": community_summary,  # dict 또는 None
+            "raw_count": community_review_count or 0,
+            "source": ", ".join(community_sources) if community_sources else "수집 실패",
+            "note": COMMUNITY_NOTE
+        },
+        "data_updated_at": data_updated_at,
+        "failed_video_ids": list(failed_video_ids or [])
+    }
+
+
+def is_stale(result, max_age, version=None, partial_max_age=None):
+    """
+    수집한 지 max_age초가 지났거나 수집 시각을 모르는 결과인지 확인
+    
+    version을 주면 다른 분석 버전으로 만든 결과도 오래된 결과로 봅니다
+    (버전 태그가 없는 결과는 LEGACY_PRODUCT_RESULT_VERSION으로 간주).
+    실패한 영상이 있는 결과는 partial_max_age(주어진 경우)가 지나면 오래된 결과로 봅니다.
+    """
+    if version is not None and result.get("analysis_version", LEGACY_PRODUCT_RESULT_VERSION) != version:
+        return True
+    if result.get("failed_video_ids") and partial_max_age is not None:
+        max_age = min(max_age, partial_max_age)
+    data_updated_at = result.get("data_updated_at")
+    if not data_updated_at:
+        return True
+    return time.time() - data_updated_at > max_age
@@ -0,0 +1,138 @@
+"""
+이전 버전 분석 결과 재분석 스크립트
+프롬프트를 바꾸면 clear_cache.py로 캐시를 모두 지우는 대신 ai_service의 *_ANALYSIS_VERSION을 올리고,
+이 스크립트로 이전 버전 분석 결과를 조금씩 다시 분석합니다 (Gemini 호출 사이에 --interval초 대기).
+재분석 전까지는 요청이 들어온 영상/제품만 캐시 미스로 새로 분석되므로 한꺼번에 Gemini 호출이 몰리지 않습니다.
+자막은 transcript_store에 저장된 원문을 사용하므로 대부분 다시 다운로드하지 않습니다.
+
+재분석에 실패한 문서(자막 없음, Gemini 오류 등)는 실패 횟수를 기록하고, 같은 버전으로 --max-failures번 실패하면
+이후 실행의 대상에서 제외합니다 (계속 실패하는 문서가 매번 앞쪽 --limit개를 차지해 나머지가 재분석되지 않는 것을 방지).
+
+사용 예:
+    python reanalyze_outdated.py --limit 50 --interval 5
+"""
+import argparse
+import sys
+import time
+
+import ai_service
+import database
+import gemini_scheduler
+import transcript_store
+from batch_crawler import get_community_reviews_text_from_db, save_community_analysis_to_db
+
+# Windows에서 UTF-8 출력을 위한 설정
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def record_failure(collection, key, version, max_failures):
+    """
+    재분석 실패 기록 (같은 버전으로 max_failures번 실패하면 REANALYZE_SKIPPED_FIELD에 버전을 남겨 이후 실행에서 제외)
+
+    Returns:
+        int: 이 버전으로 연속 실패한 횟수
+    """
+    document = database.storage.get(collection, key, ['reanalyze_failed_version', 'reanalyze_failures']) or {}
+    failures = document.get('reanalyze_failures', 0) if document.get('reanalyze_failed_version') == version else 0
+    failures += 1
+    fields = {
+        'reanalyze_failed_version': version,
+        'reanalyze_failures': failures,
+        'reanalyze_failed_at': int(time.time())
+    }
+    if failures >= max_failures:
+        fields[database.REANALYZE_SKIPPED_FIELD] = version
+        print(f"   ⏭️ [{key}] {failures}번 실패: 이 버전({version}) 재분석 대상에서 제외")
+    database.storage.update(collection, key, fields)
+    return failures
+
+
+def reanalyze_reviews(limit, interval, max_failures):
+    """이전 버전 영상 분석 결과를 다시 분석 (재분석한 개수 반환)"""
+    version = ai_service.VIDEO_ANALYSIS_VERSION
+    video_ids = database.storage.outdated_keys(
+        database.COLLECTION_NAME, 'analysis_version', version, database.LEGACY_ANALYSIS_VERSION, limit,
+        skip_field=database.REANALYZE_SKIPPED_FIELD
+    )
+    print(f"🎬 이전 버전 영상 분석: {len(video_ids)}개")
+
+    done = 0
+    for video_id in video_ids:
+        script = transcript_store.get_youtube_script(video_id)
+        if script.startswith("❌"):
+            print(f"   ⚠️ [{video_id}] 자막 추출 실패: {script}")
+            record_failure(database.COLLECTION_NAME, video_id, version, max_failures)
+            continue
+
+        analysis = ai_service.analyze_with_gemini(script)
+        if isinstance(analysis, str) and analysis.startswith("❌"):
+            print(f"   ⚠️ [{video_id}] 분석 실패: {analysis}")
+            record_failure(database.COLLECTION_NAME, video_id, version, max_failures)
+        else:
+            database.save_review_to_db(
+                video_id, analysis,
+                version=version, model=ai_service.last_model_used()
+            )
+            done += 1
+        time.sleep(interval)
+    return done
+
+
+def reanalyze_community_reviews(limit, interval, max_failures):
+    """이전 버전 커뮤니티 분석 결과를 다시 분석 (재분석한 개수 반환)"""
+    version = ai_service.COMMUNITY_ANALYSIS_VERSION
+    product_names = database.storage.outdated_keys(
+        'community_reviews', 'analysis_version', version, database.LEGACY_ANALYSIS_VERSION, limit,
+        skip_field=database.REANALYZE_SKIPPED_FIELD
+    )
+    print(f"💬 이전 버전 커뮤니티 분석: {len(product_names)}개")
+
+    done = 0
+    for product_name in product_names:
+        reviews_text = get_community_reviews_text_from_db(product_name)
+        if not reviews_text:
+            print(f"   ⚠️ [{product_name}] 후기 원문 없음")
+            record_failure('community_reviews', product_name, version, max_failures)
+            continue
+
+        analysis = ai_service.analyze_community_reviews_with_gemini(reviews_text)
+        if isinstance(analysis, str) and analysis.startswith("❌"):
+            print(f"   ⚠️ [{product_name}] 분석 실패: {analysis}")
+            record_failure('community_reviews', product_name, version, max_failures)
+        else:
+            save_community_analysis_to_db(product_name, analysis, model=ai_service.last_model_used())
+            done += 1
+        time.sleep(interval)
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="이전 버전 분석 결과 재분석")
+    parser.add_argument('--limit', type=int, default=50, help="컬렉션별 최대 재분석 개수 (기본값: 50)")
+    parser.add_argument('--interval', type=float, default=5, help="Gemini 호출 사이 대기 시간(초) (기본값: 5)")
+    parser.add_argument('--max-failures', type=int, default=3,
+                        help="같은 버전으로 이 횟수만큼 실패한 문서는 이후 실행에서 제외 (기본값: 3)")
+    args = parser.parse_args()
+    
+    # 배치 작업은 API 서버 요청을 위해 Gemini 쿼터 일부를 남겨 둠
+    gemini_scheduler.set_default_priority(gemini_scheduler.BATCH)
+
+    print("=" * 50)
+    print("🔄 이전 버전 분석 결과 재분석")
+    print("=" * 50)
+    print(f"영상 분석 버전: {ai_service.VIDEO_ANALYSIS_VERSION}")
+    print(f"커뮤니티 분석 버전: {ai_service.COMMUNITY_ANALYSIS_VERSION}")
+    print()
+
+    if not database.check_connection():
+        print("❌ 데이터베이스에 연결할 수 없습니다.")
+        sys.exit(1)
+
+    reviews_done = reanalyze_reviews(args.limit, args.interval, args.max_failures)
+    community_done = reanalyze_community_reviews(args.limit, args.interval, args.max_failures)
+
+    print("\n" + "=" * 50)
+    print(f"✅ 재분석 완료: 영상 {reviews_done}개, 커뮤니티 {community_done}개")
+    print("(제품별 종합 결과는 다음 요청 때 백그라운드에서 다시 만들어집니다)")
+    print("=" * 50)
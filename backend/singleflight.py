@@ -0,0 +1,129 @@
+"""
+Single-flight 모듈: 같은 키에 대한 동시 요청을 하나의 실행으로 합치기
+
+신제품 출시 직후처럼 같은 제품("갤25", "s25", "갤럭시 S25" → "갤럭시 S25")에 대한
+요청이 동시에 몰릴 때, 캐시 미스마다 크롤링/Gemini 호출이 반복되지 않도록
+첫 번째 요청(leader)만 실제로 계산하고 나머지 요청은 그 결과를 기다렸다가 공유합니다.
+"""
+import threading
+
+
+class _Call:
+    """진행 중인 계산 1건 (leader가 결과를 채우면 대기 중인 요청들이 깨어남)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    키별 in-flight 계산 공유
+
+    사용 예:
+        flight = SingleFlight()
+        result = flight.do("갤럭시 S25", lambda: expensive_work("갤럭시 S25"))
+    """
+
+    def __init__(self, name="singleflight"):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        key에 대해 진행 중인 계산이 있으면 그 결과를 기다리고, 없으면 fn()을 직접 실행
+
+        Args:
+            key: 계산을 식별하는 키 (정규화된 제품명, video_id 등)
+            fn: 인자 없는 계산 함수
+
+        Returns:
+            fn()의 반환값 (leader와 대기 요청 모두 같은 객체를 받음)
+
+        Raises:
+            fn()에서 발생한 예외 (대기 요청에도 동일하게 전파)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                is_leader = True
+
+        if not is_leader:
+            print(f"   ⏳ [{self.name}] 진행 중인 계산 대기: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            # 완료된 계산은 즉시 제거 (이후 요청은 DB 캐시를 통해 처리)
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        if call.waiters:
+            print(f"   🤝 [{self.name}] {call.waiters}개 요청이 결과 공유: {key}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        """현재 진행 중인 계산 개수"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight의 asyncio 버전 (ASGI 앱용, 같은 이벤트 루프 안에서만 사용)
+
+    사용 예:
+        flight = AsyncSingleFlight()
+        result = await flight.do("갤럭시 S25", lambda: expensive_work_async("갤럭시 S25"))
+    """
+
+    def __init__(self, name="singleflight"):
+        self.name = name
+        self._calls = {}  # key -> asyncio.Task
+
+    async def do(self, key, fn):
+        """
+        key에 대해 진행 중인 계산이 있으면 그 결과를 기다리고, 없으면 fn()이 반환한 코루틴을 실행
+
+        Args:
+            key: 계산을 식별하는 키
+            fn: 인자 없이 코루틴을 반환하는 함수
+
+        Returns:
+            코루틴의 반환값 (예외도 대기 요청에 동일하게 전파)
+        """
+        import asyncio
+
+        task = self._calls.get(key)
+        if task is not None:
+            print(f"   ⏳ [{self.name}] 진행 중인 계산 대기: {key}")
+            # 대기 요청이 취소되어도 leader의 계산은 계속 진행
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        # 완료된 계산은 즉시 제거 (이후 요청은 DB 캐시를 통해 처리)
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        """현재 진행 중인 계산 개수"""
+        return len(self._calls)
@@ -0,0 +1,397 @@
+"""
+문서 저장소 백엔드
+
+database.py / batch_crawler.py / guide_store.py의 조회·저장 함수는 이 인터페이스만 사용합니다.
+- MongoStorage: MongoDB (기본값, 여러 서버가 같은 데이터를 공유)
+- SQLiteStorage: 파일 기반 SQLite (WAL 모드), 단일 노드 배포/로컬 벤치마크/CI용 (네트워크 없이 조회)
+
+컬렉션마다 문서를 구분하는 키 필드가 하나씩 있습니다 (reviews: video_id, 나머지: product_name).
+youtube_videos / community_reviews 문서는 normalized_key 필드로도 조회할 수 있습니다.
+"""
+import base64
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+
+class MongoStorage:
+    """
+    MongoDB 저장소
+
+    Args:
+        db: pymongo Database
+        key_fields (dict): 컬렉션 이름 -> 키 필드 (없으면 product_name)
+    """
+
+    def __init__(self, db, key_fields):
+        self._db = db
+        self._key_fields = key_fields
+
+    def key_field(self, collection):
+        """컬렉션의 문서 키 필드 이름"""
+        return self._key_fields.get(collection, 'product_name')
+
+    @staticmethod
+    def _projection(fields):
+        if fields is None:
+            return {'_id': 0}
+        return dict({'_id': 0}, **{field: 1 for field in fields})
+
+    def get(self, collection, key, fields=None):
+        """키로 문서 1개 조회 (fields 지정 시 해당 필드만)"""
+        return self._db[collection].find_one({self.key_field(collection): key}, self._projection(fields))
+
+    def get_many(self, collection, keys):
+        """여러 키의 문서를 한 번에 조회 -> {키: 문서}"""
+        key_field = self.key_field(collection)
+        return {
+            doc[key_field]: doc
+            for doc in self._db[collection].find({key_field: {'$in': list(keys)}}, {'_id': 0})
+        }
+
+    def find_by_normalized_key(self, collection, normalized_key, fields=None):
+        """normalized_key로 문서 1개 조회"""
+        return self._db[collection].find_one({'normalized_key': normalized_key}, self._projection(fields))
+
+    def keys_without_normalized_key(self, collection):
+        """normalized_key가 없는 이전 문서의 키 목록"""
+        key_field = self.key_field(collection)
+        return [doc[key_field] for doc in self._db[collection].find({'normalized_key': {'$exists': False}}, {key_field: 1})]
+
+    def outdated_keys(self, collection, field, version, legacy_version, limit, skip_field=None):
+        """
+        field 값이 version이 아닌 문서의 키 목록 (필드가 없는 문서는 legacy_version으로 간주)
+
+        Args:
+            limit (int): 최대 개수
+            skip_field (str): 이 필드 값이 version인 문서는 제외 (재분석을 포기한 문서 등)
+        """
+        key_field = self.key_field(collection)
+        if version == legacy_version:
+            query = {field: {'$exists': True, '$ne': version}}
+        else:
+            query = {field: {'$ne': version}}  # 필드가 없는 문서도 포함
+        if skip_field is not None:
+            query[skip_field] = {'$ne': version}
+        return [doc[key_field] for doc in self._db[collection].find(query, {key_field: 1}).limit(limit)]
+
+    def upsert(self, collection, key, fields):
+        """문서의 필드 갱신 (없으면 생성)"""
+        key_field = self.key_field(collection)
+        self._db[collection].update_one({key_field: key}, {'$set': dict(fields, **{key_field: key})}, upsert=True)
+
+    def upsert_many(self, collection, documents):
+        """여러 문서의 필드를 한 번에 갱신 (documents: {키: 필드 dict})"""
+        key_field = self.key_field(collection)
+        operations = [
+            UpdateOne({key_field: key}, {'$set': dict(fields, **{key_field: key})}, upsert=True)
+            for key, fields in documents.items()
+        ]
+        if operations:
+            self._db[collection].bulk_write(operations, ordered=False)
+
+    def update(self, collection, key, fields):
+        """이미 있는 문서의 필드만 갱신 (없으면 아무것도 하지 않음)"""
+        self._db[collection].update_one({self.key_field(collection): key}, {'$set': fields}, upsert=False)
+
+    def replace(self, collection, key, document):
+        """문서 전체 교체 (없으면 생성)"""
+        key_field = self.key_field(collection)
+        self._db[collection].replace_one({key_field: key}, dict(document, **{key_field: key}), upsert=True)
+
+    def delete(self, collection, key):
+        self._db[collection].delete_one({self.key_field(collection): key})
+
+    def write_many(self, collection, operations):
+        """
+        여러 쓰기를 순서대로 한 번에 실행 (bulk_write 1회)
+
+        Args:
+            operations (list): [(종류, 키, 필드 또는 문서), ...]
+                               종류는 'upsert' | 'update' | 'replace' | 'delete' (delete는 세 번째 값 무시)
+        """
+        key_field = self.key_field(collection)
+        requests = []
+        for op, key, payload in operations:
+            query = {key_field: key}
+            if op == 'upsert':
+                requests.append(UpdateOne(query, {'$set': dict(payload, **query)}, upsert=True))
+            elif op == 'update':
+                requests.append(UpdateOne(query, {'$set': payload}, upsert=False))
+            elif op == 'replace':
+                requests.append(ReplaceOne(query, dict(payload, **query), upsert=True))
+            else:
+                requests.append(DeleteOne(query))
+        if requests:
+            self._db[collection].bulk_write(requests, ordered=True)
+
+    def create_indexes(self, indexes):
+        """
+        인덱스 생성 (인덱스별로 따로 시도)
+
+        Args:
+            indexes (list): [(컬렉션 이름, 인덱스 키, 옵션 dict), ...] (예: {'unique': True}, {'expireAfterSeconds': 86400})
+
+        Returns:
+            bool: 모든 인덱스 생성 성공 여부
+        """
+        success = True
+        for collection, key, options in indexes:
+            try:
+                self._db[collection].create_index(key, **options)
+                print(f"   ✅ 인덱스 생성 완료: {collection}.{key}")
+            except Exception as e:
+                # 인덱스가 이미 존재하는 경우 무시
+                if 'already exists' in str(e).lower():
+                    continue
+                print(f"   ⚠️ 인덱스 생성 오류 ({collection}.{key}): {str(e)}")
+                success = False
+        return success
+
+
+def _json_default(value):
+    """JSON으로 바로 저장할 수 없는 값 변환 (bytes는 base64, datetime(cached_at 등)은 ISO 문자열로 감싸 읽을 때 복원)"""
+    if isinstance(value, bytes):
+        return {'$binary': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime):
+        return {'$date': value.isoformat(sep=' ')}
+    return str(value)
+
+
+def _json_object_hook(obj):
+    if len(obj) == 1 and '$binary' in obj:
+        return base64.b64decode(obj['$binary'])
+    if len(obj) == 1 and '$date' in obj:
+        return datetime.fromisoformat(obj['$date'])
+    return obj
+
+
+def _loads(doc):
+    return json.loads(doc, object_hook=_json_object_hook)
+
+
+class SQLiteStorage:
+    """
+    SQLite 저장소 (WAL 모드)
+
+    모든 컬렉션을 documents 테이블 하나에 (컬렉션, 키) 기본 키로 저장하고, 문서 본문은 JSON으로 보관합니다.
+    연결은 스레드마다 하나씩 열고, WAL 모드라 읽기는 쓰기를 기다리지 않습니다.
+
+    MongoDB TTL 인덱스(expireAfterSeconds)는 create_indexes에서 컬렉션별 만료 규칙으로 등록하고,
+    쓰기 후 expire_interval초마다 한 번씩 만료된 문서를 삭제합니다 (MongoDB TTL 모니터와 같은 방식).
+
+    Args:
+        path (str): 데이터베이스 파일 경로
+        key_fields (dict): 컬렉션 이름 -> 키 필드 (없으면 product_name)
+        expire_interval (float): 만료 문서 삭제 최소 간격 (초)
+    """
+
+    # get_many의 IN (...) 절 하나에 넣는 최대 키 수 (SQLite 바인딩 변수 제한 999보다 작게)
+    MAX_KEYS_PER_QUERY = 500
+
+    def __init__(self, path, key_fields, expire_interval=60):
+        self.path = path
+        self._key_fields = key_fields
+        self._local = threading.local()
+        self.expire_interval = expire_interval
+        self._ttl = {}  # 컬렉션 -> (날짜 필드, 만료 시간(초))
+        self._ttl_lock = threading.Lock()
+        self._last_expire = 0.0
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                key TEXT NOT NULL,
+                normalized_key TEXT,
+                doc TEXT NOT NULL,
+                PRIMARY KEY (collection, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_normalized_key ON documents (collection, normalized_key)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: 자동 트랜잭션 대신 필요한 곳에서 BEGIN IMMEDIATE 사용
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key_field(self, collection):
+        return self._key_fields.get(collection, 'product_name')
+
+    @staticmethod
+    def _select(document, fields):
+        if fields is None:
+            return document
+        return {field: document[field] for field in fields if field in document}
+
+    def _read(self, collection, key):
+        row = self._conn().execute(
+            "SELECT doc FROM documents WHERE collection = ? AND key = ?", (collection, key)
+        ).fetchone()
+        return _loads(row[0]) if row else None
+
+    def _write(self, conn, collection, key, document):
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (collection, key, normalized_key, doc) VALUES (?, ?, ?, ?)",
+            (collection, key, document.get('normalized_key'), json.dumps(document, ensure_ascii=False, default=_json_default))
+        )
+
+    def _merge(self, collection, documents, create):
+        """(키, 필드) 목록을 기존 문서에 합쳐 저장 (create=False면 없는 문서는 건너뜀)"""
+        key_field = self.key_field(collection)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, fields in documents:
+                document = self._read(collection, key)
+                if document is None:
+                    if not create:
+                        continue
+                    document = {}
+                document.update(fields)
+                document[key_field] = key
+                self._write(conn, collection, key, document)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_expire()
+
+    def get(self, collection, key, fields=None):
+        document = self._read(collection, key)
+        return self._select(document, fields) if document is not None else None
+
+    def get_many(self, collection, keys):
+        keys = list(keys)
+        results = {}
+        for i in range(0, len(keys), self.MAX_KEYS_PER_QUERY):
+            chunk = keys[i:i + self.MAX_KEYS_PER_QUERY]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn().execute(
+                f"SELECT key, doc FROM documents WHERE collection = ? AND key IN ({placeholders})",
+                [collection] + chunk
+            ).fetchall()
+            results.update((key, _loads(doc)) for key, doc in rows)
+        return results
+
+    def find_by_normalized_key(self, collection, normalized_key, fields=None):
+        row = self._conn().execute(
+            "SELECT doc FROM documents WHERE collection = ? AND normalized_key = ? LIMIT 1",
+            (collection, normalized_key)
+        ).fetchone()
+        return self._select(_loads(row[0]), fields) if row else None
+
+    def keys_without_normalized_key(self, collection):
+        rows = self._conn().execute(
+            "SELECT key FROM documents WHERE collection = ? AND normalized_key IS NULL", (collection,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def outdated_keys(self, collection, field, version, legacy_version, limit, skip_field=None):
+        query = "SELECT key FROM documents WHERE collection = ? AND COALESCE(json_extract(doc, ?), ?) != ?"
+        params = [collection, f'$.{field}', legacy_version, version]
+        if skip_field is not None:
+            query += " AND json_extract(doc, ?) IS NOT ?"
+            params += [f'$.{skip_field}', version]
+        rows = self._conn().execute(query + " LIMIT ?", params + [limit]).fetchall()
+        return [row[0] for row in rows]
+
+    def upsert(self, collection, key, fields):
+        self._merge(collection, [(key, fields)], create=True)
+
+    def upsert_many(self, collection, documents):
+        if documents:
+            self._merge(collection, documents.items(), create=True)
+
+    def update(self, collection, key, fields):
+        self._merge(collection, [(key, fields)], create=False)
+
+    def replace(self, collection, key, document):
+        self._write(self._conn(), collection, key, dict(document, **{self.key_field(collection): key}))
+        self._maybe_expire()
+
+    def delete(self, collection, key):
+        self._conn().execute("DELETE FROM documents WHERE collection = ? AND key = ?", (collection, key))
+
+    def write_many(self, collection, operations):
+        """MongoStorage.write_many와 같지만 트랜잭션 1개로 실행"""
+        key_field = self.key_field(collection)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for op, key, payload in operations:
+                if op == 'delete':
+                    conn.execute("DELETE FROM documents WHERE collection = ? AND key = ?", (collection, key))
+                    continue
+                if op == 'replace':
+                    document = {}
+                else:
+                    document = self._read(collection, key)
+                    if document is None:
+                        if op == 'update':
+                            continue
+                        document = {}
+                document.update(payload)
+                document[key_field] = key
+                self._write(conn, collection, key, document)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_expire()
+
+    def create_indexes(self, indexes):
+        """
+        (컬렉션, 키) 기본 키와 normalized_key 인덱스는 테이블 생성 시 함께 만들어지므로
+        TTL 인덱스(expireAfterSeconds)만 만료 규칙으로 등록
+        """
+        with self._ttl_lock:
+            for collection, key, options in indexes:
+                if 'expireAfterSeconds' in options:
+                    self._ttl[collection] = (key, options['expireAfterSeconds'])
+        return True
+
+    def expire(self):
+        """
+        만료 규칙이 등록된 컬렉션에서 날짜 필드가 만료 시간보다 오래된 문서 삭제 (기준 시각은 UTC)
+
+        Returns:
+            int: 삭제한 문서 수
+        """
+        with self._ttl_lock:
+            rules = list(self._ttl.items())
+        now = datetime.utcnow()
+        deleted = 0
+        for collection, (field, seconds) in rules:
+            cutoff = (now - timedelta(seconds=seconds)).isoformat(sep=' ')
+            # 날짜는 {"$date": "..."}로 저장되고, 이전 버전은 str(datetime) 문자열로 저장됨 (둘 다 같은 형식으로 비교)
+            cursor = self._conn().execute(
+                "DELETE FROM documents WHERE collection = ? "
+                "AND COALESCE(json_extract(doc, ?), json_extract(doc, ?)) < ?",
+                (collection, f'$.{field}."$date"', f'$.{field}', cutoff)
+            )
+            deleted += cursor.rowcount
+        return deleted
+
+    def _maybe_expire(self):
+        """마지막 삭제 후 expire_interval초가 지났으면 만료 문서 삭제 (실패해도 쓰기는 성공으로 처리)"""
+        if not self._ttl:
+            return
+        with self._ttl_lock:
+            now = time.monotonic()
+            if now - self._last_expire < self.expire_interval:
+                return
+            self._last_expire = now
+        try:
+            self.expire()
+        except Exception as e:
+            print(f"   ⚠️ 만료 문서 삭제 실패: {str(e)}")
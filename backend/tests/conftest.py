@@ -0,0 +1,18 @@
+"""
+단위 테스트 공통 설정 (backend 디렉터리에서 python -m pytest -q tests)
+
+backend/test_*.py는 실제 MongoDB/네트워크에 연결하는 수동 확인 스크립트이므로 여기서는 수집하지 않습니다.
+모듈 import 시 MongoDB에 연결하거나 API 키가 없어 종료하지 않도록 임시 SQLite 저장소와 테스트용 키를 지정합니다.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='backend-tests-'), 'cache.db')
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+# database.storage는 바로 저장 (쓰기 지연은 test_write_behind.py에서 따로 확인)
+os.environ['WRITE_BEHIND_INTERVAL'] = '0'
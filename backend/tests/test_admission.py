@@ -0,0 +1,82 @@
+"""admission: slow lane의 동시 실행/대기 제한과 거절 시 503 + Retry-After 응답"""
+import threading
+
+import pytest
+
+import app as app_module
+from admission import Lane, LaneFull
+
+
+def hold_slot(lane):
+    """다른 스레드에서 lane 슬롯을 잡고 있다가 release.set() 시 반환"""
+    acquired, release = threading.Event(), threading.Event()
+
+    def worker():
+        with lane.acquire():
+            acquired.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert acquired.wait(5)
+    return thread, release
+
+
+def test_acquire_tracks_running_requests():
+    lane = Lane("test", max_concurrent=2, max_waiting=1)
+    with lane.acquire():
+        assert lane.stats()["running"] == 1
+    assert lane.stats()["running"] == 0
+
+
+def test_rejects_immediately_when_waiting_is_full():
+    lane = Lane("test", max_concurrent=1, max_waiting=0, retry_after=7)
+    thread, release = hold_slot(lane)
+
+    with pytest.raises(LaneFull) as exc_info:
+        with lane.acquire():
+            pass
+    assert exc_info.value.retry_after == 7
+
+    release.set()
+    thread.join(5)
+
+
+def test_rejects_after_wait_timeout():
+    lane = Lane("test", max_concurrent=1, max_waiting=1, wait_timeout=0.05, retry_after=3)
+    thread, release = hold_slot(lane)
+
+    with pytest.raises(LaneFull) as exc_info:
+        with lane.acquire():
+            pass
+    assert exc_info.value.retry_after == 3
+    assert lane.stats()["waiting"] == 0
+
+    release.set()
+    thread.join(5)
+
+
+def test_waiter_runs_when_slot_is_released():
+    lane = Lane("test", max_concurrent=1, max_waiting=1, wait_timeout=5)
+    thread, release = hold_slot(lane)
+    threading.Timer(0.05, release.set).start()
+
+    with lane.acquire():
+        assert lane.stats()["running"] == 1
+    thread.join(5)
+
+
+def test_full_slow_lane_returns_503_with_retry_after(monkeypatch):
+    lane = Lane("slow", max_concurrent=1, max_waiting=0, retry_after=9)
+    monkeypatch.setattr(app_module, "slow_lane", lane)
+    thread, release = hold_slot(lane)
+
+    try:
+        response = app_module.app.test_client().post("/api/analyze", json={"video_id": "no-cache-video"})
+    finally:
+        release.set()
+        thread.join(5)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "9"
+    assert response.get_json()["retry_after"] == 9
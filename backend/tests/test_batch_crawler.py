@@ -0,0 +1,84 @@
+"""batch_crawler: 재수집 중 기존 materialized 결과 유지, 후기 원문 변경 시 분석 결과 삭제"""
+import pytest
+
+import ai_service
+import batch_crawler
+import crawler
+import database
+import transcript_store
+
+PRODUCT = '갤럭시 S25'
+VIDEOS = [{'id': 'batch-v1', 'title': '리뷰 1'}, {'id': 'batch-v2', 'title': '리뷰 2'}]
+ANALYSIS = {'pros': ['카메라'], 'cons': ['발열']}
+
+
+@pytest.fixture(autouse=True)
+def clean_product():
+    for collection in ('product_results', 'community_reviews', 'youtube_videos'):
+        database.storage.delete(collection, PRODUCT)
+    for video in VIDEOS:
+        database.storage.delete(database.COLLECTION_NAME, video['id'])
+    database.community_reviews_cache.clear()
+    database.youtube_videos_cache.clear()
+    database.product_aliases.clear()
+    yield
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """크롤링/자막/Gemini 호출을 테스트 값으로 대체 (state를 바꿔 실패를 흉내 냄)"""
+    state = {'reviews_text': '[클리앙] 새 후기\n', 'community_analysis': ANALYSIS, 'missing_transcripts': {'batch-v2'}}
+    monkeypatch.setattr(crawler, 'search_youtube_top3', lambda name: list(VIDEOS))
+    monkeypatch.setattr(crawler, 'crawl_community_reviews', lambda name: (state['reviews_text'], ['클리앙'], 1))
+    monkeypatch.setattr(
+        transcript_store, 'get_youtube_script',
+        lambda video_id: "❌ 자막 없음" if video_id in state['missing_transcripts'] else "[00:01] 좋아요"
+    )
+    monkeypatch.setattr(ai_service, 'analyze_with_gemini', lambda script: dict(ANALYSIS))
+    monkeypatch.setattr(ai_service, 'analyze_community_reviews_with_gemini', lambda text: state['community_analysis'])
+    return state
+
+
+def save_old_result():
+    database.save_product_result_to_db(PRODUCT, {'youtube_reviews': [], 'data_updated_at': 1, 'old': True},
+                                       version=ai_service.PRODUCT_RESULT_VERSION)
+
+
+def test_refresh_replaces_result_and_records_failed_videos(sources):
+    save_old_result()
+
+    assert batch_crawler.crawl_product_batch(PRODUCT)
+
+    result = database.get_product_result_from_db(PRODUCT)
+    assert 'old' not in result
+    assert [review['video_id'] for review in result['youtube_reviews']] == ['batch-v1']
+    assert result['failed_video_ids'] == ['batch-v2']
+    assert result['community_summary'] == ANALYSIS
+
+
+def test_failed_refresh_keeps_old_result(sources):
+    save_old_result()
+    sources['community_analysis'] = "❌ 분석 실패"
+
+    batch_crawler.crawl_product_batch(PRODUCT)
+
+    assert database.get_product_result_from_db(PRODUCT)['old'] is True
+
+
+def test_new_reviews_text_clears_old_analysis():
+    batch_crawler.save_community_reviews_to_db(PRODUCT, '[클리앙] 후기 A\n', ['클리앙'], 1)
+    batch_crawler.save_community_analysis_to_db(PRODUCT, ANALYSIS)
+    assert batch_crawler.get_community_reviews_meta_from_db(PRODUCT)['analysis_summary'] == ANALYSIS
+
+    # 같은 원문을 다시 저장하면 분석 결과 유지
+    batch_crawler.save_community_reviews_to_db(PRODUCT, '[클리앙] 후기 A\n', ['클리앙'], 1)
+    assert batch_crawler.get_community_reviews_meta_from_db(PRODUCT)['analysis_summary'] == ANALYSIS
+
+    batch_crawler.save_community_reviews_to_db(PRODUCT, '[클리앙] 후기 B\n', ['클리앙'], 1)
+    assert batch_crawler.get_community_reviews_meta_from_db(PRODUCT)['analysis_summary'] is None
+
+
+def test_component_saves_outside_refresh_invalidate_result():
+    save_old_result()
+    batch_crawler.save_youtube_videos_to_db(PRODUCT, list(VIDEOS))
+    assert database.get_product_result_from_db(PRODUCT) is None
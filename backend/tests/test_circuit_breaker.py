@@ -0,0 +1,102 @@
+"""circuit_breaker: closed -> open -> half_open -> closed 상태 전이"""
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+class Probe:
+    """up이 False면 예외를 내는 상태 확인 함수 (호출 시점의 회로 상태 기록)"""
+
+    def __init__(self):
+        self.up = False
+        self.breaker = None
+        self.states = []
+
+    def __call__(self):
+        self.states.append(self.breaker.state)
+        if not self.up:
+            raise ConnectionError('db down')
+
+
+@pytest.fixture
+def probe():
+    return Probe()
+
+
+@pytest.fixture
+def breaker(probe):
+    # 백그라운드 스레드는 시작하지 않고 check()를 직접 호출
+    breaker = CircuitBreaker('test', probe, failure_threshold=3)
+    probe.breaker = breaker
+    return breaker
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure(ConnectionError('1'))
+    breaker.record_failure(ConnectionError('2'))
+    assert breaker.state == 'closed'
+    breaker.allow()
+
+    breaker.record_failure(ConnectionError('3'))
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure(ConnectionError('1'))
+    breaker.record_failure(ConnectionError('2'))
+    breaker.record_success()
+    breaker.record_failure(ConnectionError('3'))
+    assert breaker.state == 'closed'
+
+
+def test_probe_runs_half_open_then_closes(breaker, probe):
+    for i in range(3):
+        breaker.record_failure(ConnectionError(str(i)))
+
+    assert breaker.check() is False
+    assert probe.states == ['half_open']
+    assert breaker.state == 'open'
+    assert breaker.stats()['last_error'] == 'db down'
+
+    probe.up = True
+    assert breaker.check() is True
+    assert probe.states == ['half_open', 'half_open']
+    assert breaker.state == 'closed'
+    assert breaker.stats()['consecutive_failures'] == 0
+    breaker.allow()
+
+
+def test_requests_are_rejected_while_half_open(breaker, probe):
+    for i in range(3):
+        breaker.record_failure(ConnectionError(str(i)))
+    rejected = []
+
+    def probe_and_try():
+        probe.states.append(breaker.state)
+        try:
+            breaker.allow()
+        except CircuitOpen:
+            rejected.append(True)
+
+    breaker._probe = probe_and_try
+    assert breaker.check() is True
+    assert probe.states == ['half_open']
+    assert rejected == [True]
+
+
+def test_failed_probe_while_closed_opens_immediately(breaker, probe):
+    assert breaker.check() is False
+    assert probe.states == ['closed']
+    assert breaker.state == 'open'
+
+
+def test_on_connect_runs_once(probe):
+    connected = []
+    breaker = CircuitBreaker('test', probe, on_connect=lambda: connected.append(True))
+    probe.breaker = breaker
+    probe.up = True
+    breaker.check()
+    breaker.check()
+    assert connected == [True]
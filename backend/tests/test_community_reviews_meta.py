@@ -0,0 +1,65 @@
+"""batch_crawler: 커뮤니티 후기 메타 조회는 후기 원문 없이, 원문은 필요할 때만 따로 조회"""
+import pytest
+
+import ai_service
+import batch_crawler
+import database
+
+PRODUCT = '갤럭시 S25'
+REVIEWS_TEXT = '[클리앙] 카메라 좋아요\n[뽐뿌] 발열 있음\n'
+ANALYSIS = {'pros': ['카메라'], 'cons': ['발열']}
+
+
+@pytest.fixture(autouse=True)
+def clean_product():
+    database.storage.delete('community_reviews', PRODUCT)
+    database.community_reviews_cache.clear()
+    database.product_aliases.clear()
+    yield
+    database.storage.delete('community_reviews', PRODUCT)
+    database.community_reviews_cache.clear()
+
+
+def test_meta_excludes_reviews_text():
+    batch_crawler.save_community_reviews_to_db(PRODUCT, REVIEWS_TEXT, ['클리앙', '뽐뿌'], actual_count=2)
+    batch_crawler.save_community_analysis_to_db(PRODUCT, ANALYSIS)
+
+    meta = batch_crawler.get_community_reviews_meta_from_db(PRODUCT)
+
+    assert 'reviews_text' not in meta
+    assert meta['product_name'] == PRODUCT
+    assert meta['review_count'] == 2
+    assert meta['sources'] == ['클리앙', '뽐뿌']
+    assert meta['analysis_summary'] == ANALYSIS
+    assert batch_crawler.get_community_reviews_text_from_db(meta['product_name']) == REVIEWS_TEXT
+
+
+def test_l1_cache_keeps_meta_without_reviews_text():
+    batch_crawler.save_community_reviews_to_db(PRODUCT, REVIEWS_TEXT, ['클리앙'], actual_count=2)
+    batch_crawler.get_community_reviews_meta_from_db(PRODUCT)
+
+    # 두 번째 조회는 L1 캐시에서 응답
+    database.storage.delete('community_reviews', PRODUCT)
+    cached = batch_crawler.get_community_reviews_meta_from_db(PRODUCT)
+
+    assert cached is not None
+    assert 'reviews_text' not in cached
+
+
+def test_outdated_analysis_is_treated_as_missing():
+    database.storage.upsert('community_reviews', PRODUCT, {
+        'reviews_text': REVIEWS_TEXT,
+        'sources': ['클리앙'],
+        'review_count': 2,
+        'analysis_summary': ANALYSIS,
+        'analysis_version': f"old-{ai_service.COMMUNITY_ANALYSIS_VERSION}",
+    })
+
+    meta = batch_crawler.get_community_reviews_meta_from_db(PRODUCT)
+
+    assert meta['analysis_summary'] is None
+    assert batch_crawler.get_community_reviews_text_from_db(meta['product_name']) == REVIEWS_TEXT
+
+
+def test_text_lookup_for_unknown_product_returns_none():
+    assert batch_crawler.get_community_reviews_text_from_db('없는 제품') is None
@@ -0,0 +1,141 @@
+"""gemini_scheduler: 토큰 버킷 충전, 우선순위 순서, 대기 시간 초과, 비동기 허가"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import gemini_scheduler
+from gemini_scheduler import BATCH, INTERACTIVE, GeminiScheduler, TokenBucket
+
+MODEL = 'gemini-test'
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(60)  # 초당 1개
+    start = bucket._updated
+    bucket.consume(60)
+
+    assert bucket.time_until(1, now=start) == pytest.approx(1.0)
+    assert bucket.time_until(1, now=start + 0.5) == pytest.approx(0.5)
+    assert bucket.time_until(1, now=start + 1) == 0.0
+    assert bucket.level == pytest.approx(1.0)
+
+
+def test_token_bucket_reserve_and_capacity():
+    bucket = TokenBucket(60)
+    start = bucket._updated
+    bucket.consume(60)
+
+    # 1개를 꺼낸 뒤에도 30개(capacity x 0.5)가 남아 있어야 함
+    assert bucket.time_until(1, reserve=0.5, now=start) == pytest.approx(31.0)
+    # 오래 지나도 capacity 이상으로는 채워지지 않음
+    assert bucket.time_until(1, now=start + 1000) == 0.0
+    assert bucket.level == 60
+    # capacity보다 큰 요청은 capacity만큼만 차감
+    bucket.consume(1000)
+    assert bucket.level == 0
+
+
+def test_drain_empties_bucket():
+    bucket = TokenBucket(60)
+    bucket.drain()
+    assert bucket.level == 0
+
+
+def blocked_scheduler(seconds, **kwargs):
+    """MODEL이 seconds초 동안 백오프 중인 스케줄러"""
+    scheduler = GeminiScheduler(rpm=60, tpm=100000, interactive_reserve=0, **kwargs)
+    scheduler._state(MODEL).backoff_until = time.monotonic() + seconds
+    return scheduler
+
+
+def wait_for_waiting(scheduler, count):
+    deadline = time.monotonic() + 5
+    while len(scheduler._state(MODEL).waiting) < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_interactive_runs_before_earlier_batch():
+    scheduler = blocked_scheduler(0.3)
+    order = []
+
+    def worker(level):
+        assert scheduler.acquire(MODEL, 100, level=level, timeout=5)
+        order.append(level)
+
+    threads = [threading.Thread(target=worker, args=(BATCH,))]
+    threads[0].start()
+    wait_for_waiting(scheduler, 1)
+    threads.append(threading.Thread(target=worker, args=(INTERACTIVE,)))
+    threads[1].start()
+    wait_for_waiting(scheduler, 2)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == [INTERACTIVE, BATCH]
+    assert scheduler.stats()['acquired'] == 2
+
+
+def test_batch_keeps_interactive_reserve():
+    scheduler = GeminiScheduler(rpm=10, tpm=100000, interactive_reserve=0.2)
+    state = scheduler._state(MODEL)
+    state.requests.consume(8)  # 2개 남음 = capacity x 0.2
+
+    assert scheduler.acquire(MODEL, 100, level=BATCH, timeout=0.05) is False
+    assert scheduler.acquire(MODEL, 100, level=INTERACTIVE, timeout=0.05) is True
+
+
+def test_acquire_times_out():
+    scheduler = blocked_scheduler(60)
+    start = time.monotonic()
+
+    assert scheduler.acquire(MODEL, 100, level=INTERACTIVE, timeout=0.1) is False
+    assert time.monotonic() - start < 1
+    assert scheduler.stats()['timeouts'] == 1
+    assert scheduler._state(MODEL).waiting == []
+
+
+def test_interactive_uses_max_wait_by_default():
+    scheduler = blocked_scheduler(60, max_wait=0.1)
+    assert scheduler.acquire(MODEL, 100, level=INTERACTIVE) is False
+
+
+def test_priority_context():
+    assert gemini_scheduler.current_priority() == INTERACTIVE
+    with gemini_scheduler.priority(BATCH):
+        assert gemini_scheduler.current_priority() == BATCH
+    assert gemini_scheduler.current_priority() == INTERACTIVE
+
+
+def test_acquire_async_waits_and_times_out():
+    scheduler = blocked_scheduler(0.2, async_poll_interval=0.02)
+
+    async def run():
+        timed_out = await scheduler.acquire_async(MODEL, 100, level=INTERACTIVE, timeout=0.05)
+        acquired = await scheduler.acquire_async(MODEL, 100, level=INTERACTIVE, timeout=5)
+        return timed_out, acquired
+
+    assert asyncio.run(run()) == (False, True)
+    assert scheduler._state(MODEL).waiting == []
+
+
+def test_acquire_async_shares_queue_with_sync_waiters():
+    scheduler = blocked_scheduler(0.3, async_poll_interval=0.02)
+    order = []
+
+    def sync_batch():
+        assert scheduler.acquire(MODEL, 100, level=BATCH, timeout=5)
+        order.append('sync-batch')
+
+    async def run():
+        thread = threading.Thread(target=sync_batch)
+        thread.start()
+        await asyncio.to_thread(wait_for_waiting, scheduler, 1)
+        assert await scheduler.acquire_async(MODEL, 100, level=INTERACTIVE, timeout=5)
+        order.append('async-interactive')
+        await asyncio.to_thread(thread.join, 5)
+
+    asyncio.run(run())
+    assert order == ['async-interactive', 'sync-batch']
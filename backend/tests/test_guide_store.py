@@ -0,0 +1,51 @@
+"""guide_store: 2단 저장소의 메모리 항목은 짧게 보관해 다른 워커의 삭제를 반영"""
+import time
+
+import guide_store
+from storage import SQLiteStorage
+
+
+def workers(tmp_path, local_ttl):
+    """같은 공유 저장소를 쓰는 워커 2개의 저장소"""
+    shared = guide_store.StorageGuideStore(SQLiteStorage(str(tmp_path / 'cache.db'), {}))
+    return [guide_store.TieredGuideStore(guide_store.MemoryGuideStore(ttl=local_ttl), shared) for _ in range(2)]
+
+
+def test_completed_guide_is_shared_between_workers(tmp_path):
+    a, b = workers(tmp_path, local_ttl=60)
+    a.set('갤럭시 S25', guide_store.make_entry("completed", guide={"summary": "추천"}))
+
+    assert b.get('갤럭시 S25')['guide'] == {"summary": "추천"}
+
+
+def test_delete_on_another_worker_is_seen_after_local_ttl(tmp_path):
+    a, b = workers(tmp_path, local_ttl=0.05)
+    a.set('갤럭시 S25', guide_store.make_entry("completed", guide={"summary": "이전"}))
+    assert b.get('갤럭시 S25')['guide'] == {"summary": "이전"}
+
+    a.delete('갤럭시 S25')
+    assert a.get('갤럭시 S25') is None
+    time.sleep(0.1)
+    assert b.get('갤럭시 S25') is None
+
+
+def test_processing_is_not_cached_locally(tmp_path):
+    a, b = workers(tmp_path, local_ttl=60)
+    a.set('갤럭시 S25', guide_store.make_entry("processing"))
+    assert b.get('갤럭시 S25')['status'] == "processing"
+
+    a.set('갤럭시 S25', guide_store.make_entry("completed", guide={"summary": "완료"}))
+    assert b.get('갤럭시 S25')['status'] == "completed"
+
+
+def test_status_response():
+    assert guide_store.status_response(None)[1] == 404
+    assert guide_store.status_response(guide_store.make_entry("processing"))[0]["status"] == "processing"
+    body, code = guide_store.status_response(guide_store.make_entry("error", error="실패"))
+    assert (body["error"], code) == ("실패", 500)
+
+
+def test_tiered_store_uses_short_local_ttl():
+    store = guide_store.create_guide_store()
+    assert isinstance(store, guide_store.TieredGuideStore)
+    assert store.local._cache.ttl == guide_store.GUIDE_LOCAL_TTL
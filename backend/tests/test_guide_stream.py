@@ -0,0 +1,49 @@
+"""app.stream_purchase_guide: SSE 구독은 스트림을 보내는 동안에만 유지"""
+import pytest
+
+import app as app_module
+import guide_store
+
+PRODUCT = '갤럭시 S25'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # gevent 서버 없이 스트림 엔드포인트 확인
+    monkeypatch.setattr(app_module, 'green_threads_enabled', lambda: True)
+    monkeypatch.setattr(app_module, 'GUIDE_STREAM_KEEPALIVE', 0.01)
+    app_module.purchase_guides.set(PRODUCT, guide_store.make_entry("processing"))
+    yield app_module.app.test_client()
+    app_module.purchase_guides.delete(PRODUCT)
+
+
+def test_unread_stream_does_not_leave_a_subscriber(client):
+    # 테스트 클라이언트는 첫 청크를 미리 읽으므로 뷰를 직접 호출 (응답을 보내기 전에 연결이 끊긴 경우)
+    with app_module.app.test_request_context(f'/api/purchase-guide/{PRODUCT}/stream'):
+        response = app_module.stream_purchase_guide(PRODUCT)
+    assert response.status_code == 200
+    response.close()
+
+    assert app_module.guide_events.subscriber_count(PRODUCT) == 0
+
+
+def test_subscriber_is_removed_when_client_disconnects(client):
+    response = client.get(f'/api/purchase-guide/{PRODUCT}/stream', buffered=False)
+    chunks = iter(response.response)
+    assert '"processing"' in next(chunks).decode('utf-8')
+    assert app_module.guide_events.subscriber_count(PRODUCT) == 1
+
+    response.close()
+    assert app_module.guide_events.subscriber_count(PRODUCT) == 0
+
+
+def test_stream_ends_with_published_result(client):
+    response = client.get(f'/api/purchase-guide/{PRODUCT}/stream', buffered=False)
+    chunks = iter(response.response)
+    next(chunks)
+
+    app_module._save_guide_entry(PRODUCT, guide_store.make_entry("completed", guide={"summary": "추천"}))
+    rest = b''.join(chunks).decode('utf-8')
+
+    assert '"completed"' in rest
+    assert app_module.guide_events.subscriber_count(PRODUCT) == 0
@@ -0,0 +1,128 @@
+"""job_queue: 키별 중복 제거, 대기열 제한, 대기 작업 취소, 대기/실행 시간 집계"""
+import threading
+
+import pytest
+
+from job_queue import JobExecutor, JobQueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(name="test", max_workers=1, max_pending=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def blocking_job(started, release, result="done"):
+    def work():
+        started.set()
+        release.wait(5)
+        return result
+    return work
+
+
+def test_same_key_is_deduplicated(executor):
+    started, release = threading.Event(), threading.Event()
+    job, created = executor.submit("갤럭시 S25", blocking_job(started, release))
+    again, created_again = executor.submit("갤럭시 S25", lambda: "other")
+
+    assert created is True
+    assert created_again is False
+    assert again is job
+
+    release.set()
+    executor.wait("갤럭시 S25", timeout=5)
+    assert job.future.result(timeout=5) == "done"
+    assert executor.stats()["deduplicated"] == 1
+
+
+def test_rejects_when_pending_limit_reached(executor):
+    started, release = threading.Event(), threading.Event()
+    executor.submit("a", blocking_job(started, release))
+    executor.submit("b", lambda: None)
+
+    with pytest.raises(JobQueueFull):
+        executor.submit("c", lambda: None)
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    executor.wait("a", timeout=5)
+    executor.wait("b", timeout=5)
+
+
+def test_cancel_queued_job_skips_execution(executor):
+    started, release = threading.Event(), threading.Event()
+    ran = []
+    executor.submit("running", blocking_job(started, release))
+    assert started.wait(5)
+    queued, _ = executor.submit("queued", lambda: ran.append(1))
+
+    assert executor.cancel("queued") is True
+    assert queued.status == "cancelled"
+    assert executor.get("queued") is None
+    # 실행 중인 작업은 취소할 수 없음
+    assert executor.cancel("running") is False
+
+    release.set()
+    executor.wait("running", timeout=5)
+    executor.shutdown(wait=True)
+
+    assert ran == []
+    stats = executor.stats()
+    assert stats["cancelled"] == 1
+    assert stats["completed"] == 1
+
+
+def test_cancelled_key_can_be_resubmitted(executor):
+    started, release = threading.Event(), threading.Event()
+    executor.submit("running", blocking_job(started, release))
+    assert started.wait(5)
+    executor.submit("queued", lambda: None)
+    executor.cancel("queued")
+
+    job, created = executor.submit("queued", lambda: "again")
+    assert created is True
+
+    release.set()
+    assert job.future.result(timeout=5) == "again"
+
+
+def test_failed_job_records_error(executor):
+    def fail():
+        raise RuntimeError("gemini 503")
+
+    job, _ = executor.submit("fail", fail)
+    executor.wait("fail", timeout=5)
+
+    with pytest.raises(RuntimeError):
+        job.future.result(timeout=5)
+    assert job.status == "failed"
+    assert job.error == "gemini 503"
+    assert executor.get("fail") is None
+    assert executor.stats()["failed"] == 1
+
+
+def test_stats_report_wait_and_run_times(executor):
+    started, release = threading.Event(), threading.Event()
+    first, _ = executor.submit("first", blocking_job(started, release))
+    assert started.wait(5)
+    second, _ = executor.submit("second", lambda: "ok")
+
+    stats = executor.stats()
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+    assert stats["avg_run_time"] is None
+
+    release.set()
+    second.future.result(timeout=5)
+
+    # 두 번째 작업은 첫 작업이 끝날 때까지 대기열에 있었음
+    assert second.started_at >= first.finished_at
+    assert second.wait_time > 0
+
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["avg_wait_time"] is not None
+    assert stats["max_run_time"] == pytest.approx(max(first.run_time, second.run_time))
+    assert [job["key"] for job in stats["recent_jobs"]] == ["first", "second"]
@@ -0,0 +1,84 @@
+"""llm_cache: 프롬프트 해시 키, L1/L2 히트·미스, 반환값 복사"""
+import asyncio
+
+import pytest
+
+import llm_cache
+from storage import SQLiteStorage
+
+KEY_FIELDS = {llm_cache.COLLECTION_NAME: 'prompt_hash'}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(str(tmp_path / 'cache.db'), KEY_FIELDS)
+
+
+def test_prompt_key_depends_on_version_and_prompt():
+    key = llm_cache.prompt_key('v1', '갤럭시 S25 후기')
+
+    assert key == llm_cache.prompt_key('v1', '갤럭시 S25 후기')
+    assert key != llm_cache.prompt_key('v2', '갤럭시 S25 후기')
+    assert key != llm_cache.prompt_key('v1', '갤럭시 S25 후기.')
+
+
+def test_miss_then_hit_from_memory():
+    cache = llm_cache.ResponseCache(None)
+    key = llm_cache.prompt_key('v1', 'prompt')
+
+    assert cache.get(key) is None
+    cache.put(key, 'v1', {'summary': '좋음'}, 'gemini-flash')
+
+    assert cache.get(key) == {'response': {'summary': '좋음'}, 'model': 'gemini-flash'}
+    assert cache.get(llm_cache.prompt_key('v2', 'prompt')) is None
+
+
+def test_hit_from_storage_in_new_process(storage):
+    key = llm_cache.prompt_key('v1', 'prompt')
+    llm_cache.ResponseCache(storage).put(key, 'v1', {'summary': '좋음'}, 'gemini-flash')
+
+    # 새 프로세스: L1은 비어 있고 L2(저장소)에서 찾음
+    fresh = llm_cache.ResponseCache(storage)
+    assert fresh.get(key) == {'response': {'summary': '좋음'}, 'model': 'gemini-flash'}
+    assert fresh.stats()['entries'] == 1
+
+    document = storage.get(llm_cache.COLLECTION_NAME, key, ['template_version', 'cached_at'])
+    assert document['template_version'] == 'v1'
+    assert document['cached_at'] is not None
+
+
+def test_get_async_loads_from_storage(storage):
+    key = llm_cache.prompt_key('v1', 'prompt')
+    llm_cache.ResponseCache(storage).put(key, 'v1', ['a', 'b'], 'gemini-pro')
+
+    entry = asyncio.run(llm_cache.ResponseCache(storage).get_async(key))
+    assert entry == {'response': ['a', 'b'], 'model': 'gemini-pro'}
+
+
+def test_cached_response_is_isolated_from_callers():
+    cache = llm_cache.ResponseCache(None)
+    key = llm_cache.prompt_key('v1', 'prompt')
+    response = {'pros': ['카메라']}
+    cache.put(key, 'v1', response, 'gemini-flash')
+
+    # 저장 후 원본 수정, 반환값 수정 모두 캐시에 영향 없음
+    response['pros'].append('배터리')
+    cache.get(key)['response']['pros'].append('화면')
+
+    assert cache.get(key)['response'] == {'pros': ['카메라']}
+
+
+def test_storage_errors_fall_back_to_miss():
+    class BrokenStorage:
+        def get(self, *args):
+            raise RuntimeError('db down')
+
+        def upsert(self, *args):
+            raise RuntimeError('db down')
+
+    cache = llm_cache.ResponseCache(BrokenStorage())
+    key = llm_cache.prompt_key('v1', 'prompt')
+
+    assert cache.get(key) is None
+    cache.put(key, 'v1', {'summary': '좋음'}, 'gemini-flash')
+    assert cache.get(key)['response'] == {'summary': '좋음'}
@@ -0,0 +1,46 @@
+"""product_result: 결과 문서 생성, 수집 시각, 오래된 결과 판단"""
+import time
+
+import product_result
+
+
+def review(video_id):
+    return {"video_id": video_id, "title": video_id, "analysis": {"pros": ["화면"], "cons": ["발열"]}}
+
+
+def test_build_records_failed_videos():
+    result = product_result.build_product_result(
+        [review("v1")], {"pros": []}, 3, ["클리앙"], data_updated_at=100, failed_video_ids=["v2", "v3"]
+    )
+
+    assert [r["video_id"] for r in result["youtube_reviews"]] == ["v1"]
+    assert result["youtube_summaries"] == ["장점: 화면\n단점: 발열"]
+    assert result["failed_video_ids"] == ["v2", "v3"]
+    assert result["community_reviews"]["raw_count"] == 3
+    assert result["community_reviews"]["source"] == "클리앙"
+
+
+def test_oldest_timestamp():
+    assert product_result.oldest_timestamp([300, 100, 200]) == 100
+    assert product_result.oldest_timestamp([300, None]) is None
+    assert product_result.oldest_timestamp([]) is None
+
+
+def test_is_stale_by_age_and_version():
+    now = int(time.time())
+    fresh = {"data_updated_at": now - 10, "analysis_version": "v2"}
+
+    assert not product_result.is_stale(fresh, 60, version="v2")
+    assert product_result.is_stale(fresh, 5, version="v2")
+    assert product_result.is_stale(fresh, 60, version="v3")
+    assert product_result.is_stale({"data_updated_at": None}, 60)
+
+
+def test_partial_result_goes_stale_sooner():
+    now = int(time.time())
+    partial = {"data_updated_at": now - 120, "failed_video_ids": ["v2"]}
+    complete = {"data_updated_at": now - 120, "failed_video_ids": []}
+
+    assert product_result.is_stale(partial, 3600, partial_max_age=60)
+    assert not product_result.is_stale(complete, 3600, partial_max_age=60)
+    assert not product_result.is_stale(partial, 3600)
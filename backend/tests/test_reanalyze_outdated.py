@@ -0,0 +1,66 @@
+"""reanalyze_outdated: 계속 실패하는 문서는 기록 후 재분석 대상에서 제외"""
+import pytest
+
+import ai_service
+import database
+import reanalyze_outdated
+import transcript_store
+from storage import SQLiteStorage
+
+VIDEO_IDS = ['old-1', 'old-2', 'old-3']
+
+
+@pytest.fixture
+def outdated_reviews(monkeypatch):
+    for video_id in VIDEO_IDS:
+        database.storage.replace(database.COLLECTION_NAME, video_id, {'analysis': 'old', 'analysis_version': 'v0'})
+    monkeypatch.setattr(
+        transcript_store, 'get_youtube_script',
+        lambda video_id: "❌ 자막 없음" if video_id == 'old-1' else "[00:01] 좋아요"
+    )
+    monkeypatch.setattr(ai_service, 'analyze_with_gemini', lambda script: {'pros': ['새 분석']})
+    yield
+    for video_id in VIDEO_IDS:
+        database.storage.delete(database.COLLECTION_NAME, video_id)
+
+
+def outdated():
+    return set(database.storage.outdated_keys(
+        database.COLLECTION_NAME, 'analysis_version', ai_service.VIDEO_ANALYSIS_VERSION,
+        database.LEGACY_ANALYSIS_VERSION, 100, skip_field=database.REANALYZE_SKIPPED_FIELD
+    )) & set(VIDEO_IDS)
+
+
+def test_failing_document_is_skipped_after_max_failures(outdated_reviews):
+    assert reanalyze_outdated.reanalyze_reviews(limit=100, interval=0, max_failures=2) == 2
+    assert outdated() == {'old-1'}
+    failed = database.storage.get(database.COLLECTION_NAME, 'old-1')
+    assert failed['reanalyze_failures'] == 1
+    assert failed['reanalyze_failed_version'] == ai_service.VIDEO_ANALYSIS_VERSION
+
+    assert reanalyze_outdated.reanalyze_reviews(limit=100, interval=0, max_failures=2) == 0
+    assert outdated() == set()
+    assert database.storage.get(database.COLLECTION_NAME, 'old-1')[database.REANALYZE_SKIPPED_FIELD] == \
+        ai_service.VIDEO_ANALYSIS_VERSION
+
+
+def test_failures_for_older_version_do_not_count():
+    database.storage.replace(database.COLLECTION_NAME, 'old-1', {
+        'analysis_version': 'v0', 'reanalyze_failed_version': 'previous', 'reanalyze_failures': 5
+    })
+    try:
+        assert reanalyze_outdated.record_failure(database.COLLECTION_NAME, 'old-1', 'current', max_failures=3) == 1
+    finally:
+        database.storage.delete(database.COLLECTION_NAME, 'old-1')
+
+
+def test_sqlite_outdated_keys_skip_field(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'cache.db'), {})
+    storage.upsert('c', 'legacy', {})
+    storage.upsert('c', 'old', {'v': 'v1'})
+    storage.upsert('c', 'current', {'v': 'v2'})
+    storage.upsert('c', 'skipped', {'v': 'v1', 'skip': 'v2'})
+    storage.upsert('c', 'skipped-older', {'v': 'v1', 'skip': 'v1.5'})
+
+    assert set(storage.outdated_keys('c', 'v', 'v2', 'v1', 10)) == {'legacy', 'old', 'skipped', 'skipped-older'}
+    assert set(storage.outdated_keys('c', 'v', 'v2', 'v1', 10, skip_field='skip')) == {'legacy', 'old', 'skipped-older'}
@@ -0,0 +1,135 @@
+"""singleflight: 같은 키의 동시 계산을 하나로 합치고 결과/예외를 공유"""
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_concurrently(flight, key, fn, count):
+    """count개 스레드가 동시에 flight.do(key, fn) 호출 -> (결과 목록, 예외 목록)"""
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            result = flight.do(key, fn)
+            with lock:
+                results.append(result)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": 1}
+
+    threads, results, errors = run_concurrently(flight, "갤럭시 S25", work, 5)
+    assert started.wait(5)
+    assert flight.in_flight() == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert errors == []
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_error_is_propagated_to_waiters_and_not_cached():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("크롤링 실패")
+
+    threads, results, errors = run_concurrently(flight, "key", fail, 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+    # 실패한 계산은 남지 않으므로 다음 호출은 다시 실행
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.in_flight() == 0
+
+
+def test_async_concurrent_calls_share_one_execution():
+    flight = AsyncSingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("갤럭시 S25", work) for _ in range(5)))
+        return results, flight.in_flight()
+
+    results, in_flight = asyncio.run(run())
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert in_flight == 0
+
+
+def test_async_error_is_propagated_to_waiters():
+    flight = AsyncSingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("분석 실패")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+
+
+def test_async_cancelled_waiter_does_not_cancel_leader():
+    flight = AsyncSingleFlight("test")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+    assert finished == [1]
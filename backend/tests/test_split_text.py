@@ -0,0 +1,46 @@
+"""ai_service.split_text: 줄(타임스탬프) 경계 분할과 긴 줄 자르기"""
+import pytest
+
+ai_service = pytest.importorskip('ai_service')
+split_text = ai_service.split_text
+
+
+def test_short_text_is_one_chunk():
+    text = "[00:01] 안녕하세요\n[00:05] 리뷰입니다\n"
+    assert split_text(text, 100) == [text]
+
+
+def test_empty_text():
+    assert split_text('', 10) == []
+
+
+def test_splits_on_line_boundaries():
+    lines = [f"[00:{i:02d}] 자막 {i}\n" for i in range(10)]
+    text = ''.join(lines)
+    chunks = split_text(text, 40)
+
+    assert ''.join(chunks) == text
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    # 모든 구간이 줄 단위로 끝나고 다음 구간은 타임스탬프로 시작
+    assert all(chunk.endswith('\n') for chunk in chunks)
+    assert all(chunk.startswith('[') for chunk in chunks)
+    # 한 줄이 13자이므로 구간마다 3줄
+    assert [chunk.count('\n') for chunk in chunks] == [3, 3, 3, 1]
+
+
+def test_line_exactly_max_chars_fits():
+    text = 'a' * 9 + '\n' + 'b' * 9 + '\n'
+    assert split_text(text, 10) == ['a' * 9 + '\n', 'b' * 9 + '\n']
+
+
+def test_long_line_is_cut_by_characters():
+    text = "ab\n" + 'x' * 25 + "\ncd\n"
+    chunks = split_text(text, 10)
+
+    assert ''.join(chunks) == text
+    # 긴 줄 앞의 구간은 긴 줄과 합치지 않고 먼저 끝내고, 긴 줄의 나머지는 다음 줄과 합침
+    assert chunks == ["ab\n", 'x' * 10, 'x' * 10, 'x' * 5 + "\ncd\n"]
+
+
+def test_text_without_trailing_newline():
+    assert split_text("ab\ncd", 3) == ["ab\n", "cd"]
@@ -0,0 +1,126 @@
+"""storage.SQLiteStorage: write_many/get_many 왕복 (datetime, bytes 포함), 키 분할 조회, TTL 만료"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from storage import SQLiteStorage
+
+KEY_FIELDS = {'analysis': 'video_id', 'products': 'product_name'}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(str(tmp_path / 'cache.db'), KEY_FIELDS)
+
+
+def test_write_many_get_many_round_trip(storage):
+    cached_at = datetime(2026, 1, 2, 3, 4, 5, 678901)
+    document = {
+        'title': '갤럭시 S25 리뷰',
+        'score': 4.5,
+        'tags': ['카메라', '배터리'],
+        'nested': {'at': cached_at, 'raw': b'\x00\x01'},
+        'transcript': b'\x89\xff\x00compressed',
+        'cached_at': cached_at,
+    }
+    storage.write_many('analysis', [('upsert', 'v1', document), ('upsert', 'v2', {'title': 'v2'})])
+
+    results = storage.get_many('analysis', ['v1', 'v2', 'missing'])
+
+    assert set(results) == {'v1', 'v2'}
+    assert results['v1'] == dict(document, video_id='v1')
+    assert isinstance(results['v1']['cached_at'], datetime)
+    assert isinstance(results['v1']['transcript'], bytes)
+    assert storage.get('analysis', 'v1', ['cached_at', 'transcript']) == {
+        'cached_at': cached_at,
+        'transcript': document['transcript'],
+    }
+
+
+def test_write_many_operations(storage):
+    storage.write_many('analysis', [
+        ('upsert', 'v1', {'a': 1, 'b': 1}),
+        ('update', 'v1', {'b': 2}),
+        ('update', 'v2', {'a': 1}),  # 없는 문서의 update는 무시
+        ('replace', 'v3', {'c': 3}),
+        ('upsert', 'v4', {'d': 4}),
+        ('delete', 'v4', None),
+    ])
+
+    assert storage.get_many('analysis', ['v1', 'v2', 'v3', 'v4']) == {
+        'v1': {'video_id': 'v1', 'a': 1, 'b': 2},
+        'v3': {'video_id': 'v3', 'c': 3},
+    }
+
+
+def test_write_many_rolls_back_on_error(storage):
+    storage.upsert('analysis', 'v1', {'a': 1})
+    with pytest.raises(TypeError):
+        storage.write_many('analysis', [('update', 'v1', {'a': 2}), ('upsert', 'v2', None)])
+
+    # 여러 문서 쓰기는 트랜잭션 1개라 앞의 쓰기도 저장되지 않음
+    assert storage.get('analysis', 'v1') == {'video_id': 'v1', 'a': 1}
+    assert storage.get('analysis', 'v2') is None
+
+
+def test_get_many_splits_large_key_lists(storage):
+    keys = [f'v{i}' for i in range(SQLiteStorage.MAX_KEYS_PER_QUERY * 2 + 3)]
+    storage.upsert_many('analysis', {key: {'n': i} for i, key in enumerate(keys)})
+
+    results = storage.get_many('analysis', keys + ['missing'])
+
+    assert len(results) == len(keys)
+    assert results[keys[-1]] == {'video_id': keys[-1], 'n': len(keys) - 1}
+
+
+def test_collections_and_key_fields_are_separate(storage):
+    storage.upsert('analysis', 'same', {'a': 1})
+    storage.upsert('products', 'same', {'b': 2})
+
+    assert storage.get('analysis', 'same') == {'video_id': 'same', 'a': 1}
+    assert storage.get('products', 'same') == {'product_name': 'same', 'b': 2}
+
+
+def test_expire_deletes_documents_older_than_ttl(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'cache.db'), KEY_FIELDS, expire_interval=3600)
+    storage.create_indexes([('analysis', 'cached_at', {'expireAfterSeconds': 3600})])
+    now = datetime.utcnow()
+    storage.upsert('products', 'other', {'cached_at': now - timedelta(days=30)})
+    storage.write_many('analysis', [
+        ('upsert', 'old', {'cached_at': now - timedelta(hours=2)}),
+        ('upsert', 'fresh', {'cached_at': now}),
+        ('upsert', 'undated', {'a': 1}),
+    ])
+    # 첫 쓰기(products)에서 만료 삭제가 이미 실행되어 expire_interval 동안은 쓰기 후 다시 실행되지 않음
+    assert storage.get('analysis', 'old') is not None
+
+    assert storage.expire() == 1
+    assert set(storage.get_many('analysis', ['old', 'fresh', 'undated'])) == {'fresh', 'undated'}
+    assert storage.get('products', 'other') is not None
+
+
+def test_expire_handles_legacy_string_dates(storage):
+    storage.create_indexes([('analysis', 'cached_at', {'expireAfterSeconds': 3600})])
+    # 이전 버전은 datetime을 str(datetime) 문자열로 저장
+    old = str(datetime.utcnow() - timedelta(hours=2))
+    storage._conn().execute(
+        "INSERT INTO documents (collection, key, normalized_key, doc) VALUES (?, ?, NULL, ?)",
+        ('analysis', 'legacy', json.dumps({'video_id': 'legacy', 'cached_at': old}))
+    )
+
+    assert storage.expire() == 1
+    assert storage.get('analysis', 'legacy') is None
+
+
+def test_writes_expire_documents_periodically(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'cache.db'), KEY_FIELDS, expire_interval=0)
+    storage.create_indexes([('analysis', 'cached_at', {'expireAfterSeconds': 60})])
+    storage.write_many('analysis', [
+        ('upsert', 'old', {'cached_at': datetime.utcnow() - timedelta(minutes=5)}),
+        ('upsert', 'new', {'cached_at': datetime.utcnow()}),
+    ])
+
+    # 쓰기 직후 만료 삭제가 실행됨 (expire_interval=0)
+    assert storage.get('analysis', 'old') is None
+    assert storage.get('analysis', 'new') is not None
@@ -0,0 +1,113 @@
+"""transcript_store: 자막 압축/해제 왕복, 언어 선택, 저장된 자막 우선 사용"""
+import json
+
+import pytest
+
+import ai_service
+import transcript_store
+from storage import SQLiteStorage
+
+SEGMENTS = [
+    {'text': '안녕하세요, 갤럭시 S25 리뷰입니다', 'start': 0.5, 'duration': 2.1},
+    {'text': '카메라가 정말 좋아졌어요 👍', 'start': 65.0, 'duration': 3.0},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'cache.db'), {transcript_store.TRANSCRIPT_COLLECTION_NAME: 'video_id'})
+    return transcript_store.StorageTranscriptStore(storage)
+
+
+@pytest.mark.skipif(not transcript_store.ZSTD_AVAILABLE, reason="zstandard 미설치")
+def test_zstd_round_trip():
+    data, codec = transcript_store.compress_segments(SEGMENTS)
+
+    assert codec == 'zstd'
+    assert isinstance(data, bytes)
+    assert transcript_store.decompress_segments(data, codec) == SEGMENTS
+
+
+def test_zlib_round_trip(monkeypatch):
+    monkeypatch.setattr(transcript_store, 'ZSTD_AVAILABLE', False)
+    data, codec = transcript_store.compress_segments(SEGMENTS)
+
+    assert codec == 'zlib'
+    assert transcript_store.decompress_segments(data, codec) == SEGMENTS
+
+
+def test_unknown_codec_cannot_be_decompressed():
+    data, _ = transcript_store.compress_segments(SEGMENTS)
+    assert transcript_store.decompress_segments(data, 'lz4') is None
+
+
+def test_compressed_data_is_smaller_than_raw_json():
+    segments = [{'text': f'반복되는 자막 문장 {i % 5}', 'start': i, 'duration': 1.0} for i in range(500)]
+    data, _ = transcript_store.compress_segments(segments)
+
+    raw_size = len(json.dumps(segments, ensure_ascii=False).encode('utf-8'))
+    assert len(data) < raw_size / 5
+
+
+def test_pick_transcript_prefers_korean():
+    en = [{'text': 'hello', 'start': 0, 'duration': 1}]
+    document = {'transcripts': {
+        'ja': transcript_store.make_entry([{'text': 'こんにちは', 'start': 0, 'duration': 1}]),
+        'en': transcript_store.make_entry(en),
+        'ko': transcript_store.make_entry(SEGMENTS),
+    }}
+
+    assert transcript_store.pick_transcript(document) == ('ko', SEGMENTS)
+    del document['transcripts']['ko']
+    assert transcript_store.pick_transcript(document) == ('en', en)
+
+
+def test_pick_transcript_skips_broken_entries():
+    document = {'transcripts': {
+        'ko': {'data': b'not compressed', 'codec': 'zlib'},
+        'en': transcript_store.make_entry(SEGMENTS),
+    }}
+
+    assert transcript_store.pick_transcript(document) == ('en', SEGMENTS)
+    assert transcript_store.pick_transcript(None) is None
+    assert transcript_store.pick_transcript({'transcripts': {}}) is None
+
+
+def test_save_keeps_other_languages(store):
+    en = [{'text': 'hello', 'start': 0, 'duration': 1}]
+    store.save('video-1', 'en', en)
+    assert store.get('video-1') == ('en', en)
+
+    store.save('video-1', 'ko', SEGMENTS)
+    assert store.get('video-1') == ('ko', SEGMENTS)
+
+    document = store._storage.get(transcript_store.TRANSCRIPT_COLLECTION_NAME, 'video-1')
+    assert set(document['transcripts']) == {'en', 'ko'}
+    assert document['transcripts']['ko']['segment_count'] == len(SEGMENTS)
+    assert store.get('missing-video') is None
+
+
+def test_get_youtube_script_uses_stored_transcript(store, monkeypatch):
+    fetched = []
+
+    def fetch(video_id):
+        fetched.append(video_id)
+        return 'ko', SEGMENTS
+
+    monkeypatch.setattr(transcript_store, '_store', store)
+    monkeypatch.setattr(ai_service, 'fetch_youtube_transcript', fetch)
+
+    first = transcript_store.get_youtube_script('video-2')
+    second = transcript_store.get_youtube_script('video-2')
+
+    assert fetched == ['video-2']
+    assert first == second == ai_service.format_transcript(SEGMENTS)
+    assert first.startswith('[00:00] 안녕하세요')
+
+
+def test_fetch_errors_are_not_stored(store, monkeypatch):
+    monkeypatch.setattr(transcript_store, '_store', store)
+    monkeypatch.setattr(ai_service, 'fetch_youtube_transcript', lambda video_id: "❌ 자막 없음")
+
+    assert transcript_store.get_youtube_script('video-3') == "❌ 자막 없음"
+    assert store.get('video-3') is None
@@ -0,0 +1,159 @@
+"""write_behind: 쓰기 합치기, 대기 중/저장 중 쓰기 조회, 저장 실패 재시도"""
+import threading
+
+import pytest
+
+from storage import SQLiteStorage
+from write_behind import WriteBehindStorage, _apply_ops, _merge_op
+
+KEY_FIELDS = {'analysis': 'product_name'}
+
+
+def merged(*writes):
+    ops = []
+    for op, payload in writes:
+        _merge_op(ops, op, payload)
+    return ops
+
+
+def test_merge_upsert_then_update_becomes_one_upsert():
+    assert merged(('upsert', {'a': 1}), ('update', {'b': 2})) == [('upsert', {'a': 1, 'b': 2})]
+
+
+def test_merge_updates_are_combined_and_later_fields_win():
+    assert merged(('update', {'a': 1}), ('update', {'a': 2, 'b': 3})) == [('update', {'a': 2, 'b': 3})]
+
+
+def test_merge_update_then_upsert_keeps_both():
+    # 문서가 없을 수도 있으므로 update 뒤의 upsert는 합치지 않음
+    assert merged(('update', {'a': 1}), ('upsert', {'b': 2})) == [('update', {'a': 1}), ('upsert', {'b': 2})]
+
+
+def test_merge_replace_and_delete_discard_previous_writes():
+    assert merged(('upsert', {'a': 1}), ('replace', {'b': 2})) == [('replace', {'b': 2})]
+    assert merged(('upsert', {'a': 1}), ('delete', None)) == [('delete', None)]
+
+
+def test_merge_after_delete():
+    assert merged(('delete', None), ('upsert', {'a': 1})) == [('replace', {'a': 1})]
+    assert merged(('delete', None), ('update', {'a': 1})) == [('delete', None)]
+
+
+def test_apply_ops():
+    base = {'a': 1, 'b': 1}
+    assert _apply_ops(base, [('update', {'b': 2})]) == {'a': 1, 'b': 2}
+    assert _apply_ops(None, [('update', {'b': 2})]) is None
+    assert _apply_ops(None, [('upsert', {'b': 2})]) == {'b': 2}
+    assert _apply_ops(base, [('replace', {'c': 3})]) == {'c': 3}
+    assert _apply_ops(base, [('delete', None), ('upsert', {'c': 3})]) == {'c': 3}
+    assert base == {'a': 1, 'b': 1}
+
+
+class FlakyStorage(SQLiteStorage):
+    """write_many를 fail_writes번 실패시키고, block이 설정되어 있으면 저장 중에 멈추는 저장소"""
+
+    def __init__(self, path, key_fields):
+        super().__init__(path, key_fields)
+        self.fail_writes = 0
+        self.block = None
+        self.writing = threading.Event()
+
+    def write_many(self, collection, operations):
+        self.writing.set()
+        if self.block is not None:
+            self.block.wait(5)
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise ConnectionError('db down')
+        return super().write_many(collection, operations)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return FlakyStorage(str(tmp_path / 'cache.db'), KEY_FIELDS)
+
+
+@pytest.fixture
+def storage(backend):
+    # 자동 저장이 테스트 중에 끼어들지 않도록 주기를 길게 두고 flush()를 직접 호출
+    storage = WriteBehindStorage(backend, flush_interval=3600, max_retries=2)
+    yield storage
+    backend.block = None
+    backend.fail_writes = 0
+    storage.close()
+
+
+def test_pending_writes_are_visible_before_flush(storage, backend):
+    backend.upsert('analysis', 'p1', {'a': 1, 'b': 1})
+    storage.update('analysis', 'p1', {'b': 2})
+    storage.upsert('analysis', 'p2', {'c': 3})
+
+    assert backend.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1, 'b': 1}
+    assert storage.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1, 'b': 2}
+    assert storage.get('analysis', 'p1', ['b']) == {'b': 2}
+    assert storage.get_many('analysis', ['p1', 'p2', 'p3']) == {
+        'p1': {'product_name': 'p1', 'a': 1, 'b': 2},
+        'p2': {'product_name': 'p2', 'c': 3},
+    }
+
+    storage.delete('analysis', 'p1')
+    assert storage.get('analysis', 'p1') is None
+    assert 'p1' not in storage.get_many('analysis', ['p1'])
+
+
+def test_flush_writes_coalesced_operations(storage, backend):
+    storage.upsert('analysis', 'p1', {'a': 1})
+    storage.update('analysis', 'p1', {'b': 2})
+    storage.update('analysis', 'p1', {'b': 3})
+    assert storage.stats()['pending'] == 1
+    assert storage.stats()['coalesced'] == 2
+
+    storage.flush()
+
+    assert backend.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1, 'b': 3}
+    assert storage.stats()['pending'] == 0
+    assert storage.stats()['written'] == 1
+
+
+def test_inflight_writes_are_visible_while_flushing(storage, backend):
+    storage.upsert('analysis', 'p1', {'a': 1})
+    backend.block = threading.Event()
+    flusher = threading.Thread(target=storage.flush)
+    flusher.start()
+    try:
+        assert backend.writing.wait(5)
+        assert storage.stats()['pending'] == 0
+        assert storage.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1}
+    finally:
+        backend.block.set()
+        flusher.join(5)
+    assert backend.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1}
+
+
+def test_failed_flush_is_requeued_and_newer_writes_win(storage, backend):
+    storage.upsert('analysis', 'p1', {'a': 1, 'b': 1})
+    backend.fail_writes = 1
+    storage.flush()
+
+    assert storage.stats()['pending'] == 1
+    assert storage.stats()['retried'] == 1
+    assert backend.get('analysis', 'p1') is None
+    assert storage.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1, 'b': 1}
+
+    storage.update('analysis', 'p1', {'b': 2})
+    storage.flush()
+    assert backend.get('analysis', 'p1') == {'product_name': 'p1', 'a': 1, 'b': 2}
+    assert storage.stats()['pending'] == 0
+
+
+def test_write_is_dropped_after_max_retries(storage, backend):
+    storage.upsert('analysis', 'p1', {'a': 1})
+    backend.fail_writes = 3
+    for _ in range(3):
+        storage.flush()
+
+    stats = storage.stats()
+    assert stats['pending'] == 0
+    assert stats['retried'] == 2
+    assert stats['dropped'] == 1
+    assert storage.get('analysis', 'p1') is None
@@ -0,0 +1,193 @@
+"""
+유튜브 자막 원문 저장소
+
+자막 다운로드는 느리고 요청 제한이 있으므로 한 번 받은 자막은 transcripts 컬렉션에 보관하고,
+영상 분석(재분석 포함)은 저장된 자막을 먼저 사용합니다. 프롬프트를 바꿔 다시 분석해도 Gemini 호출만 발생합니다.
+
+- StorageTranscriptStore: database.storage의 transcripts 컬렉션 (MongoDB 또는 SQLite)
+- AsyncMongoTranscriptStore: motor 컬렉션 사용 (ASGI 앱용)
+
+저장 형태: {"video_id": ..., "transcripts": {언어 코드: {"data": 압축된 자막 구간 JSON, "codec": "zstd"|"zlib",
+           "segment_count": 구간 수, "fetched_at": 다운로드 타임스탬프}}}
+"""
+import asyncio
+import json
+import zlib
+from datetime import datetime
+
+import ai_service
+import database
+import metrics
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    print("⚠️ zstandard 라이브러리가 설치되지 않았습니다. 자막은 zlib으로 압축합니다. (pip install zstandard)")
+
+TRANSCRIPT_COLLECTION_NAME = database.TRANSCRIPTS_COLLECTION_NAME
+
+# 여러 언어의 자막이 저장되어 있으면 이 순서로 사용 (ai_service.fetch_youtube_transcript와 같은 우선순위)
+PREFERRED_LANGUAGES = ['ko', 'en']
+
+
+def compress_segments(segments):
+    """자막 구간 리스트 -> (압축된 bytes, 코덱 이름)"""
+    raw = json.dumps(segments, ensure_ascii=False).encode('utf-8')
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=10).compress(raw), 'zstd'
+    return zlib.compress(raw, 9), 'zlib'
+
+
+def decompress_segments(data, codec):
+    """compress_segments의 역변환 (해제할 수 없는 코덱이면 None)"""
+    if codec == 'zstd':
+        if not ZSTD_AVAILABLE:
+            return None
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == 'zlib':
+        raw = zlib.decompress(data)
+    else:
+        return None
+    return json.loads(raw.decode('utf-8'))
+
+
+def make_entry(segments):
+    """언어별 자막 항목 생성"""
+    data, codec = compress_segments(segments)
+    return {
+        'data': data,
+        'codec': codec,
+        'segment_count': len(segments),
+        'fetched_at': int(datetime.now().timestamp())
+    }
+
+
+def pick_transcript(document):
+    """
+    저장된 문서에서 사용할 자막 선택 (PREFERRED_LANGUAGES 우선, 없으면 첫 번째 언어)
+
+    Returns:
+        tuple: (언어 코드, 자막 구간 리스트), 쓸 수 있는 자막이 없으면 None
+    """
+    transcripts = (document or {}).get('transcripts') or {}
+    languages = [lang for lang in PREFERRED_LANGUAGES if lang in transcripts]
+    languages += [lang for lang in transcripts if lang not in languages]
+
+    for language in languages:
+        entry = transcripts[language]
+        try:
+            segments = decompress_segments(bytes(entry['data']), entry.get('codec'))
+        except Exception as e:
+            print(f"   ⚠️ 저장된 자막 해제 실패 ({language}): {str(e)}")
+            continue
+        if segments is not None:
+            return language, segments
+    return None
+
+
+class StorageTranscriptStore:
+    """database.storage 기반 자막 저장소"""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def get(self, video_id):
+        """저장된 자막 -> (언어 코드, 자막 구간 리스트), 없으면 None"""
+        try:
+            document = self._storage.get(TRANSCRIPT_COLLECTION_NAME, video_id)
+        except Exception as e:
+            print(f"   ⚠️ 자막 DB 조회 실패: {str(e)}")
+            return None
+        return pick_transcript(document)
+
+    def save(self, video_id, language, segments):
+        """자막 저장 (이미 저장된 다른 언어 자막은 유지)"""
+        try:
+            document = self._storage.get(TRANSCRIPT_COLLECTION_NAME, video_id, fields=['transcripts']) or {}
+            transcripts = dict(document.get('transcripts') or {}, **{language: make_entry(segments)})
+            # cached_at: TTL 인덱스 기준 시각 (TRANSCRIPT_CACHE_TTL을 설정한 경우에만 만료)
+            self._storage.upsert(TRANSCRIPT_COLLECTION_NAME, video_id, {
+                'transcripts': transcripts, 'cached_at': datetime.utcnow()
+            })
+        except Exception as e:
+            print(f"   ⚠️ 자막 DB 저장 실패: {str(e)}")
+
+
+class AsyncMongoTranscriptStore:
+    """StorageTranscriptStore의 MongoDB 비동기 버전 (motor 컬렉션 사용, ASGI 앱용)"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def get(self, video_id):
+        try:
+            document = await self._collection.find_one({'video_id': video_id}, {'_id': 0})
+        except Exception as e:
+            print(f"   ⚠️ 자막 DB 조회 실패: {str(e)}")
+            return None
+        return pick_transcript(document)
+
+    async def save(self, video_id, language, segments):
+        try:
+            # 언어별 하위 필드만 갱신하므로 다른 언어 자막을 읽어올 필요 없음
+            await self._collection.update_one(
+                {'video_id': video_id},
+                {'$set': {
+                    'video_id': video_id,
+                    f'transcripts.{language}': make_entry(segments),
+                    'cached_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"   ⚠️ 자막 DB 저장 실패: {str(e)}")
+
+
+# 저장소 연결이 없으면 매번 다운로드
+_store = StorageTranscriptStore(database.storage) if database.storage is not None else None
+
+
+def get_youtube_script(video_id):
+    """
+    ai_service.get_youtube_script와 같지만 저장된 자막을 먼저 사용하고, 새로 받은 자막은 저장
+
+    Returns:
+        str: "[mm:ss] 자막" 형식 스크립트, 실패 시 "❌"로 시작하는 오류 메시지
+    """
+    cached = _store.get(video_id) if _store is not None else None
+    metrics.record_cache("transcripts", hit=cached is not None)
+    if cached is not None:
+        return ai_service.format_transcript(cached[1])
+
+    fetched = ai_service.fetch_youtube_transcript(video_id)
+    if isinstance(fetched, str):
+        return fetched
+
+    language, segments = fetched
+    if _store is not None:
+        _store.save(video_id, language, segments)
+    return ai_service.format_transcript(segments)
+
+
+async def get_youtube_script_async(video_id, store):
+    """
+    get_youtube_script의 비동기 버전
+
+    Args:
+        store (AsyncMongoTranscriptStore): ASGI 앱의 자막 저장소
+    """
+    cached = await store.get(video_id)
+    metrics.record_cache("transcripts", hit=cached is not None)
+    if cached is not None:
+        return ai_service.format_transcript(cached[1])
+
+    # youtube-transcript-api는 동기 전용이므로 스레드에서 실행
+    fetched = await asyncio.to_thread(ai_service.fetch_youtube_transcript, video_id)
+    if isinstance(fetched, str):
+        return fetched
+
+    language, segments = fetched
+    await store.save(video_id, language, segments)
+    return ai_service.format_transcript(segments)
@@ -0,0 +1,81 @@
+"""
+크기 제한(LRU) + 만료 시간(TTL)을 갖는 스레드 안전 인메모리 캐시
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    최대 max_entries개까지 보관하고, 가장 오래 사용되지 않은 항목부터 제거하는 캐시
+
+    Args:
+        max_entries (int): 최대 보관 항목 수
+        ttl (float): 기본 만료 시간 (초)
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0  # 용량 초과로 제거된 항목 수
+        self._expirations = 0  # 조회 시 만료되어 제거된 항목 수
+
+    def get(self, key, default=None):
+        """만료되지 않은 값 반환 (없거나 만료되었으면 default)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            # 최근 사용 항목으로 갱신
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """값 저장 (ttl 미지정 시 기본 TTL 사용)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        """항목 삭제"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        """보관 항목 수와 히트/미스/제거 횟수"""
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
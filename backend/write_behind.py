@@ -0,0 +1,295 @@
+"""
+쓰기 지연(write-behind) 저장소
+
+분석 결과/영상 목록/커뮤니티 후기 저장을 요청 스레드에서 바로 DB에 쓰지 않고 대기열에 모았다가
+백그라운드 스레드가 컬렉션별 bulk 쓰기 1회로 저장합니다. 응답은 결과 계산이 끝나는 즉시 반환됩니다.
+
+- 같은 문서(컬렉션, 키)에 대한 연속 쓰기는 하나로 합침 (upsert + update -> upsert, replace/delete는 이전 쓰기를 대체)
+- flush_interval초마다 또는 대기 중인 문서가 max_batch개 이상이면 저장
+- 조회는 아직 저장되지 않은 쓰기를 DB 결과 위에 덮어 반환 (같은 프로세스에서는 저장 직후 조회해도 최신 값)
+- 프로세스 종료 시(atexit) 남은 쓰기를 모두 저장
+
+저장에 실패한 쓰기는 대기열 앞쪽으로 되돌려(그 사이 들어온 새 쓰기는 뒤에 합침) 지수 백오프 후 다시 저장합니다.
+DB 장애(서킷 브레이커 열림 등) 동안의 쓰기도 복구 후 저장되며, 문서별로 max_retries번 연속 실패하면 버리고 dropped로 집계합니다.
+"""
+import atexit
+import threading
+import time
+
+import metrics
+
+
+def _merge_op(ops, op, payload):
+    """문서 1개의 대기 중인 쓰기 목록에 새 쓰기를 합침 (ops를 직접 수정)"""
+    if op in ('replace', 'delete'):
+        ops[:] = [(op, payload)]
+        return
+
+    last_op, last_payload = ops[-1] if ops else (None, None)
+    if last_op in ('upsert', 'replace') or (last_op == 'update' and op == 'update'):
+        # 앞의 쓰기 뒤에는 문서가 존재하므로 필드만 합치면 됨
+        ops[-1] = (last_op, dict(last_payload, **payload))
+    elif last_op == 'delete':
+        # 삭제 뒤 upsert는 새 문서 생성과 같고, 삭제 뒤 update는 대상 문서가 없어 아무 일도 없음
+        if op == 'upsert':
+            ops[-1] = ('replace', payload)
+    else:
+        ops.append((op, payload))
+
+
+def _apply_ops(document, ops):
+    """DB에서 읽은 문서에 대기 중인 쓰기를 순서대로 적용한 결과 (삭제되면 None)"""
+    for op, payload in ops:
+        if op == 'delete':
+            document = None
+        elif op == 'replace':
+            document = dict(payload)
+        elif op == 'upsert':
+            document = dict(document or {}, **payload)
+        elif document is not None:
+            document = dict(document, **payload)
+    return document
+
+
+def _select(document, fields):
+    if document is None or fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+class WriteBehindStorage:
+    """
+    storage.MongoStorage / SQLiteStorage와 같은 인터페이스의 쓰기 지연 래퍼
+
+    Args:
+        backend: 실제 저장소 (MongoStorage 또는 SQLiteStorage)
+        flush_interval (float): 저장 주기 (초)
+        max_batch (int): 대기 중인 문서가 이 개수 이상이면 주기를 기다리지 않고 저장 (bulk 쓰기 1회의 최대 크기)
+        max_retries (int): 문서별 최대 연속 저장 실패 횟수 (넘으면 버림)
+        max_backoff (float): 저장 실패 후 다음 저장까지 최대 대기 시간 (초, flush_interval부터 2배씩)
+    """
+
+    def __init__(self, backend, flush_interval=1.0, max_batch=100, max_retries=10, max_backoff=60):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._pending = {}  # (컬렉션, 키) -> [(종류, 필드), ...] (dict는 넣은 순서 유지)
+        self._inflight = {}  # 저장 중인 쓰기 (저장이 끝날 때까지 조회에 반영)
+        self._attempts = {}  # (컬렉션, 키) -> 연속 저장 실패 횟수
+        self._failed_flushes = 0  # 연속으로 실패가 있었던 저장 횟수 (백오프 지수)
+        self._retry_at = 0.0  # 백오프 중이면 다음 저장 시각
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._counters = {
+            'queued': 0,
+            'coalesced': 0,
+            'written': 0,
+            'failed': 0,
+            'retried': 0,
+            'dropped': 0,
+            'flushes': 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- 조회: 대기 중인 쓰기를 DB 결과 위에 덮어 반환 ---
+
+    def key_field(self, collection):
+        return self.backend.key_field(collection)
+
+    def _ops_for(self, collection, key):
+        with self._lock:
+            return self._inflight.get((collection, key), []) + self._pending.get((collection, key), [])
+
+    def _overlay(self, collection, key, document, ops):
+        document = _apply_ops(document, ops)
+        if document is not None:
+            document[self.key_field(collection)] = key
+        return document
+
+    def get(self, collection, key, fields=None):
+        ops = self._ops_for(collection, key)
+        if not ops:
+            return self.backend.get(collection, key, fields)
+        # 대기 중인 쓰기가 있으면 전체 문서에 적용한 뒤 필드 선택
+        base = None if ops[-1][0] in ('replace', 'delete') else self.backend.get(collection, key)
+        return _select(self._overlay(collection, key, base, ops), fields)
+
+    def get_many(self, collection, keys):
+        keys = list(keys)
+        results = self.backend.get_many(collection, keys)
+        for key in keys:
+            ops = self._ops_for(collection, key)
+            if ops:
+                document = self._overlay(collection, key, results.get(key), ops)
+                if document is None:
+                    results.pop(key, None)
+                else:
+                    results[key] = document
+        return results
+
+    def find_by_normalized_key(self, collection, normalized_key, fields=None):
+        # 아직 저장되지 않은 새 문서는 키(제품명)로 먼저 조회하므로 여기서는 DB에 있는 문서만 찾음
+        document = self.backend.find_by_normalized_key(collection, normalized_key)
+        if document is None:
+            return None
+        key = document[self.key_field(collection)]
+        ops = self._ops_for(collection, key)
+        return _select(self._overlay(collection, key, document, ops) if ops else document, fields)
+
+    def keys_without_normalized_key(self, collection):
+        return self.backend.keys_without_normalized_key(collection)
+
+    def outdated_keys(self, collection, field, version, legacy_version, limit, skip_field=None):
+        return self.backend.outdated_keys(collection, field, version, legacy_version, limit, skip_field)
+
+    def create_indexes(self, indexes):
+        return self.backend.create_indexes(indexes)
+
+    # --- 쓰기: 대기열에 넣고 바로 반환 ---
+
+    def _enqueue(self, collection, key, op, payload):
+        with self._lock:
+            ops = self._pending.get((collection, key))
+            if ops is None:
+                ops = self._pending[(collection, key)] = []
+            else:
+                self._counters['coalesced'] += 1
+            _merge_op(ops, op, payload)
+            self._counters['queued'] += 1
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wakeup.set()
+
+    def upsert(self, collection, key, fields):
+        self._enqueue(collection, key, 'upsert', dict(fields))
+
+    def upsert_many(self, collection, documents):
+        for key, fields in documents.items():
+            self._enqueue(collection, key, 'upsert', dict(fields))
+
+    def update(self, collection, key, fields):
+        self._enqueue(collection, key, 'update', dict(fields))
+
+    def replace(self, collection, key, document):
+        self._enqueue(collection, key, 'replace', dict(document))
+
+    def delete(self, collection, key):
+        self._enqueue(collection, key, 'delete', None)
+
+    # --- 저장 ---
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if time.monotonic() < self._retry_at:
+                continue  # 저장 실패 후 백오프 중
+            self.flush()
+
+    def flush(self):
+        """대기 중인 쓰기를 모두 저장 (컬렉션별 bulk 쓰기, max_batch개씩)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._inflight, self._pending = self._pending, {}
+                batch = self._inflight
+
+            by_collection = {}
+            for (collection, key), ops in batch.items():
+                by_collection.setdefault(collection, []).append((key, ops))
+
+            start = time.perf_counter()
+            written = 0
+            failed = []  # (컬렉션, 키, 쓰기 목록)
+            for collection, entries in by_collection.items():
+                for i in range(0, len(entries), self.max_batch):
+                    chunk = entries[i:i + self.max_batch]
+                    operations = [(op, key, payload) for key, ops in chunk for op, payload in ops]
+                    try:
+                        self.backend.write_many(collection, operations)
+                        written += len(chunk)
+                    except Exception as e:
+                        print(f"   ⚠️ 지연 저장 실패 ({collection}, {len(chunk)}개 문서): {str(e)}")
+                        metrics.UPSTREAM_ERRORS.inc(upstream="db_write")
+                        failed.extend((collection, key, ops) for key, ops in chunk)
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="write_behind_flush")
+
+            with self._lock:
+                # 저장에 성공한 문서는 연속 실패 횟수 초기화
+                failed_keys = {(collection, key) for collection, key, _ in failed}
+                for doc_key in batch:
+                    if doc_key not in failed_keys:
+                        self._attempts.pop(doc_key, None)
+                dropped = self._requeue(failed)
+                self._inflight = {}
+                self._counters['written'] += written
+                self._counters['failed'] += len(failed)
+                self._counters['retried'] += len(failed) - dropped
+                self._counters['dropped'] += dropped
+                self._counters['flushes'] += 1
+
+                if failed:
+                    # 실패가 이어지는 동안 저장 간격을 flush_interval부터 2배씩 늘림 (최대 max_backoff)
+                    backoff = min(self.max_backoff, self.flush_interval * (2 ** self._failed_flushes))
+                    self._failed_flushes += 1
+                    self._retry_at = time.monotonic() + backoff
+                else:
+                    self._failed_flushes = 0
+                    self._retry_at = 0.0
+
+    def _requeue(self, failed):
+        """
+        저장에 실패한 쓰기를 대기열에 되돌림 (self._lock 안에서 호출)
+
+        실패한 쓰기가 먼저, 저장 중에 새로 들어온 쓰기가 뒤에 오도록 합치므로 새 쓰기가 이깁니다.
+
+        Returns:
+            int: max_retries를 넘어 버린 문서 수
+        """
+        dropped = 0
+        for collection, key, ops in failed:
+            doc_key = (collection, key)
+            attempts = self._attempts.get(doc_key, 0) + 1
+            if attempts > self.max_retries:
+                print(f"   ❌ 지연 저장 포기 ({collection}, {key}): {self.max_retries}번 연속 실패")
+                metrics.UPSTREAM_ERRORS.inc(upstream="db_write_dropped")
+                self._attempts.pop(doc_key, None)
+                dropped += 1
+                continue
+            self._attempts[doc_key] = attempts
+
+            merged = list(ops)
+            for op, payload in self._pending.pop(doc_key, []):
+                _merge_op(merged, op, payload)
+            self._pending[doc_key] = merged
+        return dropped
+
+    def close(self):
+        """백그라운드 스레드 종료 후 남은 쓰기 저장 (여러 번 호출해도 안전)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        if self._pending:
+            print(f"   ❌ 종료 시 저장하지 못한 쓰기: {len(self._pending)}개 문서")
+
+    def stats(self):
+        """대기 중인 문서 수와 누적 쓰기 수"""
+        with self._lock:
+            return {
+                'flush_interval': self.flush_interval,
+                'max_batch': self.max_batch,
+                'pending': len(self._pending),
+                'backoff_remaining': max(0.0, self._retry_at - time.monotonic()),
+                **self._counters,
+            }
@@ -32,9 +32,11 @@ function App() {
 
       setResult(response.data);
       
-      // 구매 가이드는 별도로 폴링 시작
-      if (response.data.purchase_guide_status === 'processing') {
-        pollPurchaseGuide(productName.trim());
+      // 이미 생성된 구매 가이드가 있으면 바로 표시, 생성 중이면 SSE로 완료 알림 수신
+      if (response.data.purchase_guide_status === 'completed') {
+        setPurchaseGuide(response.data.purchase_guide);
+      } else if (response.data.purchase_guide_status === 'processing') {
+        subscribePurchaseGuide(productName.trim());
       }
     } catch (err) {
       console.error(err);
@@ -44,6 +46,42 @@ function App() {
     }
   };
 
+  // 구매 가이드 완료 알림 구독 (SSE 미지원 환경이나 연결 오류 시 폴링으로 전환)
+  const subscribePurchaseGuide = (productName) => {
+    if (typeof EventSource === 'undefined') {
+      pollPurchaseGuide(productName);
+      return;
+    }
+
+    setGuideLoading(true);
+    const source = new EventSource(`${API_URL}/api/purchase-guide/${encodeURIComponent(productName)}/stream`);
+    let finished = false;
+
+    source.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+
+      if (data.status === 'completed') {
+        finished = true;
+        source.close();
+        setPurchaseGuide(data.guide);
+        setGuideLoading(false);
+      } else if (data.status === 'error' || data.status === 'not_started') {
+        finished = true;
+        source.close();
+        setError(data.error || data.message || '구매 가이드 생성 중 오류가 발생했습니다.');
+        setGuideLoading(false);
+      }
+    };
+
+    source.onerror = () => {
+      // 서버가 스트림을 닫았거나 연결이 끊긴 경우 (자동 재연결 대신 폴링으로 마무리)
+      source.close();
+      if (!finished) {
+        pollPurchaseGuide(productName);
+      }
+    };
+  };
+
   const pollPurchaseGuide = async (productName) => {
     setGuideLoading(true);
     const maxAttempts = 30; // 최대 30번 시도 (약 30초)